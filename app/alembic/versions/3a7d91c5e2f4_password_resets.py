@@ -0,0 +1,43 @@
+"""password resets
+Revision ID: 3a7d91c5e2f4
+Revises: 8e1f4b6c2d90
+Create Date: 2026-10-19 12:05:33.270481
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3a7d91c5e2f4"
+down_revision = "8e1f4b6c2d90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "password_resets",
+        sa.Column("admin_user_id", sa.String(length=36), nullable=False),
+        sa.Column("kind", sa.String(length=10), nullable=False),
+        sa.Column("secret_hash", sa.String(length=64), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("used_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.ForeignKeyConstraint(["admin_user_id"], ["admin_users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_password_resets_admin_user_id", "password_resets", ["admin_user_id"]
+    )
+    op.create_index(
+        "ix_password_resets_secret_hash", "password_resets", ["secret_hash"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_password_resets_secret_hash", table_name="password_resets")
+    op.drop_index("ix_password_resets_admin_user_id", table_name="password_resets")
+    op.drop_table("password_resets")
@@ -0,0 +1,45 @@
+"""refresh sessions
+Revision ID: 5c2d8e41a7b3
+Revises: f30a6a80befc
+Create Date: 2026-10-19 09:12:40.118204
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5c2d8e41a7b3"
+down_revision = "f30a6a80befc"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "refresh_sessions",
+        sa.Column("admin_user_id", sa.String(length=36), nullable=False),
+        sa.Column("refresh_jti", sa.String(length=36), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["admin_user_id"], ["admin_users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_refresh_sessions_admin_user_id", "refresh_sessions", ["admin_user_id"]
+    )
+    op.create_index(
+        "ix_refresh_sessions_revoked_at", "refresh_sessions", ["revoked_at"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_refresh_sessions_revoked_at", table_name="refresh_sessions")
+    op.drop_index("ix_refresh_sessions_admin_user_id", table_name="refresh_sessions")
+    op.drop_table("refresh_sessions")
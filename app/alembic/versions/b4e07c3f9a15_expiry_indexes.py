@@ -0,0 +1,27 @@
+"""expiry indexes
+Revision ID: b4e07c3f9a15
+Revises: 3a7d91c5e2f4
+Create Date: 2026-10-19 13:20:17.664392
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b4e07c3f9a15"
+down_revision = "3a7d91c5e2f4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_password_resets_expires_at", "password_resets", ["expires_at"]
+    )
+    op.create_index(
+        "ix_refresh_sessions_expires_at", "refresh_sessions", ["expires_at"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_refresh_sessions_expires_at", table_name="refresh_sessions")
+    op.drop_index("ix_password_resets_expires_at", table_name="password_resets")
@@ -0,0 +1,68 @@
+"""api_logs partitioning
+Revision ID: c7d2e5a1f8b3
+Revises: b4e07c3f9a15
+Create Date: 2026-10-19 15:42:08.310527
+"""
+
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c7d2e5a1f8b3"
+down_revision = "b4e07c3f9a15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    is_mysql = op.get_bind().dialect.name == "mysql"
+    if is_mysql:
+        # Partitioning needs created_at in every unique key. Existing TEXT
+        # payloads stay readable as BLOB: uncompressed values are detected
+        # and returned as-is.
+        op.execute("UPDATE api_logs SET created_at = NOW() WHERE created_at IS NULL")
+        op.execute(
+            "ALTER TABLE api_logs MODIFY created_at DATETIME NOT NULL, "
+            "MODIFY payload BLOB NULL, "
+            "DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)"
+        )
+    else:
+        with op.batch_alter_table("api_logs") as batch_op:
+            batch_op.alter_column(
+                "payload", type_=sa.LargeBinary(), existing_nullable=True
+            )
+    op.create_index(
+        "ix_api_logs_created_at_status_code", "api_logs", ["created_at", "status_code"]
+    )
+    op.create_index(
+        "ix_api_logs_user_id_created_at", "api_logs", ["user_id", "created_at"]
+    )
+    if is_mysql:
+        # Everything so far goes in one partition; the maintenance job in
+        # app.core.partitions splits future periods off pmax
+        today = datetime.utcnow()
+        bound = datetime(today.year + today.month // 12, today.month % 12 + 1, 1)
+        op.execute(
+            "ALTER TABLE api_logs PARTITION BY RANGE COLUMNS(created_at) ("
+            f"PARTITION p_history VALUES LESS THAN ('{bound:%Y-%m-%d %H:%M:%S}'), "
+            "PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+        )
+
+
+def downgrade():
+    is_mysql = op.get_bind().dialect.name == "mysql"
+    if is_mysql:
+        op.execute("ALTER TABLE api_logs REMOVE PARTITIONING")
+    op.drop_index("ix_api_logs_user_id_created_at", table_name="api_logs")
+    op.drop_index("ix_api_logs_created_at_status_code", table_name="api_logs")
+    # Compressed payloads can't be turned back into text; they are cleared
+    op.execute("UPDATE api_logs SET payload = NULL")
+    if is_mysql:
+        op.execute(
+            "ALTER TABLE api_logs DROP PRIMARY KEY, ADD PRIMARY KEY (id), "
+            "MODIFY payload TEXT NULL, MODIFY created_at DATETIME NULL"
+        )
+    else:
+        with op.batch_alter_table("api_logs") as batch_op:
+            batch_op.alter_column("payload", type_=sa.Text(), existing_nullable=True)
@@ -0,0 +1,66 @@
+"""api log rollups
+Revision ID: e2b8f6c4a1d7
+Revises: c7d2e5a1f8b3
+Create Date: 2026-10-19 16:58:31.902114
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e2b8f6c4a1d7"
+down_revision = "c7d2e5a1f8b3"
+branch_labels = None
+depends_on = None
+
+COUNTER_COLUMNS = (
+    "count",
+    "status_2xx",
+    "status_3xx",
+    "status_4xx",
+    "status_5xx",
+    "latency_sum_ms",
+    "latency_le_5",
+    "latency_le_10",
+    "latency_le_25",
+    "latency_le_50",
+    "latency_le_100",
+    "latency_le_250",
+    "latency_le_500",
+    "latency_le_1000",
+    "latency_le_2500",
+    "latency_le_5000",
+    "latency_le_inf",
+)
+
+
+def upgrade():
+    op.add_column("api_logs", sa.Column("route", sa.String(length=255), nullable=True))
+    op.add_column("api_logs", sa.Column("duration_ms", sa.Integer(), nullable=True))
+    op.create_table(
+        "api_log_rollups",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("method", sa.String(length=10), nullable=False),
+        sa.Column("route", sa.String(length=255), nullable=False),
+        *[
+            sa.Column(column, sa.Integer(), nullable=False, server_default="0")
+            for column in COUNTER_COLUMNS
+        ],
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ux_api_log_rollups_bucket_method_route",
+        "api_log_rollups",
+        ["bucket", "method", "route"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ux_api_log_rollups_bucket_method_route", table_name="api_log_rollups"
+    )
+    op.drop_table("api_log_rollups")
+    op.drop_column("api_logs", "duration_ms")
+    op.drop_column("api_logs", "route")
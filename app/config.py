@@ -14,15 +14,242 @@ class Settings:
     # JWT Keys
     ACCESS_JWT_KEY: str = os.getenv("ACCESS_JWT_KEY", "")
     REFRESH_JWT_KEY: str = os.getenv("REFRESH_JWT_KEY", "")
+    # Optional keyrings for rotation: {"kid": {jwk}, ...}; the *_KID key issues
+    ACCESS_JWT_KEYS: str = os.getenv("ACCESS_JWT_KEYS", "")
+    ACCESS_JWT_KID: str = os.getenv("ACCESS_JWT_KID", "")
+    REFRESH_JWT_KEYS: str = os.getenv("REFRESH_JWT_KEYS", "")
+    REFRESH_JWT_KID: str = os.getenv("REFRESH_JWT_KID", "")
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
+        os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    )
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # jwe (nested, encrypted) | hs256 | eddsa (signed only)
+    TOKEN_FORMAT: str = os.getenv("TOKEN_FORMAT", "jwe").lower()
+    # Revoked refresh sessions, mirrored in memory by every worker
+    REVOCATION_FILTER_CAPACITY: int = int(
+        os.getenv("REVOCATION_FILTER_CAPACITY", "100000")
+    )
+    REVOCATION_FILTER_ERROR_RATE: float = float(
+        os.getenv("REVOCATION_FILTER_ERROR_RATE", "0.001")
+    )
+    REVOCATION_RECENT_SIZE: int = int(os.getenv("REVOCATION_RECENT_SIZE", "10000"))
+    REVOCATION_SYNC_SECONDS: float = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL_SECONDS: float = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(
+        os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30")
+    )
+    # Password hashing; a fixed PASSWORD_HASH_ROUNDS skips startup calibration
+    PASSWORD_HASH_ROUNDS: int = int(os.getenv("PASSWORD_HASH_ROUNDS", "0"))
+    PASSWORD_HASH_TARGET_MS: float = float(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))
+    PASSWORD_HASH_MIN_ROUNDS: int = int(os.getenv("PASSWORD_HASH_MIN_ROUNDS", "10"))
+    PASSWORD_HASH_MAX_ROUNDS: int = int(os.getenv("PASSWORD_HASH_MAX_ROUNDS", "15"))
+    PASSWORD_POOL_WORKERS: int = int(
+        os.getenv("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+    PASSWORD_POOL_MAX_QUEUE: int = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", "64"))
+    # OTP/reset rate-limit counters: sqlite (shared by every worker on the
+    # host) or memory (per process, so with N workers an attacker gets N
+    # times the attempts; single-worker setups only)
+    AUTH_COUNTER_BACKEND: str = os.getenv("AUTH_COUNTER_BACKEND", "sqlite").lower()
+    AUTH_COUNTER_SQLITE_PATH: str = os.getenv(
+        "AUTH_COUNTER_SQLITE_PATH", "data/auth_counters.db"
+    )
+    AUTH_COUNTER_MAX_KEYS: int = int(os.getenv("AUTH_COUNTER_MAX_KEYS", "100000"))
+    # Background cleanup of expired OTPs, reset links and refresh sessions
+    AUTH_SWEEP_SECONDS: float = float(os.getenv("AUTH_SWEEP_SECONDS", "300"))
+    AUTH_SWEEP_CHUNK_SIZE: int = int(os.getenv("AUTH_SWEEP_CHUNK_SIZE", "500"))
+    # Failed-login throttle: fixed-size slot table; a path (e.g. under
+    # /dev/shm) shares it between workers, empty keeps it per process
+    LOGIN_THROTTLE_SLOTS: int = int(os.getenv("LOGIN_THROTTLE_SLOTS", "262144"))
+    LOGIN_THROTTLE_PATH: str = os.getenv("LOGIN_THROTTLE_PATH", "")
+    LOGIN_THROTTLE_EMAIL_FAILURES: int = int(
+        os.getenv("LOGIN_THROTTLE_EMAIL_FAILURES", "5")
+    )
+    LOGIN_THROTTLE_IP_FAILURES: int = int(os.getenv("LOGIN_THROTTLE_IP_FAILURES", "50"))
+    LOGIN_THROTTLE_BASE_SECONDS: float = float(
+        os.getenv("LOGIN_THROTTLE_BASE_SECONDS", "1")
+    )
+    LOGIN_THROTTLE_MAX_SECONDS: float = float(
+        os.getenv("LOGIN_THROTTLE_MAX_SECONDS", "900")
+    )
+    LOGIN_THROTTLE_RESET_SECONDS: float = float(
+        os.getenv("LOGIN_THROTTLE_RESET_SECONDS", "900")
+    )
+    # API rate limits (token buckets per JWT subject, else per client IP):
+    # memory is per process, sqlite is shared on the host, redis everywhere
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    RATE_LIMIT_SQLITE_PATH: str = os.getenv(
+        "RATE_LIMIT_SQLITE_PATH", "data/rate_limits.db"
+    )
+    RATE_LIMIT_REDIS_URL: str = os.getenv(
+        "RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"
+    )
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    RATE_LIMIT_DEFAULT: str = os.getenv("RATE_LIMIT_DEFAULT", "1000/minute")
+    # "METHOD /path-prefix=N/period" rules separated by ";"
+    RATE_LIMIT_ROUTES: str = os.getenv(
+        "RATE_LIMIT_ROUTES",
+        "POST /auth/login=30/minute;POST /auth/refresh=60/minute;"
+        "POST /auth/forgot-password=10/minute;POST /auth/verify-otp=30/minute;"
+        "POST /auth/reset-password=30/minute",
+    )
+    RATE_LIMIT_EXEMPT_PATHS: list = [
+        path
+        for path in os.getenv("RATE_LIMIT_EXEMPT_PATHS", "/health,/metrics").split(",")
+        if path
+    ]
+    # Adaptive concurrency limit: requests past the limit queue (priority
+    # paths first, GETs last) and are shed with 503 once the queue is full
+    CONCURRENCY_LIMIT_ENABLED: bool = (
+        os.getenv("CONCURRENCY_LIMIT_ENABLED", "True").lower() == "true"
+    )
+    CONCURRENCY_INITIAL_LIMIT: int = int(os.getenv("CONCURRENCY_INITIAL_LIMIT", "20"))
+    CONCURRENCY_MIN_LIMIT: int = int(os.getenv("CONCURRENCY_MIN_LIMIT", "4"))
+    CONCURRENCY_MAX_LIMIT: int = int(os.getenv("CONCURRENCY_MAX_LIMIT", "200"))
+    CONCURRENCY_LATENCY_TOLERANCE: float = float(
+        os.getenv("CONCURRENCY_LATENCY_TOLERANCE", "2.0")
+    )
+    CONCURRENCY_BACKOFF: float = float(os.getenv("CONCURRENCY_BACKOFF", "0.9"))
+    CONCURRENCY_QUEUE_FACTOR: float = float(
+        os.getenv("CONCURRENCY_QUEUE_FACTOR", "2.0")
+    )
+    CONCURRENCY_QUEUE_TIMEOUT_SECONDS: float = float(
+        os.getenv("CONCURRENCY_QUEUE_TIMEOUT_SECONDS", "2")
+    )
+    CONCURRENCY_PRIORITY_PATHS: list = [
+        path
+        for path in os.getenv(
+            "CONCURRENCY_PRIORITY_PATHS", "/health,/metrics,/auth"
+        ).split(",")
+        if path
+    ]
+    CONCURRENCY_EXEMPT_PATHS: list = [
+        path
+        for path in os.getenv("CONCURRENCY_EXEMPT_PATHS", "/events,/diagnostics").split(
+            ","
+        )
+        if path
+    ]
+    # Concurrent identical GETs under these prefixes share one execution
+    SINGLEFLIGHT_ENABLED: bool = (
+        os.getenv("SINGLEFLIGHT_ENABLED", "True").lower() == "true"
+    )
+    SINGLEFLIGHT_PATHS: list = [
+        path
+        for path in os.getenv(
+            "SINGLEFLIGHT_PATHS", "/countries,/states,/cities,/emails,/analytics"
+        ).split(",")
+        if path
+    ]
+    SINGLEFLIGHT_MAX_BODY_BYTES: int = int(
+        os.getenv("SINGLEFLIGHT_MAX_BODY_BYTES", "1048576")
+    )
+    # Request logging into api_logs: rows are buffered in memory (dropped and
+    # counted past API_LOG_BUFFER_SIZE) and bulk-inserted every
+    # API_LOG_FLUSH_MS or API_LOG_BATCH_SIZE rows
+    API_LOG_ENABLED: bool = os.getenv("API_LOG_ENABLED", "True").lower() == "true"
+    API_LOG_BUFFER_SIZE: int = int(os.getenv("API_LOG_BUFFER_SIZE", "10000"))
+    API_LOG_BATCH_SIZE: int = int(os.getenv("API_LOG_BATCH_SIZE", "500"))
+    API_LOG_FLUSH_MS: float = float(os.getenv("API_LOG_FLUSH_MS", "1000"))
+    API_LOG_PAYLOAD_BYTES: int = int(os.getenv("API_LOG_PAYLOAD_BYTES", "1024"))
+    # api_logs is range-partitioned on MySQL by day or month; partitions
+    # older than the retention are dropped, AHEAD future ones pre-created
+    API_LOG_PARTITION_PERIOD: str = os.getenv(
+        "API_LOG_PARTITION_PERIOD", "month"
+    ).lower()
+    API_LOG_PARTITIONS_AHEAD: int = int(os.getenv("API_LOG_PARTITIONS_AHEAD", "3"))
+    API_LOG_RETENTION_DAYS: int = int(os.getenv("API_LOG_RETENTION_DAYS", "90"))
+    API_LOG_MAINTENANCE_SECONDS: float = float(
+        os.getenv("API_LOG_MAINTENANCE_SECONDS", "3600")
+    )
+    # Per-minute route rollups behind /analytics
+    API_ROLLUP_RETENTION_DAYS: int = int(os.getenv("API_ROLLUP_RETENTION_DAYS", "400"))
+    API_LOG_EXEMPT_PATHS: list = [
+        path
+        for path in os.getenv("API_LOG_EXEMPT_PATHS", "/health,/metrics").split(",")
+        if path
+    ]
+    # /health/ready serves the result of background dependency checks
+    # (database, SMTP) run every HEALTH_CHECK_SECONDS
+    HEALTH_CHECK_SECONDS: float = float(os.getenv("HEALTH_CHECK_SECONDS", "10"))
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = float(
+        os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "3")
+    )
+    # Server-Timing header with per-phase latency (auth, db, deps, endpoint,
+    # serialize); for every request, or only for the listed admin user IDs
+    SERVER_TIMING_ENABLED: bool = (
+        os.getenv("SERVER_TIMING_ENABLED", "False").lower() == "true"
+    )
+    SERVER_TIMING_SUBJECTS: list = [
+        subject
+        for subject in os.getenv("SERVER_TIMING_SUBJECTS", "").split(",")
+        if subject
+    ]
+    # Tracing: head-sampled spans (requests, CRUD helpers, token and password
+    # crypto, email) written to a JSON-lines file or kept in memory
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "False").lower() == "true"
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "jsonl").lower()
+    TRACING_FILE: str = os.getenv("TRACING_FILE", "logs/traces.jsonl")
+    TRACING_FILE_MAX_BYTES: int = int(
+        os.getenv("TRACING_FILE_MAX_BYTES", str(100 * 1024 * 1024))
+    )
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "0.01"))
+    TRACING_BUFFER_SIZE: int = int(os.getenv("TRACING_BUFFER_SIZE", "10000"))
+    TRACING_FLUSH_SECONDS: float = float(os.getenv("TRACING_FLUSH_SECONDS", "1"))
+    # Longest sampling profile /diagnostics/profile may take
+    PROFILER_MAX_SECONDS: float = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+    # tracemalloc snapshots kept for /diagnostics/memory diffs
+    MEMORY_MAX_SNAPSHOTS: int = int(os.getenv("MEMORY_MAX_SNAPSHOTS", "5"))
+    # Prometheus /metrics. With several uvicorn workers set
+    # PROMETHEUS_MULTIPROC_DIR (read by prometheus_client itself) to an empty
+    # directory, cleared before each start, so values add up across workers
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_REFRESH_SECONDS: float = float(os.getenv("METRICS_REFRESH_SECONDS", "5"))
     # Email
     SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
     SMTP_USER: str = os.getenv("SMTP_USER", "")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    # Disable (with no password) to deliver through a local stand-in server
+    SMTP_STARTTLS: bool = os.getenv("SMTP_STARTTLS", "True").lower() == "true"
+    # Pooled SMTP sessions, reused until idle for SMTP_IDLE_TIMEOUT_SECONDS
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", "2"))
+    SMTP_IDLE_TIMEOUT_SECONDS: float = float(
+        os.getenv("SMTP_IDLE_TIMEOUT_SECONDS", "60")
+    )
+    SMTP_TIMEOUT_SECONDS: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+    # Compiled email template bytecode; empty uses a per-user temp directory
+    EMAIL_TEMPLATE_CACHE_DIR: str = os.getenv("EMAIL_TEMPLATE_CACHE_DIR", "")
+    # Outbox: requests only enqueue, background workers deliver and retry
+    EMAIL_OUTBOX_WORKERS: int = int(os.getenv("EMAIL_OUTBOX_WORKERS", "1"))
+    EMAIL_OUTBOX_POLL_SECONDS: float = float(
+        os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "2")
+    )
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+    EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BASE_SECONDS: float = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+    # Sent and failed messages are deleted by the sweeper after this long
+    EMAIL_OUTBOX_RETENTION_DAYS: int = int(
+        os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "7")
+    )
     # Application
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     CORS_ORIGINS: list = os.getenv("CORS_ORIGINS", "*").split(",")
+    # Reverse proxies whose X-Forwarded-For is trusted for the client IP
+    # (login throttle, rate limits, API logs). Empty uses the socket peer,
+    # which behind a proxy is the proxy itself for every client.
+    TRUSTED_PROXIES: list = [
+        host.strip()
+        for host in os.getenv("TRUSTED_PROXIES", "").split(",")
+        if host.strip()
+    ]
+    # Change event stream
+    EVENTS_BUFFER_SIZE: int = int(os.getenv("EVENTS_BUFFER_SIZE", "1000"))
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
 
 
 settings = Settings()
@@ -0,0 +1,90 @@
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs a job every `interval` seconds until stopped.
+
+    Plain functions run in a worker thread so blocking DB or network calls
+    never stall the event loop; coroutine functions run on the loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Union[Any, Awaitable[Any]]],
+        run_immediately: bool = False,
+    ):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.run_immediately = run_immediately
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+
+    async def run_once(self) -> None:
+        try:
+            if inspect.iscoroutinefunction(self.func):
+                await self.func()
+            else:
+                await asyncio.to_thread(self.func)
+            self.runs += 1
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Background task {self.name} failed: {e}", exc_info=True)
+
+    async def _loop(self) -> None:
+        if self.run_immediately:
+            await self.run_once()
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+class Scheduler:
+    """Owns the app's periodic jobs; started and stopped from the lifespan"""
+
+    def __init__(self):
+        self.tasks: List[PeriodicTask] = []
+
+    def add(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Union[Any, Awaitable[Any]]],
+        run_immediately: bool = False,
+    ) -> PeriodicTask:
+        task = PeriodicTask(name, interval, func, run_immediately)
+        self.tasks.append(task)
+        return task
+
+    def start(self) -> None:
+        for task in self.tasks:
+            task.start()
+
+    async def stop(self) -> None:
+        for task in reversed(self.tasks):
+            await task.stop()
+
+
+scheduler = Scheduler()
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Tuple
+from app.config import settings
+
+
+def _recent(events: List[float], current: float, window: float) -> List[float]:
+    return [t for t in events if t > current - window]
+
+
+class CounterStore(ABC):
+    """Sliding-window event counters for auth rate limits.
+
+    A key keeps at most `limit` timestamps, which is all a "no more than
+    `limit` events per `window`" check needs, so memory per key is bounded.
+    """
+
+    @abstractmethod
+    def hit(self, key: str, window: float, limit: int) -> int:
+        """Record an event; returns events in the window, capped at limit"""
+
+    @abstractmethod
+    def count(self, key: str, window: float) -> int:
+        pass
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def prune(self) -> int:
+        """Drop keys with no events left in their window"""
+
+
+class MemoryCounterStore(CounterStore):
+    """Per-process counters; the least recently used keys are evicted past
+    max_keys"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> (expires_at, timestamps)
+        self._data: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, window: float, limit: int) -> int:
+        current = time.time()
+        with self._lock:
+            _, events = self._data.get(key, (0.0, []))
+            events = (
+                _recent(events, current, window)[-(limit - 1) :] if limit > 1 else []
+            )
+            events.append(current)
+            self._data[key] = (current + window, events)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+            return len(events)
+
+    def count(self, key: str, window: float) -> int:
+        with self._lock:
+            _, events = self._data.get(key, (0.0, []))
+            return len(_recent(events, time.time(), window))
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def prune(self) -> int:
+        current = time.time()
+        with self._lock:
+            expired = [
+                k for k, (expires_at, _) in self._data.items() if expires_at <= current
+            ]
+            for key in expired:
+                del self._data[key]
+        return len(expired)
+
+
+class SQLiteCounterStore(CounterStore):
+    """Counters in a local SQLite file so every worker on the host shares
+    them. WAL mode keeps readers from blocking the single writer."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                "key TEXT PRIMARY KEY, events TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _parse(row) -> List[float]:
+        return [float(t) for t in row[0].split(",")] if row and row[0] else []
+
+    def hit(self, key: str, window: float, limit: int) -> int:
+        conn = self._connection()
+        current = time.time()
+        # IMMEDIATE takes the write lock up front so concurrent hits on the
+        # same key serialize instead of losing updates
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT events FROM counters WHERE key = ?", (key,)
+            ).fetchone()
+            events = _recent(self._parse(row), current, window)
+            events = (events[-(limit - 1) :] if limit > 1 else []) + [current]
+            conn.execute(
+                "INSERT INTO counters (key, events, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET events = excluded.events, "
+                "expires_at = excluded.expires_at",
+                (key, ",".join(f"{t:.3f}" for t in events), current + window),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(events)
+
+    def count(self, key: str, window: float) -> int:
+        row = (
+            self._connection()
+            .execute("SELECT events FROM counters WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return len(_recent(self._parse(row), time.time(), window))
+
+    def reset(self, key: str) -> None:
+        self._connection().execute("DELETE FROM counters WHERE key = ?", (key,))
+
+    def prune(self) -> int:
+        cursor = self._connection().execute(
+            "DELETE FROM counters WHERE expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+
+def create_counter_store() -> CounterStore:
+    if settings.AUTH_COUNTER_BACKEND == "sqlite":
+        return SQLiteCounterStore(settings.AUTH_COUNTER_SQLITE_PATH)
+    if settings.AUTH_COUNTER_BACKEND == "memory":
+        return MemoryCounterStore(settings.AUTH_COUNTER_MAX_KEYS)
+    raise ValueError(f"Unknown counter backend '{settings.AUTH_COUNTER_BACKEND}'")
+
+
+auth_counters = create_counter_store()
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from uuid import uuid4
+from app.config import settings
+from app.libs.utils import now, object_as_dict
+
+
+class EventBroker:
+    """In-process fan-out of data change notifications to streaming clients.
+
+    Published events go into a bounded ring buffer. Subscribers do not get a
+    queue each; they all await one shared wake-up event and read whatever is
+    newer than their last sequence number, so an idle connection costs a
+    single suspended coroutine.
+    """
+
+    def __init__(self, buffer_size: int = 1000):
+        # Epoch changes on every restart so stale Last-Event-ID values
+        # from another process are detected instead of misread
+        self.epoch = uuid4().hex[:8]
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.closed = False
+        self.subscribers = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, table: str, action: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._seq += 1
+            event = {
+                "id": f"{self.epoch}-{self._seq}",
+                "seq": self._seq,
+                "table": table,
+                "action": action,
+                "data": data,
+                "timestamp": now().isoformat(),
+            }
+            self._buffer.append(event)
+        self._notify()
+        return event
+
+    def _notify(self) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake()
+        else:
+            loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self) -> None:
+        # Swap in a fresh event before setting the old one so every waiter
+        # wakes exactly once per publish
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        if wakeup is not None:
+            wakeup.set()
+
+    def parse_event_id(self, event_id: Optional[str]) -> Tuple[int, bool]:
+        """Return (last seen seq, needs_reset) for a Last-Event-ID header"""
+        if not event_id:
+            return self._seq, False
+        epoch, _, seq = event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return self._seq, True
+        return int(seq), False
+
+    def events_after(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """Events newer than seq, or None if some were already evicted"""
+        with self._lock:
+            if seq >= self._seq:
+                return []
+            if not self._buffer or seq < self._buffer[0]["seq"] - 1:
+                return None
+            start = seq - self._buffer[0]["seq"] + 1
+            return list(islice(self._buffer, start, None))
+
+    async def wait_for_events(
+        self, seq: int, timeout: float
+    ) -> Optional[List[Dict[str, Any]]]:
+        events = self.events_after(seq)
+        if events or events is None or self.closed:
+            return events
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return self.events_after(seq)
+
+    def close(self) -> None:
+        """Release all waiting subscribers so open streams can finish"""
+        self.closed = True
+        self._notify()
+
+
+def publish_change(record: Any, action: str) -> None:
+    data = object_as_dict(record)
+    # Cities only reference their state; carry the country along so
+    # country-filtered subscribers still see them
+    if "state_id" in data and "country_id" not in data:
+        data["country_id"] = getattr(getattr(record, "state", None), "country_id", None)
+    event_broker.publish(record.__tablename__, action, data)
+
+
+def event_matches(
+    event: Dict[str, Any],
+    tables: Optional[List[str]] = None,
+    country_id: Optional[str] = None,
+    state_id: Optional[str] = None,
+) -> bool:
+    if tables and event["table"] not in tables:
+        return False
+    data = event["data"]
+    if country_id:
+        key = "id" if event["table"] == "countries" else "country_id"
+        if data.get(key) != country_id:
+            return False
+    if state_id:
+        key = "id" if event["table"] == "states" else "state_id"
+        if data.get(key) != state_id:
+            return False
+    return True
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    data = json.dumps(
+        {k: event[k] for k in ("table", "action", "data", "timestamp")},
+        default=str,
+    )
+    return f"id: {event['id']}\nevent: {event['action']}\ndata: {data}\n\n"
+
+
+event_broker = EventBroker(buffer_size=settings.EVENTS_BUFFER_SIZE)
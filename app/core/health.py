@@ -0,0 +1,104 @@
+import logging
+import socket
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from app.config import settings
+from app.database import engine
+from app.libs.emails import smtp_pool
+
+logger = logging.getLogger(__name__)
+
+
+def ping_database(db_engine: Engine) -> None:
+    with db_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def ping_smtp() -> None:
+    """TCP reachability only: a full handshake and login on every check
+    would look like abuse to most providers"""
+    with socket.create_connection(
+        (settings.SMTP_HOST, settings.SMTP_PORT),
+        timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+    ):
+        pass
+
+
+class HealthMonitor:
+    """Runs dependency checks in the background and serves their last
+    result, so probes cost nothing however often they come.
+
+    A result older than `stale_after` counts as down: it means the checks
+    themselves have stopped running.
+    """
+
+    def __init__(
+        self,
+        db_engine: Engine,
+        stale_after: float,
+        checks: Optional[Dict[str, Callable[[], None]]] = None,
+    ):
+        self.engine = db_engine
+        self.stale_after = stale_after
+        self.checks = checks or {
+            "database": lambda: ping_database(self.engine),
+            "smtp": ping_smtp,
+        }
+        self._results: Dict[str, Dict[str, Any]] = {}
+
+    def refresh(self) -> None:
+        for name, check in self.checks.items():
+            started = time.perf_counter()
+            try:
+                check()
+            except Exception as e:
+                # Only logged: driver errors name hosts and users, and the
+                # probes are unauthenticated
+                if self._results.get(name, {}).get("status") != "down":
+                    logger.warning(f"Health check {name} failed: {e!r}")
+                result: Dict[str, Any] = {"status": "down"}
+            else:
+                result = {"status": "up"}
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            result["checked_at"] = time.time()
+            self._results[name] = result
+
+    def result(self, name: str) -> Dict[str, Any]:
+        result = self._results.get(name)
+        if result is None:
+            return {"status": "unknown"}
+        age = time.time() - result["checked_at"]
+        if age > self.stale_after:
+            return {**result, "status": "stale"}
+        return {**result, "age_seconds": round(age, 1)}
+
+    def pools(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        pools: Dict[str, Any] = {"smtp": smtp_pool.stats()}
+        # Pools without a fixed size (e.g. SQLite's) don't report these
+        if isinstance(pool, QueuePool):
+            in_use = pool.checkedout()
+            pools["database"] = {
+                "size": pool.size(),
+                "in_use": in_use,
+                "overflow": max(0, pool.overflow()),
+                "saturation": round(in_use / max(pool.size(), 1), 2),
+            }
+        return pools
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """Ready only while the database answers; SMTP is reported but
+        mail is queued in the outbox, so it doesn't gate traffic"""
+        checks = {name: self.result(name) for name in self.checks}
+        ready = checks.get("database", {}).get("status") == "up"
+        return ready, {
+            "status": "ready" if ready else "unavailable",
+            "checks": checks,
+            "pools": self.pools(),
+        }
+
+
+health_monitor = HealthMonitor(engine, stale_after=settings.HEALTH_CHECK_SECONDS * 3)
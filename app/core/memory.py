@@ -0,0 +1,165 @@
+import gc
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.cache import TTLCache
+from app.database import Base
+
+# tracemalloc's own bookkeeping and import machinery are noise in diffs
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size, where /proc is available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryDiagnostics:
+    """Turns tracemalloc on and off at runtime and keeps up to
+    `max_snapshots` snapshots (oldest dropped first) to diff.
+
+    tracemalloc costs nothing until started; once on, every allocation is
+    recorded with `frames` stack frames, which slows allocation-heavy code
+    noticeably, so it is meant to be switched on for a window and off again.
+    """
+
+    def __init__(self, max_snapshots: int):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def status(self) -> Dict[str, Any]:
+        # Snapshots are taken and deleted from other threadpool threads
+        with self._lock:
+            snapshots = [self._describe(snapshot_id) for snapshot_id in self._snapshots]
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": (
+                tracemalloc.get_tracemalloc_memory() if tracing else 0
+            ),
+            "rss_bytes": rss_bytes(),
+            "snapshots": snapshots,
+        }
+
+    def start(self, frames: int) -> Dict[str, Any]:
+        if tracemalloc.is_tracing():
+            if tracemalloc.get_traceback_limit() == frames:
+                return self.status()
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        # Snapshots stay usable; they don't depend on tracing being on
+        tracemalloc.stop()
+        return self.status()
+
+    def take_snapshot(self) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        traced = sum(stat.size for stat in snapshot.statistics("filename"))
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = {
+                "snapshot": snapshot,
+                "taken_at": time.time(),
+                "rss_bytes": rss_bytes(),
+                "traced_bytes": traced,
+            }
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+            return self._describe(snapshot_id)
+
+    def _describe(self, snapshot_id: int) -> Dict[str, Any]:
+        entry = self._snapshots[snapshot_id]
+        return {
+            "id": snapshot_id,
+            "taken_at": entry["taken_at"],
+            "rss_bytes": entry["rss_bytes"],
+            "traced_bytes": entry["traced_bytes"],
+        }
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        try:
+            return self._snapshots[snapshot_id]["snapshot"]
+        except KeyError:
+            raise KeyError(f"Snapshot {snapshot_id} not found")
+
+    def diff(
+        self, base_id: int, compare_id: int, group_by: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Allocation growth from `base_id` to `compare_id`, biggest first,
+        grouped by "lineno" (file and line) or "filename" """
+        base, compare = self._get(base_id), self._get(compare_id)
+        rows = []
+        for stat in compare.compare_to(base, group_by)[:limit]:
+            frame = stat.traceback[0]
+            rows.append(
+                {
+                    "file": frame.filename,
+                    "line": frame.lineno if group_by == "lineno" else None,
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size_bytes": stat.size,
+                    "count": stat.count,
+                }
+            )
+        return rows
+
+    def delete(self, snapshot_id: int) -> None:
+        with self._lock:
+            self._get(snapshot_id)
+            del self._snapshots[snapshot_id]
+
+
+def object_counts() -> Dict[str, Any]:
+    """Live SQLAlchemy sessions (and what their identity maps hold), mapped
+    model instances and in-process caches, from one pass over the GC's
+    objects. Takes a moment on a big heap; on demand only."""
+    models = {mapper.class_: mapper.class_.__name__ for mapper in Base.registry.mappers}
+    instances: Dict[str, int] = {name: 0 for name in models.values()}
+    sessions = 0
+    identity_map = 0
+    caches: List[Dict[str, Any]] = []
+    for obj in gc.get_objects():
+        cls = type(obj)
+        name = models.get(cls)
+        if name is not None:
+            instances[name] += 1
+        elif isinstance(obj, Session):
+            sessions += 1
+            identity_map += len(obj.identity_map)
+        elif cls is TTLCache:
+            caches.append({"size": len(obj), "maxsize": obj.maxsize})
+    return {
+        "sessions": sessions,
+        "identity_map_entries": identity_map,
+        "model_instances": {k: v for k, v in instances.items() if v},
+        "ttl_caches": caches,
+        "gc_counts": list(gc.get_count()),
+    }
+
+
+memory_diagnostics = MemoryDiagnostics(settings.MEMORY_MAX_SNAPSHOTS)
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from sqlalchemy.pool import QueuePool
+
+# Imported first: it loads .env, and prometheus_client decides at import
+# time whether PROMETHEUS_MULTIPROC_DIR puts metric values in shared files
+import app.config  # noqa: F401
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUESTS = Counter(
+    "http_requests", "HTTP requests by route and status", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+# Gauges say how values from several worker processes combine
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "SQL statement latency", buckets=LATENCY_BUCKETS
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Configured DB pool connections", multiprocess_mode="livesum"
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "DB connections checked out",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "DB connections over the pool size", multiprocess_mode="livesum"
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests", "In-process cache lookups", ["cache", "result"]
+)
+CONCURRENCY_LIMIT = Gauge(
+    "concurrency_limit", "Adaptive concurrency limit", multiprocess_mode="livesum"
+)
+LOAD_SHED = Counter("load_shed", "Requests rejected by the concurrency limiter")
+REQUESTS_COALESCED = Counter(
+    "requests_coalesced", "GETs answered from another in-flight request"
+)
+API_LOGS_DROPPED = Counter("api_logs_dropped", "api_logs rows lost to overload")
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "How late a scheduled event-loop callback ran",
+    multiprocess_mode="livemax",
+)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement the engine executes"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        setattr(context, "_metrics_started", time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            DB_QUERY_LATENCY.observe(time.perf_counter() - started)
+
+
+class StatsExporter:
+    """Copies counters kept by the app's own components (caches, limiters,
+    pools) into Prometheus metrics.
+
+    Runs periodically in every worker rather than at scrape time, because
+    in multiprocess mode the scrape is served by one worker that can only
+    see its own objects.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self._caches: Dict[str, Any] = {}
+        self._counters: List[Tuple[Counter, Callable[[], int]]] = []
+        self._gauges: List[Tuple[Gauge, Callable[[], float]]] = []
+        self._last: Dict[Any, int] = {}
+
+    def track_cache(self, name: str, cache: Any) -> None:
+        """Export hits/misses of anything with `hits` and `misses` counts"""
+        self._caches[name] = cache
+
+    def track_counter(self, counter: Counter, read: Callable[[], int]) -> None:
+        self._counters.append((counter, read))
+
+    def track_gauge(self, gauge: Gauge, read: Callable[[], float]) -> None:
+        self._gauges.append((gauge, read))
+
+    def _advance(self, key: Any, counter: Any, value: int) -> None:
+        delta = value - self._last.get(key, 0)
+        if delta > 0:
+            counter.inc(delta)
+        self._last[key] = value
+
+    def refresh(self) -> None:
+        for name, cache in self._caches.items():
+            for result in ("hit", "miss"):
+                value = getattr(cache, "hits" if result == "hit" else "misses")
+                self._advance(
+                    (name, result), CACHE_REQUESTS.labels(name, result), value
+                )
+        for counter, read_count in self._counters:
+            self._advance(counter, counter, read_count())
+        for gauge, read_value in self._gauges:
+            gauge.set(read_value())
+        pool = self.engine.pool
+        # Pools without a fixed size (e.g. SQLite's) don't report these
+        if isinstance(pool, QueuePool):
+            DB_POOL_SIZE.set(pool.size())
+            DB_POOL_IN_USE.set(pool.checkedout())
+            DB_POOL_OVERFLOW.set(max(0, pool.overflow()))
+
+
+async def measure_event_loop_lag(expected: float = 0.01) -> None:
+    started = time.perf_counter()
+    await asyncio.sleep(expected)
+    EVENT_LOOP_LAG.set(max(0.0, time.perf_counter() - started - expected))
+
+
+stats_exporter = StatsExporter(engine)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared files on shutdown"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
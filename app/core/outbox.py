@@ -0,0 +1,139 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import db_manager
+from app.libs.emails import Email, send_emails
+from app.libs.utils import now
+from app.models import EmailOutboxModel
+
+logger = logging.getLogger(__name__)
+# How long a claimed message stays invisible to other workers
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def _utcnow() -> datetime:
+    # Columns are naive UTC DateTime
+    return now().replace(tzinfo=None)
+
+
+def enqueue_email(
+    db: Session, recipients: List[str], subject: str, html_body: str
+) -> EmailOutboxModel:
+    """Add a message to the outbox. It is written with the caller's commit,
+    so it is only delivered if the surrounding change is saved."""
+    if not recipients:
+        raise ValueError("No recipients specified")
+    message = EmailOutboxModel(
+        recipients=json.dumps(recipients),
+        subject=subject,
+        html_body=html_body,
+        status="pending",
+        attempts=0,
+        next_attempt_at=_utcnow(),
+    )
+    db.add(message)
+    return message
+
+
+class EmailOutbox:
+    """Drains the outbox table: claims due messages, sends each batch over
+    one SMTP session and reschedules failures with exponential backoff.
+
+    Bodies carry OTPs and reset links, so they are blanked as soon as a
+    message is sent or given up on; the sweeper deletes those rows later.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        sender: Callable[[List[Email]], List[Optional[Exception]]],
+        batch_size: int,
+        max_attempts: int,
+        retry_base_seconds: float,
+    ):
+        self.session_factory = session_factory
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.sent = 0
+        self.failed = 0
+
+    def claim(self, db: Session) -> List[EmailOutboxModel]:
+        current_time = _utcnow()
+        query = (
+            db.query(EmailOutboxModel)
+            .filter(
+                EmailOutboxModel.status.in_(("pending", "sending")),
+                EmailOutboxModel.next_attempt_at <= current_time,
+            )
+            .order_by(EmailOutboxModel.next_attempt_at)
+            .limit(self.batch_size)
+        )
+        if db.get_bind().dialect.name != "sqlite":
+            # Concurrent workers take disjoint batches
+            query = query.with_for_update(skip_locked=True)
+        messages = query.all()
+        for message in messages:
+            message.status = "sending"
+            message.attempts += 1
+            message.next_attempt_at = current_time + CLAIM_LEASE
+        db.commit()
+        return messages
+
+    def _record(self, message: EmailOutboxModel, error: Optional[Exception]) -> None:
+        if error is not None:
+            message.last_error = str(error)
+            if message.attempts >= self.max_attempts:
+                message.status = "failed"
+                message.html_body = ""
+                self.failed += 1
+                logger.error(f"Email {message.id} failed permanently: {error}")
+            else:
+                delay = self.retry_base_seconds * 2 ** (message.attempts - 1)
+                message.status = "pending"
+                message.next_attempt_at = _utcnow() + timedelta(seconds=delay)
+                logger.warning(
+                    f"Email {message.id} failed, retrying in {delay}s: {error}"
+                )
+        else:
+            message.status = "sent"
+            message.sent_at = _utcnow()
+            message.html_body = ""
+            message.last_error = None
+            self.sent += 1
+
+    def deliver_pending(self) -> int:
+        """Deliver one batch; returns the number of messages attempted"""
+        db = self.session_factory()
+        try:
+            messages = self.claim(db)
+            if not messages:
+                return 0
+            emails = [
+                (json.loads(m.recipients), m.subject, m.html_body) for m in messages
+            ]
+            try:
+                errors = self.sender(emails)
+            except Exception as e:
+                # The session itself failed; retry the whole batch, so
+                # delivery is at-least-once
+                errors = [e] * len(messages)
+            for message, error in zip(messages, errors):
+                self._record(message, error)
+            db.commit()
+            return len(messages)
+        finally:
+            db.close()
+
+
+email_outbox = EmailOutbox(
+    session_factory=db_manager.get_session,
+    sender=send_emails,
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base_seconds=settings.EMAIL_RETRY_BASE_SECONDS,
+)
@@ -0,0 +1,202 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.sweeper import delete_in_chunks
+from app.database import db_manager
+from app.libs.utils import now
+from app.models import APILogModel, APILogRollupModel
+
+logger = logging.getLogger(__name__)
+# Catch-all partition for rows past the newest bound
+MAX_PARTITION = "pmax"
+# MySQL named lock held by the worker running maintenance
+MAINTENANCE_LOCK = "api_logs_maintenance"
+
+
+class Partition(NamedTuple):
+    name: str
+    # Rows with created_at < bound; None for the MAXVALUE partition
+    bound: Optional[datetime]
+
+
+def period_start(moment: datetime, period: str) -> datetime:
+    if period == "day":
+        return datetime(moment.year, moment.month, moment.day)
+    if period == "month":
+        return datetime(moment.year, moment.month, 1)
+    raise ValueError(f"Unknown partition period '{period}'")
+
+
+def next_period(start: datetime, period: str) -> datetime:
+    if period == "day":
+        return start + timedelta(days=1)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start: datetime, period: str) -> str:
+    return start.strftime("p%Y%m%d" if period == "day" else "p%Y%m")
+
+
+def plan_partitions(
+    existing: List[Partition],
+    current: datetime,
+    period: str,
+    ahead: int,
+    retention_days: int,
+) -> Tuple[List[Partition], List[str]]:
+    """Partitions to split off the catch-all so `ahead` future periods exist,
+    and partitions lying entirely before the retention cutoff"""
+    bounds = sorted(p.bound for p in existing if p.bound is not None)
+    start = bounds[-1] if bounds else period_start(current, period)
+    horizon = period_start(current, period)
+    # The current period plus `ahead` more
+    for _ in range(ahead + 1):
+        horizon = next_period(horizon, period)
+    to_create = []
+    while start < horizon:
+        bound = next_period(period_start(start, period), period)
+        to_create.append(Partition(partition_name(start, period), bound))
+        start = bound
+    cutoff = current - timedelta(days=retention_days)
+    to_drop = [p.name for p in existing if p.bound is not None and p.bound <= cutoff]
+    return to_create, to_drop
+
+
+class APILogPartitions:
+    """Keeps api_logs partitioned by created_at and enforces retention.
+
+    On MySQL the table is RANGE COLUMNS partitioned (set up by migration):
+    new partitions are split off the catch-all ahead of time and expired
+    ones are dropped whole, which is instant and gives the space back
+    without a row-by-row DELETE or a table rebuild. Other databases
+    (SQLite in development and tests) have no partitioning, so expired
+    rows are deleted in chunks instead. Rollups are small and kept longer;
+    they are always trimmed in chunks.
+    """
+
+    table = APILogModel.__tablename__
+
+    def __init__(
+        self,
+        period: str,
+        ahead: int,
+        retention_days: int,
+        rollup_retention_days: int = 400,
+        chunk_size: int = 1000,
+    ):
+        self.period = period
+        self.ahead = ahead
+        self.retention_days = retention_days
+        self.rollup_retention_days = rollup_retention_days
+        self.chunk_size = chunk_size
+
+    def existing(self, db: Session) -> List[Partition]:
+        rows = db.execute(
+            text(
+                "SELECT PARTITION_NAME, PARTITION_DESCRIPTION "
+                "FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+                "AND PARTITION_NAME IS NOT NULL"
+            ),
+            {"table": self.table},
+        )
+        partitions = []
+        for name, description in rows:
+            bound = None
+            if description != "MAXVALUE":
+                bound = datetime.fromisoformat(description.strip("'"))
+            partitions.append(Partition(name, bound))
+        return partitions
+
+    def _maintain_mysql(self, db: Session, current: datetime) -> Dict[str, int]:
+        existing = self.existing(db)
+        if not any(p.name == MAX_PARTITION for p in existing):
+            logger.warning(f"{self.table} is not partitioned; run the migrations")
+            return {"created": 0, "dropped": 0}
+        to_create, to_drop = plan_partitions(
+            existing, current, self.period, self.ahead, self.retention_days
+        )
+        if to_create:
+            definitions = ", ".join(
+                f"PARTITION {p.name} VALUES LESS THAN ('{p.bound:%Y-%m-%d %H:%M:%S}')"
+                for p in to_create
+            )
+            db.execute(
+                text(
+                    f"ALTER TABLE {self.table} REORGANIZE PARTITION {MAX_PARTITION} "
+                    f"INTO ({definitions}, "
+                    f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE))"
+                )
+            )
+        if to_drop:
+            db.execute(
+                text(f"ALTER TABLE {self.table} DROP PARTITION {', '.join(to_drop)}")
+            )
+        return {"created": len(to_create), "dropped": len(to_drop)}
+
+    def _maintain(self, db: Session, current: datetime) -> Dict[str, int]:
+        if db.get_bind().dialect.name == "mysql":
+            counts = self._maintain_mysql(db, current)
+        else:
+            cutoff = current - timedelta(days=self.retention_days)
+            counts = {
+                "deleted": delete_in_chunks(
+                    db,
+                    APILogModel,
+                    APILogModel.created_at < cutoff,
+                    self.chunk_size,
+                )
+            }
+        rollup_cutoff = current - timedelta(days=self.rollup_retention_days)
+        counts["rollups_deleted"] = delete_in_chunks(
+            db,
+            APILogRollupModel,
+            APILogRollupModel.bucket < rollup_cutoff,
+            self.chunk_size,
+        )
+        return counts
+
+    def maintain(self) -> Dict[str, int]:
+        """Run maintenance unless another worker is already running it.
+        Every worker schedules this; on MySQL a named lock lets only one of
+        them reorganize partitions and trim rows at a time, so they don't
+        queue up behind each other's ALTER TABLE or race on the same
+        partitions. Returns an empty dict when the lock was taken."""
+        current = now().replace(tzinfo=None)
+        db = db_manager.get_session()
+        try:
+            bind = db.get_bind()
+            if bind.dialect.name != "mysql":
+                counts = self._maintain(db, current)
+            else:
+                # A connection of its own: the session hands its connection
+                # back to the pool on every chunk commit, and the lock
+                # belongs to the connection that took it
+                with bind.engine.connect() as lock_conn:
+                    params = {"name": MAINTENANCE_LOCK}
+                    acquired = lock_conn.execute(
+                        text("SELECT GET_LOCK(:name, 0)"), params
+                    ).scalar()
+                    if not acquired:
+                        logger.debug(f"{self.table} maintenance running elsewhere")
+                        return {}
+                    try:
+                        counts = self._maintain(db, current)
+                    finally:
+                        lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), params)
+        finally:
+            db.close()
+        if any(counts.values()):
+            logger.info(f"{self.table} maintenance: {counts}")
+        return counts
+
+
+api_log_partitions = APILogPartitions(
+    period=settings.API_LOG_PARTITION_PERIOD,
+    ahead=settings.API_LOG_PARTITIONS_AHEAD,
+    retention_days=settings.API_LOG_RETENTION_DAYS,
+    rollup_retention_days=settings.API_ROLLUP_RETENTION_DAYS,
+)
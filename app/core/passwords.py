@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import bcrypt
+from fastapi import HTTPException, status
+from app.config import settings
+from app.core.tracing import traced
+
+logger = logging.getLogger(__name__)
+BCRYPT_PREFIX = "$2b$"
+DEFAULT_ROUNDS = 12
+
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    try:
+        return bcrypt.checkpw(password, hashed)
+    except ValueError:
+        # Not a bcrypt hash at all
+        return False
+
+
+def hash_cost(hashed: str) -> int:
+    """Work factor of a bcrypt hash like $2b$12$..., or 0 if unparsable"""
+    parts = hashed.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return 0
+    return int(parts[2])
+
+
+def measure_rounds(rounds: int, samples: int = 3) -> float:
+    """Median seconds for one bcrypt verify at the given cost on this host"""
+    password = b"calibration-password"
+    hashed = _hashpw(password, rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        _checkpw(password, hashed)
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+class PasswordHasher:
+    """The one password hashing policy used by every code path"""
+
+    def __init__(self, rounds: int, min_rounds: int, max_rounds: int):
+        self.rounds = rounds
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+
+    def calibrate(self, target_ms: float) -> int:
+        """Pick the highest cost whose verify time stays within target_ms"""
+        elapsed = measure_rounds(self.min_rounds)
+        rounds = self.min_rounds
+        # Each extra round doubles the work, so extrapolate instead of
+        # timing every expensive level
+        while rounds < self.max_rounds and elapsed * 2 * 1000 <= target_ms:
+            rounds += 1
+            elapsed *= 2
+        self.rounds = rounds
+        logger.info(f"Password hash cost calibrated to {rounds} rounds")
+        return rounds
+
+    def hash(self, password: str) -> str:
+        return _hashpw(password.encode("utf-8"), self.rounds).decode("utf-8")
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return _checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        if not hashed.startswith(BCRYPT_PREFIX):
+            return True
+        # Workers calibrate independently and may land one round apart;
+        # tolerate that so hashes don't flip back and forth between them
+        return not self.rounds <= hash_cost(hashed) <= self.rounds + 1
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.PASSWORD_HASH_ROUNDS or DEFAULT_ROUNDS,
+    min_rounds=settings.PASSWORD_HASH_MIN_ROUNDS,
+    max_rounds=settings.PASSWORD_HASH_MAX_ROUNDS,
+)
+
+
+async def calibrate_password_hasher() -> None:
+    if settings.PASSWORD_HASH_ROUNDS:
+        return
+    await asyncio.to_thread(password_hasher.calibrate, settings.PASSWORD_HASH_TARGET_MS)
+
+
+class PasswordPool:
+    """Bounded process pool for bcrypt so hashing never blocks the event loop.
+
+    At most `workers` operations run at once; up to `max_queue` more wait
+    for a slot and anything beyond that is rejected with a 503.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn avoids forking a process that already runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+        if not self._semaphore.locked():
+            # A slot is free; this request doesn't wait, so it isn't queued
+            await self._semaphore.acquire()
+        else:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self.queued += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.queued -= 1
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    @traced("password.hash")
+    async def hash(self, password: str, rounds: Optional[int] = None) -> str:
+        hashed = await self._run(
+            _hashpw, password.encode("utf-8"), rounds or password_hasher.rounds
+        )
+        return hashed.decode("utf-8")
+
+    @traced("password.verify")
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(
+            _checkpw, password.encode("utf-8"), hashed.encode("utf-8")
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_POOL_WORKERS, max_queue=settings.PASSWORD_POOL_MAX_QUEUE
+)
@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# (file, function, first line)
+Frame = Tuple[str, str, int]
+# Leaf frames of threads that are just waiting for work; counting them
+# would bury the busy stacks under idle time
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class SamplingProfiler:
+    """Statistical wall-clock profiler for the current process.
+
+    A background thread snapshots every thread's Python stack each
+    `interval` seconds via sys._current_frames(), so profiled code runs
+    unmodified and the cost is one stack walk per thread per sample. Only
+    one profile runs at a time. With `codes`, only stacks passing through
+    one of those code objects are kept (e.g. a route's endpoint and the
+    dependencies only it uses).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def _stack(self, frame: Optional[FrameType]) -> List[Frame]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def sample(
+        self, seconds: float, interval: float, codes: Optional[FrozenSet[CodeType]]
+    ) -> "Profile":
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            own_thread = threading.get_ident()
+            stacks: Counter = Counter()
+            started = time.perf_counter()
+            deadline = started + seconds
+            samples = 0
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    if codes is not None and not _passes_through(frame, codes):
+                        continue
+                    stack = self._stack(frame)
+                    if not stack or _is_idle(stack[-1]):
+                        continue
+                    stacks[tuple(stack)] += 1
+                samples += 1
+                time.sleep(interval)
+            return Profile(stacks, interval, time.perf_counter() - started, samples)
+        finally:
+            self._lock.release()
+
+
+def _passes_through(frame: Optional[FrameType], codes: FrozenSet[CodeType]) -> bool:
+    while frame is not None:
+        if frame.f_code in codes:
+            return True
+        frame = frame.f_back
+    return False
+
+
+def _is_idle(leaf: Frame) -> bool:
+    return (os.path.basename(leaf[0]), leaf[1]) in IDLE_LEAVES
+
+
+def frame_name(frame: Frame) -> str:
+    filename, function, _ = frame
+    return f"{function} ({os.path.basename(filename)})"
+
+
+class Profile:
+    def __init__(self, stacks: Counter, interval: float, duration: float, samples: int):
+        self.stacks = stacks
+        self.interval = interval
+        self.duration = duration
+        self.samples = samples
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format, for flamegraph.pl / speedscope"""
+        lines = [
+            ";".join(frame_name(frame) for frame in stack) + f" {count}"
+            for stack, count in self.stacks.most_common()
+        ]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """https://www.speedscope.app/file-format-schema.json, one sampled
+        profile weighted in seconds"""
+        frames: List[Dict[str, Any]] = []
+        index: Dict[Frame, int] = {}
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        # Sleeping plus walking the stacks; a bit longer than `interval`
+        period = self.duration / max(self.samples, 1)
+        for stack, count in self.stacks.most_common():
+            sample = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append(
+                        {"name": frame[1], "file": frame[0], "line": frame[2]}
+                    )
+                sample.append(index[frame])
+            samples.append(sample)
+            weights.append(round(count * period, 6))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "app.core.profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 6),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+from app.config import settings
+from app.database import db_manager
+from app.libs.utils import now
+from app.models import RefreshSessionModel
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set: no false negatives, tunable false
+    positive rate, ~1.2 bytes per entry at 0.1%"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationList:
+    """Revoked session ids held in memory so access-token checks need no DB.
+
+    Every revoked id goes into a Bloom filter; the most recent ones are also
+    kept exactly. A Bloom hit that is not in the recent set is either an
+    older revocation or a false positive, and only then is `confirm`
+    consulted. Until the first rebuild succeeds every check is confirmed.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, recent_size: int):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.recent_size = recent_size
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.ready = False
+        self.synced_at: Optional[datetime] = None
+
+    def revoke(self, session_id: str) -> None:
+        with self._lock:
+            self._bloom.add(session_id)
+            self._recent[session_id] = None
+            self._recent.move_to_end(session_id)
+            while len(self._recent) > self.recent_size:
+                self._recent.popitem(last=False)
+
+    def rebuild(self, session_ids: Iterable[str], synced_at: datetime) -> None:
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        for session_id in session_ids:
+            bloom.add(session_id)
+        with self._lock:
+            # Revoked here while the query ran, so maybe not in `session_ids`
+            for session_id in self._recent:
+                bloom.add(session_id)
+            self._bloom = bloom
+            self.synced_at = synced_at
+            self.ready = True
+
+    def is_revoked(self, session_id: str, confirm: Callable[[str], bool]) -> bool:
+        if not self.ready:
+            return confirm(session_id)
+        if session_id not in self._bloom:
+            return False
+        if session_id in self._recent:
+            return True
+        return confirm(session_id)
+
+    @property
+    def needs_rebuild(self) -> bool:
+        # Past capacity the false positive rate climbs; start fresh
+        return not self.ready or self._bloom.count > self.capacity
+
+
+def session_revoked_in_db(session_id: str) -> bool:
+    db = db_manager.get_session()
+    try:
+        session = db.get(RefreshSessionModel, session_id)
+        return session is None or session.revoked_at is not None
+    finally:
+        db.close()
+
+
+def rebuild_revocation_list() -> None:
+    """Load every revoked session that could still have live access tokens"""
+    current_time = now().replace(tzinfo=None)
+    db = db_manager.get_session()
+    try:
+        rows = (
+            db.query(RefreshSessionModel.id)
+            .filter(
+                RefreshSessionModel.revoked_at.isnot(None),
+                RefreshSessionModel.expires_at > current_time,
+            )
+            .all()
+        )
+    finally:
+        db.close()
+    revocation_list.rebuild((row.id for row in rows), current_time)
+    logger.info(f"Revocation list rebuilt with {len(rows)} sessions")
+
+
+def sync_revocation_list() -> None:
+    """Pick up revocations made by other workers since the last sync"""
+    if revocation_list.needs_rebuild:
+        rebuild_revocation_list()
+        return
+    current_time = now().replace(tzinfo=None)
+    # Overlap the window a little to absorb clock skew between workers
+    since = revocation_list.synced_at - timedelta(seconds=5)
+    db = db_manager.get_session()
+    try:
+        rows = (
+            db.query(RefreshSessionModel.id)
+            .filter(RefreshSessionModel.revoked_at >= since)
+            .all()
+        )
+    finally:
+        db.close()
+    for row in rows:
+        revocation_list.revoke(row.id)
+    revocation_list.synced_at = current_time
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    recent_size=settings.REVOCATION_RECENT_SIZE,
+)
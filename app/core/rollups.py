@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+from app.libs.utils import generate_id
+from app.models import APILogRollupModel
+
+# (upper bound in ms, column); None is the overflow bucket
+LATENCY_BUCKETS: Tuple[Tuple[Optional[int], str], ...] = (
+    (5, "latency_le_5"),
+    (10, "latency_le_10"),
+    (25, "latency_le_25"),
+    (50, "latency_le_50"),
+    (100, "latency_le_100"),
+    (250, "latency_le_250"),
+    (500, "latency_le_500"),
+    (1000, "latency_le_1000"),
+    (2500, "latency_le_2500"),
+    (5000, "latency_le_5000"),
+    (None, "latency_le_inf"),
+)
+STATUS_COLUMNS = ("status_2xx", "status_3xx", "status_4xx", "status_5xx")
+COUNTER_COLUMNS = (
+    ("count", "latency_sum_ms")
+    + STATUS_COLUMNS
+    + tuple(column for _, column in LATENCY_BUCKETS)
+)
+KEY_COLUMNS = ("bucket", "method", "route")
+UNMATCHED_ROUTE = "(unmatched)"
+
+
+def latency_column(duration_ms: int) -> str:
+    for bound, column in LATENCY_BUCKETS:
+        if bound is None or duration_ms <= bound:
+            return column
+    return LATENCY_BUCKETS[-1][1]
+
+
+def rollup_rows(logs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate api_logs rows into one counter row per minute, method and
+    route"""
+    rollups: Dict[Tuple[datetime, str, str], Dict[str, Any]] = {}
+    for log in logs:
+        bucket = log["created_at"].replace(second=0, microsecond=0)
+        key = (bucket, log["method"], log.get("route") or UNMATCHED_ROUTE)
+        row = rollups.get(key)
+        if row is None:
+            row = dict(zip(KEY_COLUMNS, key))
+            row.update({column: 0 for column in COUNTER_COLUMNS})
+            rollups[key] = row
+        row["count"] += 1
+        status_class = f"status_{log['status_code'] // 100}xx"
+        if status_class in row:
+            row[status_class] += 1
+        duration_ms = log.get("duration_ms") or 0
+        row["latency_sum_ms"] += duration_ms
+        row[latency_column(duration_ms)] += 1
+    return list(rollups.values())
+
+
+def upsert_rollups(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Add the counters onto existing rows in one statement; concurrent
+    writers from other workers just add up. Rows go in key order so two
+    flushes touching the same keys lock them in the same order instead of
+    deadlocking on InnoDB's unique-index locks"""
+    if not rows:
+        return
+    table = APILogRollupModel.__table__
+    rows = sorted(rows, key=lambda row: tuple(row[key] for key in KEY_COLUMNS))
+    values = [{"id": generate_id(), **row} for row in rows]
+    if db.get_bind().dialect.name == "mysql":
+        mysql_insert = mysql.insert(table).values(values)
+        db.execute(
+            mysql_insert.on_duplicate_key_update(
+                {
+                    column: table.c[column] + mysql_insert.inserted[column]
+                    for column in COUNTER_COLUMNS
+                }
+            )
+        )
+    else:
+        sqlite_insert = sqlite.insert(table).values(values)
+        db.execute(
+            sqlite_insert.on_conflict_do_update(
+                index_elements=list(KEY_COLUMNS),
+                set_={
+                    column: table.c[column] + sqlite_insert.excluded[column]
+                    for column in COUNTER_COLUMNS
+                },
+            )
+        )
+
+
+def percentile(counts: Sequence[int], q: float) -> Optional[float]:
+    """Estimate a latency percentile in ms from per-bucket counts, by
+    linear interpolation inside the bucket it falls in"""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    lower = 0
+    for (bound, _), count in zip(LATENCY_BUCKETS, counts):
+        if count and seen + count >= rank:
+            if bound is None:
+                # Past the last bound all we know is the lower edge
+                return float(lower)
+            return lower + (bound - lower) * (rank - seen) / count
+        seen += count
+        lower = bound if bound is not None else lower
+    return float(lower)
@@ -0,0 +1,75 @@
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Type
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import db_manager
+from app.libs.utils import now
+from app.models import EmailOutboxModel, PasswordResetModel, RefreshSessionModel
+
+logger = logging.getLogger(__name__)
+# Each has an indexed expires_at; past it a row is dead
+SWEPT_MODELS = (PasswordResetModel, RefreshSessionModel)
+
+
+def delete_in_chunks(
+    db: Session, model_class: Type[Any], condition: Any, chunk_size: int
+) -> int:
+    """Delete rows matching `condition` in small batches, committing after
+    each so no single statement holds locks on a large range"""
+    deleted = 0
+    while True:
+        ids = [
+            row.id
+            for row in db.query(model_class.id).filter(condition).limit(chunk_size)
+        ]
+        if not ids:
+            break
+        db.query(model_class).filter(model_class.id.in_(ids)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        deleted += len(ids)
+        if len(ids) < chunk_size:
+            break
+    return deleted
+
+
+def delete_expired(db: Session, model_class: Type[Any], chunk_size: int) -> int:
+    """Delete rows past expires_at"""
+    cutoff = now().replace(tzinfo=None)
+    return delete_in_chunks(
+        db, model_class, model_class.expires_at < cutoff, chunk_size
+    )
+
+
+def delete_finished_emails(db: Session, retention: timedelta, chunk_size: int) -> int:
+    """Delete outbox rows that were sent or given up on more than
+    `retention` ago; updated_at is when they reached that state"""
+    cutoff = now().replace(tzinfo=None) - retention
+    return delete_in_chunks(
+        db,
+        EmailOutboxModel,
+        EmailOutboxModel.status.in_(("sent", "failed"))
+        & (EmailOutboxModel.updated_at < cutoff),
+        chunk_size,
+    )
+
+
+def sweep_expired_auth_state(
+    chunk_size: int = settings.AUTH_SWEEP_CHUNK_SIZE,
+) -> Dict[str, int]:
+    db = db_manager.get_session()
+    try:
+        counts = {
+            model_class.__tablename__: delete_expired(db, model_class, chunk_size)
+            for model_class in SWEPT_MODELS
+        }
+        counts[EmailOutboxModel.__tablename__] = delete_finished_emails(
+            db, timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS), chunk_size
+        )
+    finally:
+        db.close()
+    if any(counts.values()):
+        logger.info(f"Swept expired auth state: {counts}")
+    return counts
@@ -0,0 +1,159 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+from app.config import settings
+
+try:
+    import fcntl
+
+    HAVE_FCNTL = True
+except ImportError:  # pragma: no cover - Windows; throttle stays per process
+    HAVE_FCNTL = False
+
+# fingerprint, blocked_until, last_failure (epoch seconds), failures
+SLOT = struct.Struct("<QIIH2x")
+BUCKET_SIZE = 4
+
+
+class LoginThrottle:
+    """Failed-login tracker in a fixed-size table of 20-byte slots.
+
+    Keys are stored as 64-bit fingerprints in 4-way buckets; when a bucket
+    is full an unblocked entry with the oldest failure is overwritten, so
+    memory never grows no matter how many distinct emails or IPs are tried.
+    Fingerprints are keyed with `secret`, so nobody can work out offline
+    which keys share a victim's bucket. With `path` set (e.g. under
+    /dev/shm) the table is a shared mmap and every worker on the host sees
+    the same counts; they must then share the secret too.
+
+    After `free_failures` failures a key is blocked for base_delay, doubling
+    with each further failure up to max_delay. Failures older than
+    reset_after are forgotten.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        secret: bytes,
+        path: str = "",
+        base_delay: float = 1,
+        max_delay: float = 900,
+        reset_after: float = 900,
+    ):
+        self.buckets = max(1, slots // BUCKET_SIZE)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.reset_after = reset_after
+        self._secret = hashlib.blake2b(secret, digest_size=32).digest()
+        size = self.buckets * BUCKET_SIZE * SLOT.size
+        self._fd: Optional[int] = None
+        if path:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+        else:
+            self._map = mmap.mmap(-1, size)
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8, key=self._secret).digest()
+        # 0 marks an empty slot
+        return int.from_bytes(digest, "little") or 1
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            if self._fd is not None and HAVE_FCNTL:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if self._fd is not None and HAVE_FCNTL:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _slots(self, fingerprint: int) -> range:
+        start = (fingerprint % self.buckets) * BUCKET_SIZE * SLOT.size
+        return range(start, start + BUCKET_SIZE * SLOT.size, SLOT.size)
+
+    def _find(self, fingerprint: int) -> Optional[int]:
+        for offset in self._slots(fingerprint):
+            if SLOT.unpack_from(self._map, offset)[0] == fingerprint:
+                return offset
+        return None
+
+    def _claim(self, fingerprint: int, current: int) -> int:
+        """The key's slot, else the bucket's least valuable one: empty slots
+        (no failure at all) and unblocked ones by oldest failure first, and
+        a blocked slot only when all four are blocked, the one whose block
+        ends soonest"""
+        offset = self._find(fingerprint)
+        if offset is not None:
+            return offset
+
+        def value(offset: int) -> Tuple[bool, int]:
+            _, blocked_until, last_failure, _ = SLOT.unpack_from(self._map, offset)
+            if blocked_until > current:
+                return True, blocked_until
+            return False, last_failure
+
+        return min(self._slots(fingerprint), key=value)
+
+    def _read(self, key: str) -> Tuple[Optional[int], int, int, int]:
+        offset = self._find(self._fingerprint(key))
+        if offset is None:
+            return None, 0, 0, 0
+        _, blocked_until, last_failure, failures = SLOT.unpack_from(self._map, offset)
+        return offset, blocked_until, last_failure, failures
+
+    def retry_after(self, key: str) -> int:
+        """Seconds until the key may try again, 0 if it is not blocked"""
+        with self._locked():
+            _, blocked_until, _, _ = self._read(key)
+        return max(0, blocked_until - int(time.time()))
+
+    def record_failure(self, key: str, free_failures: int) -> int:
+        """Count a failure; returns the resulting block in seconds"""
+        current = int(time.time())
+        fingerprint = self._fingerprint(key)
+        with self._locked():
+            offset = self._claim(fingerprint, current)
+            stored, _, last_failure, failures = SLOT.unpack_from(self._map, offset)
+            if stored != fingerprint or current - last_failure > self.reset_after:
+                failures = 0
+            failures = min(failures + 1, 0xFFFF)
+            blocked_until = 0
+            if failures >= free_failures:
+                delay = min(
+                    self.max_delay,
+                    self.base_delay * 2 ** min(failures - free_failures, 30),
+                )
+                blocked_until = current + int(delay)
+            SLOT.pack_into(
+                self._map, offset, fingerprint, blocked_until, current, failures
+            )
+        return max(0, blocked_until - current)
+
+    def reset(self, key: str) -> None:
+        with self._locked():
+            offset, _, _, _ = self._read(key)
+            if offset is not None:
+                SLOT.pack_into(self._map, offset, 0, 0, 0, 0)
+
+
+login_throttle = LoginThrottle(
+    slots=settings.LOGIN_THROTTLE_SLOTS,
+    # Derived from the access token key(s) so every worker sharing the table
+    # uses the same one; without keys (dev) it is random per process
+    secret=(settings.ACCESS_JWT_KEY + settings.ACCESS_JWT_KEYS).encode()
+    or os.urandom(32),
+    path=settings.LOGIN_THROTTLE_PATH,
+    base_delay=settings.LOGIN_THROTTLE_BASE_SECONDS,
+    max_delay=settings.LOGIN_THROTTLE_MAX_SECONDS,
+    reset_after=settings.LOGIN_THROTTLE_RESET_SECONDS,
+)
@@ -0,0 +1,160 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Iterator, Optional
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class Timings:
+    """Phase durations (seconds) of one request, for Server-Timing"""
+
+    __slots__ = ("phases", "queries", "endpoint_started", "endpoint_finished")
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self.queries = 0
+        self.endpoint_started: Optional[float] = None
+        self.endpoint_finished: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self, total: float) -> str:
+        parts = []
+        for name, seconds in self.phases.items():
+            part = f"{name};dur={seconds * 1000:.1f}"
+            if name == "db":
+                part += f';desc="{self.queries} queries"'
+            parts.append(part)
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+# Set only while Server-Timing is on for the request; everything below is a
+# no-op otherwise. Sync endpoints run in a copy of the context, which still
+# points at the same Timings object.
+_current: ContextVar[Optional[Timings]] = ContextVar("server_timing", default=None)
+
+
+def start_timing() -> Token:
+    return _current.set(Timings())
+
+
+def current_timings() -> Optional[Timings]:
+    return _current.get()
+
+
+def stop_timing(token: Token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the time spent in the block to phase `name` of the request"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def time_queries(engine: Engine) -> None:
+    """Count SQL time into the "db" phase"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        if _current.get() is not None:
+            setattr(context, "_timing_started", time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        timings = _current.get()
+        started = getattr(context, "_timing_started", None)
+        if timings is not None and started is not None:
+            timings.add("db", time.perf_counter() - started)
+            timings.queries += 1
+
+
+def _timed_endpoint(call: Callable) -> Callable:
+    if inspect.isasyncgenfunction(call) or inspect.isgeneratorfunction(call):
+        # Streaming endpoints; their time is in the response body
+        return call
+
+    def mark(timings: Optional[Timings], started: float) -> None:
+        if timings is not None:
+            timings.endpoint_started = started
+            timings.endpoint_finished = time.perf_counter()
+            timings.add("endpoint", timings.endpoint_finished - started)
+
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def endpoint(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                mark(_current.get(), started)
+
+    else:
+
+        @functools.wraps(call)
+        def endpoint(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                mark(_current.get(), started)
+
+    return endpoint
+
+
+class TimedRoute(APIRoute):
+    """Splits a route's time into dependency resolution ("deps"), the
+    endpoint itself and response-model validation and serialization
+    ("serialize")"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any) -> None:
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            timings = _current.get()
+            if timings is None:
+                return await handler(request)
+            started = time.perf_counter()
+            response = await handler(request)
+            endpoint_started = timings.endpoint_started
+            endpoint_finished = timings.endpoint_finished
+            if endpoint_started is not None and endpoint_finished is not None:
+                timings.add("deps", endpoint_started - started)
+                timings.add("serialize", time.perf_counter() - endpoint_finished)
+            return response
+
+        return timed_handler
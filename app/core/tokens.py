@@ -0,0 +1,152 @@
+import json
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+from jwcrypto import jwk, jwt
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.tracing import traced
+
+# jwe: HS256 JWS nested in an A256KW/A256CBC-HS512 JWE (claims are hidden)
+# hs256 / eddsa: signed only, one crypto operation per issue and verify
+TOKEN_FORMATS = ("jwe", "hs256", "eddsa")
+SIGNING_ALGS = {"jwe": "HS256", "hs256": "HS256", "eddsa": "EdDSA"}
+JWE_ALGS = ["A256KW", "A256CBC-HS512"]
+
+
+class InvalidTokenError(ValueError):
+    pass
+
+
+class Keyring:
+    """Keys by kid. The active kid issues new tokens, every kid still verifies,
+    so a key can be rotated out once tokens signed with it have expired."""
+
+    def __init__(self, keys: Dict[str, Dict[str, Any]], active_kid: str):
+        if active_kid not in keys:
+            raise ValueError(f"Active key id '{active_kid}' is not in the keyring")
+        self.active_kid = active_kid
+        self.keyset = jwk.JWKSet()
+        for kid, params in keys.items():
+            self.keyset.add(jwk.JWK(**{**params, "kid": kid}))
+
+    @classmethod
+    def from_config(
+        cls, key_json: str, keyring_json: str = "", active_kid: str = ""
+    ) -> "Keyring":
+        if keyring_json:
+            keys = json.loads(keyring_json)
+            return cls(keys, active_kid or next(iter(keys)))
+        if not key_json:
+            raise ValueError("JWT key not configured")
+        params = json.loads(key_json)
+        kid = active_kid or params.get("kid") or "default"
+        return cls({kid: params}, kid)
+
+    @property
+    def active_key(self) -> jwk.JWK:
+        return self.keyset.get_key(self.active_kid)
+
+
+class TokenService:
+    """Issues and verifies tokens in the configured format, caching verified
+    claims until the token's exp"""
+
+    def __init__(
+        self,
+        load_keyring: Callable[[], Keyring],
+        token_format: str = "jwe",
+        cache_size: int = 10000,
+        cache_ttl: float = 300,
+    ):
+        if token_format not in TOKEN_FORMATS:
+            raise ValueError(f"Unknown token format '{token_format}'")
+        self.token_format = token_format
+        self._load_keyring = load_keyring
+        self._keyring: Optional[Keyring] = None
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    @property
+    def keyring(self) -> Keyring:
+        # Loaded on first use so importing the app never needs the keys
+        if self._keyring is None:
+            self._keyring = self._load_keyring()
+        return self._keyring
+
+    def span_attributes(self) -> Dict[str, Any]:
+        return {"token.format": self.token_format}
+
+    @traced("token.issue", lambda self, *args, **kwargs: self.span_attributes())
+    def issue(self, claims: Dict[str, Any], expires_in: timedelta) -> str:
+        issued_at = int(time.time())
+        payload = {
+            **claims,
+            "iat": issued_at,
+            "exp": issued_at + int(expires_in.total_seconds()),
+        }
+        kid = self.keyring.active_kid
+        key = self.keyring.active_key
+        token = jwt.JWT(
+            header={"alg": SIGNING_ALGS[self.token_format], "kid": kid},
+            claims=payload,
+        )
+        token.make_signed_token(key)
+        if self.token_format != "jwe":
+            return token.serialize()
+        encrypted_token = jwt.JWT(
+            header={"alg": JWE_ALGS[0], "enc": JWE_ALGS[1], "kid": kid},
+            claims=token.serialize(),
+        )
+        encrypted_token.make_encrypted_token(key)
+        return encrypted_token.serialize()
+
+    @traced("token.decode", lambda self, *args, **kwargs: self.span_attributes())
+    def _decode(self, token: str) -> Dict[str, Any]:
+        keyset = self.keyring.keyset
+        try:
+            # Compact JWE has five segments, JWS three; accept both so the
+            # format can be switched without logging everyone out
+            if token.count(".") == 4:
+                outer = jwt.JWT(
+                    key=keyset, jwt=token, algs=JWE_ALGS, expected_type="JWE"
+                )
+                token = outer.claims
+            inner = jwt.JWT(
+                key=keyset,
+                jwt=token,
+                algs=list(set(SIGNING_ALGS.values())),
+                expected_type="JWS",
+            )
+            return json.loads(inner.claims)
+        except Exception as e:
+            raise InvalidTokenError(str(e)) from e
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        if not token or not isinstance(token, str):
+            raise InvalidTokenError("Invalid token format")
+        claims = self.cache.get(token)
+        if claims is None:
+            claims = self._decode(token)
+            exp = claims.get("exp")
+            self.cache.set(
+                token, claims, expires_at=float(exp) if exp is not None else None
+            )
+        return dict(claims)
+
+
+access_tokens = TokenService(
+    lambda: Keyring.from_config(
+        settings.ACCESS_JWT_KEY, settings.ACCESS_JWT_KEYS, settings.ACCESS_JWT_KID
+    ),
+    token_format=settings.TOKEN_FORMAT,
+    cache_size=settings.TOKEN_CACHE_SIZE,
+    cache_ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+refresh_tokens = TokenService(
+    lambda: Keyring.from_config(
+        settings.REFRESH_JWT_KEY, settings.REFRESH_JWT_KEYS, settings.REFRESH_JWT_KID
+    ),
+    token_format=settings.TOKEN_FORMAT,
+    cache_size=settings.TOKEN_CACHE_SIZE,
+    cache_ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
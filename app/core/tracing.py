@@ -0,0 +1,271 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """One timed operation, following the OpenTelemetry span model. Exported
+    with OTLP/JSON field names, attributes kept as a flat mapping."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "name",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str] = None,
+        kind: str = "INTERNAL",
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": (
+                {"code": "STATUS_CODE_ERROR", "message": self.error}
+                if self.error is not None
+                else {"code": "STATUS_CODE_UNSET"}
+            ),
+        }
+
+
+class MemoryExporter:
+    """Keeps the most recent finished spans in memory"""
+
+    def __init__(self, maxlen: int = 10000):
+        self.spans: Deque[Span] = deque(maxlen=maxlen)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def flush(self) -> None:
+        pass
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class JSONLExporter:
+    """Buffers finished spans and appends them to a JSON-lines file, one
+    span per line, on each flush.
+
+    At most `capacity` spans wait between flushes; past that they are
+    dropped and counted. The file is rotated to `<path>.1` once it grows
+    past `max_bytes`.
+    """
+
+    def __init__(self, path: str, capacity: int, max_bytes: int):
+        self.path = path
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self._buffer: Deque[Span] = deque()
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def export(self, span: Span) -> None:
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+            return
+        self._buffer.append(span)
+
+    def flush(self) -> None:
+        with self._lock:
+            spans: List[Span] = []
+            while self._buffer:
+                spans.append(self._buffer.popleft())
+            if not spans:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if (
+                os.path.exists(self.path)
+                and os.path.getsize(self.path) >= self.max_bytes
+            ):
+                os.replace(self.path, f"{self.path}.1")
+            lines = "".join(
+                json.dumps(span.to_dict(), default=str) + "\n" for span in spans
+            )
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            self.written += len(spans)
+
+
+Exporter = Union[MemoryExporter, JSONLExporter]
+# Marks the rest of a request that was not sampled, so its inner spans don't
+# start traces of their own
+NOT_SAMPLED = object()
+_current: ContextVar[Any] = ContextVar("trace_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header"""
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class Tracer:
+    """Head-sampled tracing: whether a trace is recorded is decided once,
+    when its first span starts (or by the caller's traceparent), and
+    everything below an unsampled span costs one ContextVar lookup"""
+
+    def __init__(self, exporter: Exporter, sample_rate: float, enabled: bool = True):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+
+    def current_span(self) -> Optional[Span]:
+        span = _current.get()
+        return span if isinstance(span, Span) else None
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = "INTERNAL",
+        traceparent: Optional[str] = None,
+    ) -> Iterator[Optional[Span]]:
+        parent = _current.get()
+        if not self.enabled or parent is NOT_SAMPLED:
+            yield None
+            return
+        if isinstance(parent, Span):
+            span = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+        else:
+            remote = parse_traceparent(traceparent)
+            if remote is not None:
+                trace_id, parent_span_id, sampled = remote
+            else:
+                trace_id, parent_span_id = f"{random.getrandbits(128):032x}", None
+                sampled = random.random() < self.sample_rate
+            if not sampled:
+                token = _current.set(NOT_SAMPLED)
+                try:
+                    yield None
+                finally:
+                    _current.reset(token)
+                return
+            span = Span(name, trace_id, parent_span_id, kind, attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = time.time_ns()
+            self.exporter.export(span)
+
+    def flush(self) -> None:
+        try:
+            self.exporter.flush()
+        except Exception as e:
+            logger.error(f"Span export failed: {e}")
+
+
+def create_exporter() -> Exporter:
+    if settings.TRACING_EXPORTER == "memory":
+        return MemoryExporter(settings.TRACING_BUFFER_SIZE)
+    return JSONLExporter(
+        settings.TRACING_FILE,
+        capacity=settings.TRACING_BUFFER_SIZE,
+        max_bytes=settings.TRACING_FILE_MAX_BYTES,
+    )
+
+
+tracer = Tracer(
+    create_exporter(),
+    sample_rate=settings.TRACING_SAMPLE_RATE,
+    enabled=settings.TRACING_ENABLED,
+)
+
+
+def traced(
+    name: str, attributes: Optional[Callable[..., Dict[str, Any]]] = None
+) -> Callable:
+    """Run the decorated function (sync or async) inside a span; `attributes`
+    gets the call's arguments and returns span attributes"""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.span(name) as span:
+                    if span is not None and attributes:
+                        span.attributes.update(attributes(*args, **kwargs))
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(name) as span:
+                if span is not None and attributes:
+                    span.attributes.update(attributes(*args, **kwargs))
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,22 +1,196 @@
+import asyncio
 import smtplib
+import threading
+import time
+from contextlib import contextmanager
 from email.mime.text import MIMEText
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from app.config import settings
 from app.core.error_handler import handle_errors
+from app.core.tracing import traced
 
+# (recipients, subject, html_body)
+Email = Tuple[List[str], str, str]
 
-@handle_errors
-def send_email(recipients: List[str], subject: str, html_body: str) -> bool:
-    if not settings.SMTP_USER or not settings.SMTP_PASSWORD:
-        raise ValueError("Email credentials not configured")
-    if not recipients:
-        raise ValueError("No recipients specified")
+
+def build_message(recipients: List[str], subject: str, html_body: str) -> MIMEText:
     msg = MIMEText(html_body, "html")
     msg["From"] = settings.SMTP_USER
     msg["To"] = ", ".join(recipients)
     msg["Subject"] = subject
-    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-        server.starttls()
-        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-        server.sendmail(settings.SMTP_USER, recipients, msg.as_string())
+    return msg
+
+
+class SMTPPool:
+    """Keeps authenticated SMTP sessions open so connect + STARTTLS + AUTH
+    happen once per session instead of once per message.
+
+    At most `size` sessions exist. Idle sessions older than `idle_timeout`
+    are closed rather than reused, since servers drop them anyway, and a
+    session the server has already dropped is replaced transparently.
+    """
+
+    def __init__(self, size: int, idle_timeout: float, timeout: float):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connects = 0
+        self.sent = 0
+        self.in_use = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            settings.SMTP_HOST, settings.SMTP_PORT, timeout=self.timeout
+        )
+        try:
+            if settings.SMTP_STARTTLS:
+                server.starttls()
+            if settings.SMTP_PASSWORD:
+                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        self.connects += 1
+        return server
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        expired = []
+        server = None
+        with self._lock:
+            while self._idle:
+                candidate, last_used = self._idle.pop()
+                if time.monotonic() - last_used < self.idle_timeout:
+                    server = candidate
+                    break
+                expired.append(candidate)
+        for candidate in expired:
+            self._quit(candidate)
+        return server or self._connect()
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        self._slots.acquire()
+        with self._lock:
+            self.in_use += 1
+        server = None
+        try:
+            server = self._checkout()
+            yield server
+        except Exception:
+            # The session state is unknown after an error; don't reuse it
+            if server is not None:
+                self._quit(server)
+                server = None
+            raise
+        finally:
+            with self._lock:
+                if server is not None:
+                    self._idle.append((server, time.monotonic()))
+                self.in_use -= 1
+            self._slots.release()
+
+    def send_many(self, emails: List[Email]) -> List[Optional[Exception]]:
+        """Send over one session; returns None or the error for each email.
+
+        A message the server rejects doesn't stop the rest of the batch.
+        If the session drops it is reopened once and the batch resumes.
+        """
+        results: List[Optional[Exception]] = []
+        pending = list(emails)
+        for attempt in range(2):
+            try:
+                with self.connection() as server:
+                    while pending:
+                        recipients, subject, html_body = pending[0]
+                        msg = build_message(recipients, subject, html_body)
+                        try:
+                            server.sendmail(
+                                settings.SMTP_USER, recipients, msg.as_string()
+                            )
+                        except (
+                            smtplib.SMTPRecipientsRefused,
+                            smtplib.SMTPSenderRefused,
+                            smtplib.SMTPDataError,
+                        ) as e:
+                            server.rset()
+                            results.append(e)
+                        else:
+                            self.sent += 1
+                            results.append(None)
+                        pending.pop(0)
+                return results
+            except smtplib.SMTPServerDisconnected:
+                if attempt:
+                    raise
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._quit(server)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "idle": len(self._idle),
+            "connects": self.connects,
+            "sent": self.sent,
+        }
+
+
+smtp_pool = SMTPPool(
+    size=settings.SMTP_POOL_SIZE,
+    idle_timeout=settings.SMTP_IDLE_TIMEOUT_SECONDS,
+    timeout=settings.SMTP_TIMEOUT_SECONDS,
+)
+
+
+def _check_config(emails: List[Email]) -> None:
+    if not settings.SMTP_USER or (
+        settings.SMTP_STARTTLS and not settings.SMTP_PASSWORD
+    ):
+        raise ValueError("Email credentials not configured")
+    if any(not recipients for recipients, _, _ in emails):
+        raise ValueError("No recipients specified")
+
+
+@handle_errors
+@traced(
+    "email.send",
+    lambda recipients, *args, **kwargs: {"email.recipients": len(recipients)},
+)
+def send_email(recipients: List[str], subject: str, html_body: str) -> bool:
+    email = (recipients, subject, html_body)
+    _check_config([email])
+    error = smtp_pool.send_many([email])[0]
+    if error is not None:
+        raise error
     return True
+
+
+@handle_errors
+@traced("email.send_batch", lambda emails, **kwargs: {"email.count": len(emails)})
+def send_emails(emails: List[Email]) -> List[Optional[Exception]]:
+    """Send a batch over a single pooled session"""
+    _check_config(emails)
+    return smtp_pool.send_many(emails)
+
+
+async def send_email_async(recipients: List[str], subject: str, html_body: str) -> bool:
+    return await asyncio.to_thread(send_email, recipients, subject, html_body)
+
+
+async def send_emails_async(emails: List[Email]) -> List[Optional[Exception]]:
+    return await asyncio.to_thread(send_emails, emails)
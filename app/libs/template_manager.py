@@ -1,20 +1,52 @@
+import logging
 import os
-from jinja2 import Environment, FileSystemLoader
+from typing import Any, Dict, List
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from app.config import settings
 from app.core.error_handler import handle_errors
 
+logger = logging.getLogger(__name__)
+
 
 class EmailTemplateManager:
     def __init__(self):
         template_dir = os.path.join(
             os.path.dirname(__file__), "..", "templates", "email"
         )
-        self.env = Environment(loader=FileSystemLoader(template_dir))
+        cache_dir = settings.EMAIL_TEMPLATE_CACHE_DIR or None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        # Outside DEBUG templates never change while running, so skip the
+        # per-render stat() and keep every compiled template in memory;
+        # compiled bytecode on disk spares recompiling on each restart
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            auto_reload=settings.DEBUG,
+            cache_size=-1,
+            bytecode_cache=FileSystemBytecodeCache(cache_dir),
+        )
+
+    def precompile(self) -> int:
+        """Compile every template up front instead of on the first email"""
+        names = self.env.list_templates(extensions=["html"])
+        for name in names:
+            self.env.get_template(name)
+        logger.info(f"Precompiled {len(names)} email templates")
+        return len(names)
 
     @handle_errors
     def render_template(self, template_name: str, **kwargs) -> str:
         template = self.env.get_template(f"{template_name}.html")
         return template.render(**kwargs)
 
+    @handle_errors
+    def render_many(
+        self, template_name: str, contexts: List[Dict[str, Any]]
+    ) -> List[str]:
+        """Render one body per recipient context with a single lookup"""
+        template = self.env.get_template(f"{template_name}.html")
+        return [template.render(**context) for context in contexts]
+
 
 template_manager = EmailTemplateManager()
 
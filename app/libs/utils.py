@@ -1,17 +1,16 @@
 import os
 import random
 import secrets
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import string
 from uuid import uuid4
 from typing import Dict, Any, Optional, Union, List
 from fastapi import HTTPException, status
 import phonenumbers
 from sqlalchemy import inspect
-from jwcrypto import jwk, jwt
 from app.config import settings
-import json
-import bcrypt
+from app.core.passwords import password_hasher
+from app.core.tokens import access_tokens
 import logging
 
 logger = logging.getLogger(__name__)
@@ -95,23 +94,22 @@ def change_date_format(date: datetime) -> str:
     return formatted_date
 
 
+def decode_token(token: str) -> Dict[str, Any]:
+    """Verify an access token, reusing cached claims"""
+    return access_tokens.verify(token)
+
+
 def get_token(admin_user_id: str, email: str, user_type: str) -> str:
     claims = {
         "id": admin_user_id,
+        "sub": admin_user_id,
         "email": email,
         "type": user_type,
         "time": str(now()),
     }
-    # Create a signed token with the generated key
-    key = jwk.JWK(**json.loads(settings.ACCESS_JWT_KEY))
-    token = jwt.JWT(header={"alg": "HS256"}, claims=claims)
-    token.make_signed_token(key)
-    # Further encrypt the token with the same key
-    encrypted_token = jwt.JWT(
-        header={"alg": "A256KW", "enc": "A256CBC-HS512"}, claims=token.serialize()
+    return access_tokens.issue(
+        claims, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    encrypted_token.make_encrypted_token(key)
-    return encrypted_token.serialize()
 
 
 def validate_token(token: str) -> Dict[str, Any]:
@@ -120,13 +118,7 @@ def validate_token(token: str) -> Dict[str, Any]:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token format"
             )
-        key = jwk.JWK(**json.loads(settings.ACCESS_JWT_KEY))
-        # Decrypt the outer JWE
-        outer = jwt.JWT(key=key, jwt=token, expected_type="JWE")
-        # Decode the inner signed JWT
-        inner = jwt.JWT(key=key, jwt=outer.claims)
-        claims: Dict[str, Any] = json.loads(inner.claims)
-        return claims
+        return decode_token(token)
     except HTTPException:
         raise
     except Exception as e:
@@ -142,10 +134,7 @@ def get_user_type(token: str) -> str:
 
 
 def create_password(password: str) -> str:
-    password = password.encode("utf-8")
-    password = bcrypt.hashpw(password, bcrypt.gensalt(4))
-    password = password.decode("utf-8")
-    return password
+    return password_hasher.hash(password)
 
 
 def generate_order_code() -> str:
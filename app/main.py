@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -5,12 +6,48 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 
 from app.routers.admin import api as admin
+from app.routers.monitoring import api as monitoring
+from app.routers.admin.crud.auth_mod.crud import principal_cache
 from app.config import settings
 from app.core.logger import setup_logging
 from app.core.error_handler import global_exception_handler
+from app.core.background import scheduler
+from app.core.counters import auth_counters
+from app.core.events import event_broker
+from app.core.health import health_monitor
+from app.core.metrics import (
+    API_LOGS_DROPPED,
+    CONCURRENCY_LIMIT,
+    LOAD_SHED,
+    REQUESTS_COALESCED,
+    mark_process_dead,
+    measure_event_loop_lag,
+    stats_exporter,
+)
+from app.core.outbox import email_outbox
+from app.core.partitions import api_log_partitions
+from app.core.passwords import calibrate_password_hasher, password_pool
+from app.core.revocation import rebuild_revocation_list, sync_revocation_list
+from app.core.sweeper import sweep_expired_auth_state
+from app.core.tokens import access_tokens, refresh_tokens
+from app.core.tracing import tracer
+from app.libs.emails import smtp_pool
+from app.middleware.api_logging import api_log_writer, setup_api_logging
+from app.middleware.concurrency import concurrency_limiter, setup_concurrency_limit
+from app.middleware.metrics import setup_metrics
+from app.middleware.server_timing import setup_server_timing
+from app.middleware.tracing import setup_tracing
+from app.middleware.rate_limit import (
+    invalid_tokens,
+    rate_limit_store,
+    setup_rate_limiting,
+)
+from app.middleware.singleflight import setup_singleflight, singleflight
+from app.libs.template_manager import template_manager
 from app.database import db_manager
 from app.project_info import PROJECT_NAME, PROJECT_DESCRIPTION, PROJECT_VERSION
 
@@ -21,9 +58,66 @@ logger = logging.getLogger("app.main")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    await calibrate_password_hasher()
+    template_manager.precompile()
+    try:
+        await asyncio.to_thread(rebuild_revocation_list)
+    except Exception as e:
+        # Checks fall back to the database until a sync succeeds
+        logger.error(f"Revocation list rebuild failed: {e}")
+    scheduler.add(
+        "revocation-sync", settings.REVOCATION_SYNC_SECONDS, sync_revocation_list
+    )
+    scheduler.add(
+        "health-check",
+        settings.HEALTH_CHECK_SECONDS,
+        health_monitor.refresh,
+        run_immediately=True,
+    )
+    scheduler.add("auth-counter-prune", 300, auth_counters.prune)
+    scheduler.add("rate-limit-prune", 300, rate_limit_store.prune)
+    scheduler.add("auth-sweeper", settings.AUTH_SWEEP_SECONDS, sweep_expired_auth_state)
+    scheduler.add(
+        "api-log-partitions",
+        settings.API_LOG_MAINTENANCE_SECONDS,
+        api_log_partitions.maintain,
+        run_immediately=True,
+    )
+    for worker in range(settings.EMAIL_OUTBOX_WORKERS):
+        scheduler.add(
+            f"email-outbox-{worker}",
+            settings.EMAIL_OUTBOX_POLL_SECONDS,
+            email_outbox.deliver_pending,
+        )
+    if settings.TRACING_ENABLED:
+        scheduler.add("trace-export", settings.TRACING_FLUSH_SECONDS, tracer.flush)
+    if settings.METRICS_ENABLED:
+        stats_exporter.track_cache("access_token", access_tokens.cache)
+        stats_exporter.track_cache("refresh_token", refresh_tokens.cache)
+        stats_exporter.track_cache("principal", principal_cache)
+        stats_exporter.track_cache("invalid_token", invalid_tokens)
+        stats_exporter.track_counter(LOAD_SHED, lambda: concurrency_limiter.rejected)
+        stats_exporter.track_counter(REQUESTS_COALESCED, lambda: singleflight.coalesced)
+        stats_exporter.track_counter(API_LOGS_DROPPED, lambda: api_log_writer.dropped)
+        stats_exporter.track_gauge(CONCURRENCY_LIMIT, lambda: concurrency_limiter.limit)
+        scheduler.add(
+            "metrics-refresh", settings.METRICS_REFRESH_SECONDS, stats_exporter.refresh
+        )
+        scheduler.add("event-loop-lag", 1, measure_event_loop_lag)
+    scheduler.start()
+    api_log_writer.start()
     yield
     # Shutdown
+    await scheduler.stop()
+    # Write out buffered request logs before the pool goes away
+    await api_log_writer.stop()
+    tracer.flush()
+    event_broker.close()
+    password_pool.shutdown()
+    smtp_pool.close()
+    await rate_limit_store.close()
     db_manager.close()
+    mark_process_dead()
 
 
 app = FastAPI(
@@ -34,6 +128,19 @@ app = FastAPI(
     redoc_url=None,
     lifespan=lifespan,
 )
+# Load shedding sits closest to the routers so only admitted requests hold
+# a slot, and coalesced GETs wait outside it. Rate limiting still counts
+# every request; all of them run inside the host check and CORS so
+# 429/503 responses carry CORS headers
+setup_concurrency_limit(app)
+setup_singleflight(app)
+setup_rate_limiting(app)
+# Outermost of these so 429 and 503 rejections are logged too
+setup_api_logging(app)
+setup_tracing(app)
+setup_server_timing(app)
+# Outermost, so request timings include everything the app adds
+setup_metrics(app)
 # Security middleware
 if not settings.DEBUG:
     app.add_middleware(
@@ -47,12 +154,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
-    expose_headers=["X-Total-Count"],
+    expose_headers=[
+        "X-Total-Count",
+        "Retry-After",
+        "RateLimit-Limit",
+        "RateLimit-Remaining",
+        "RateLimit-Reset",
+        "Server-Timing",
+    ],
 )
+# Outermost: everything inside sees the real client address
+if settings.TRUSTED_PROXIES:
+    app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.TRUSTED_PROXIES)
 
 
 # Include routers
 app.include_router(admin.router)
+app.include_router(monitoring.router)
 # Global exception handler
 app.add_exception_handler(Exception, global_exception_handler)
 # Static file mounts
@@ -68,6 +186,3 @@ if os.path.exists(os.path.join("app", "static", "info")):
         StaticFiles(directory=os.path.join("app", "static", "info")),
         name="info_static",
     )
-
-
-
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+from fastapi import FastAPI
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.core.rollups import rollup_rows, upsert_rollups
+from app.database import db_manager
+from app.libs.utils import generate_id
+from app.middleware.rate_limit import get_subject
+from app.models import APILogModel
+
+logger = logging.getLogger(__name__)
+# Keys whose values are replaced before a payload is stored, at any depth
+SECRET_KEYS = re.compile(r"[a-z_]*(password|otp|token|secret)", re.IGNORECASE)
+REDACTED = "***"
+
+
+def redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if SECRET_KEYS.fullmatch(str(key)) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def mask_payload(body: bytes, limit: int) -> Optional[str]:
+    """The body as JSON with secret fields redacted, cut to `limit`
+    characters. Anything that doesn't parse as JSON (including a body that
+    was truncated while being captured) is not stored at all, since there
+    is no reliable way to find the secrets in it."""
+    if not body:
+        return None
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    return json.dumps(redact(data), ensure_ascii=False)[:limit]
+
+
+class APILogWriter:
+    """Buffers request log rows in memory and bulk-inserts them.
+
+    The buffer holds at most `capacity` rows; when the database can't keep
+    up, new rows are dropped and counted rather than growing memory or
+    slowing requests down. A flush runs every `flush_interval` seconds, or
+    sooner once `batch_size` rows are waiting, and once more on stop. Each
+    batch also updates the per-minute rollups in the same transaction.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        capacity: int,
+        batch_size: int,
+        flush_interval: float,
+    ):
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._flush_lock = threading.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self._dropped_reported = 0
+
+    def record(self, row: Dict[str, Any]) -> None:
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+            return
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        while self._buffer and len(batch) < self.batch_size:
+            batch.append(self._buffer.popleft())
+        return batch
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the rows written"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    break
+                db = self.session_factory()
+                try:
+                    # One multi-row INSERT per batch
+                    db.execute(insert(APILogModel), batch)
+                    upsert_rollups(db, rollup_rows(batch))
+                    db.commit()
+                    written += len(batch)
+                except Exception as e:
+                    db.rollback()
+                    self.dropped += len(batch)
+                    logger.error(f"Failed to write {len(batch)} API log rows: {e}")
+                    break
+                finally:
+                    db.close()
+        self.written += written
+        if self.dropped > self._dropped_reported:
+            logger.warning(
+                f"Dropped {self.dropped - self._dropped_reported} API log rows"
+            )
+            self._dropped_reported = self.dropped
+        return written
+
+    async def _run(self, wake: asyncio.Event) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"API log flush failed: {e}", exc_info=True)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(
+                self._run(self._wake), name="api-log-writer"
+            )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wake = None
+        await asyncio.to_thread(self.flush)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+class APILogMiddleware:
+    """Records method, url, route, status, duration, caller and a redacted,
+    truncated JSON request body for every request into an APILogWriter"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        writer: APILogWriter,
+        payload_bytes: int,
+        exempt_paths: List[str],
+    ):
+        self.app = app
+        self.writer = writer
+        self.payload_bytes = payload_bytes
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or any(
+            path.startswith(prefix) for prefix in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        body = bytearray()
+        status_code = 500
+        error_message: Optional[str] = None
+
+        async def capture_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.request" and len(body) < self.payload_bytes:
+                body.extend(message.get("body", b"")[: self.payload_bytes - len(body)])
+            return message
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        except Exception as e:
+            error_message = str(e)[:1000]
+            raise
+        finally:
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            query = scope.get("query_string", b"").decode("latin-1")
+            subject = get_subject(scope)
+            # Set by the router once a route matched
+            route = getattr(scope.get("route"), "path", None)
+            self.writer.record(
+                {
+                    "id": generate_id(),
+                    "url": f"{path}?{query}" if query else path,
+                    "method": scope["method"],
+                    "payload": mask_payload(bytes(body), self.payload_bytes),
+                    "status_code": status_code,
+                    "error_message": error_message,
+                    "user_id": subject,
+                    "user_type": "admin" if subject else None,
+                    "route": route,
+                    "duration_ms": duration_ms,
+                    "created_at": datetime.utcnow(),
+                }
+            )
+
+
+api_log_writer = APILogWriter(
+    session_factory=db_manager.get_session,
+    capacity=settings.API_LOG_BUFFER_SIZE,
+    batch_size=settings.API_LOG_BATCH_SIZE,
+    flush_interval=settings.API_LOG_FLUSH_MS / 1000,
+)
+
+
+def setup_api_logging(app: FastAPI) -> None:
+    if not settings.API_LOG_ENABLED:
+        return
+    app.add_middleware(
+        APILogMiddleware,
+        writer=api_log_writer,
+        payload_bytes=settings.API_LOG_PAYLOAD_BYTES,
+        exempt_paths=settings.API_LOG_EXEMPT_PATHS,
+    )
@@ -0,0 +1,245 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first; the queue is shed from the back
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Server overloaded")
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by observed latency.
+
+    A short and a long moving average of request latency are kept. While
+    the short one stays within `tolerance` of the long one and the limit is
+    actually being used, the limit grows by about one per round trip; when
+    latency climbs it is multiplied by `backoff`, at most once per round
+    trip. Requests over the limit wait in a priority queue of at most
+    `queue_factor * limit` entries for up to `queue_timeout` seconds;
+    anything beyond that is rejected straight away.
+
+    Runs on a single event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 4,
+        max_limit: int = 200,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        queue_factor: float = 2.0,
+        queue_timeout: float = 2.0,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.queue_factor = queue_factor
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        # Seeded with the first sample
+        self.short_latency = 0.0
+        self.long_latency = 0.0
+        self._seeded = False
+        self._last_decrease = 0.0
+        self._counter = itertools.count()
+        # (priority, seq, future)
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self.rejected = 0
+
+    @property
+    def queue_budget(self) -> int:
+        return max(1, int(self.limit * self.queue_factor))
+
+    def retry_after(self) -> int:
+        """Rough time for the current backlog to drain"""
+        latency = self.short_latency or 1.0
+        backlog = (len(self._queue) + 1) / max(self.limit, 1)
+        return max(1, math.ceil(latency * backlog))
+
+    def _shed(self, priority: int) -> bool:
+        """Make room for a request of `priority` by rejecting the worst queued
+        request, if it ranks below it"""
+        worst = max(self._queue, default=None)
+        if worst is None or worst[0] <= priority:
+            return False
+        self._queue.remove(worst)
+        heapq.heapify(self._queue)
+        if not worst[2].done():
+            worst[2].set_exception(Overloaded(self.retry_after()))
+        return True
+
+    async def acquire(self, priority: int) -> None:
+        if self.inflight < int(self.limit) and not self._queue:
+            self.inflight += 1
+            return
+        if len(self._queue) >= self.queue_budget and not self._shed(priority):
+            self.rejected += 1
+            raise Overloaded(self.retry_after())
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._counter), future)
+        heapq.heappush(self._queue, entry)
+        try:
+            # The slot is handed over by release(), already counted in inflight
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except Overloaded:
+            self.rejected += 1
+            raise
+        except BaseException as e:
+            # Timed out, or the client went away while queued
+            if entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            if future.done() and future.exception() is None:
+                # Handed a slot just as the wait ended; give it back
+                self.release(None)
+            if not isinstance(e, asyncio.TimeoutError):
+                raise
+            self.rejected += 1
+            raise Overloaded(self.retry_after())
+
+    def release(self, latency: Optional[float]) -> None:
+        self.inflight -= 1
+        if latency is not None:
+            self._update(latency)
+        while self._queue and self.inflight < int(self.limit):
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                self.inflight += 1
+                future.set_result(None)
+
+    def _update(self, latency: float) -> None:
+        if not self._seeded:
+            self.short_latency = self.long_latency = latency
+            self._seeded = True
+            return
+        self.short_latency += 0.1 * (latency - self.short_latency)
+        self.long_latency += 0.01 * (latency - self.long_latency)
+        current = time.monotonic()
+        if self.short_latency > self.long_latency * self.tolerance:
+            if current - self._last_decrease >= self.short_latency:
+                self._last_decrease = current
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                logger.warning(
+                    f"Latency {self.short_latency * 1000:.0f}ms, "
+                    f"concurrency limit lowered to {int(self.limit)}"
+                )
+        elif self.inflight * 2 >= self.limit:
+            # Only grow when the limit is what's holding requests back
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "inflight": self.inflight,
+            "queued": len(self._queue),
+            "rejected": self.rejected,
+            "latency_ms": round(self.short_latency * 1000, 1),
+        }
+
+
+class ConcurrencyLimitMiddleware:
+    """Admits requests through an AdaptiveLimiter, answering 503 with
+    Retry-After when the queue is over budget.
+
+    Paths under `priority_paths` (auth, health) are admitted first; GETs are
+    the lowest priority, so list and search traffic is shed before writes.
+    Long-lived streams under `exempt_paths` bypass the limiter.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: AdaptiveLimiter,
+        priority_paths: List[str],
+        exempt_paths: List[str],
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.priority_paths = priority_paths
+        self.exempt_paths = exempt_paths
+
+    def _priority(self, method: str, path: str) -> int:
+        if any(path.startswith(prefix) for prefix in self.priority_paths):
+            return PRIORITY_HIGH
+        if method in ("GET", "HEAD"):
+            return PRIORITY_LOW
+        return PRIORITY_NORMAL
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or any(
+            path.startswith(prefix) for prefix in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.limiter.acquire(self._priority(scope["method"], path))
+        except Overloaded as e:
+            await self._reject(send, e.retry_after)
+            return
+        started = time.monotonic()
+        latency: Optional[float] = None
+        try:
+            await self.app(scope, receive, send)
+            latency = time.monotonic() - started
+        finally:
+            # Failed requests free their slot but aren't latency samples
+            self.limiter.release(latency)
+
+    @staticmethod
+    async def _reject(send: Send, retry_after: int) -> None:
+        body = json.dumps({"detail": "Server is busy, please retry"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"retry-after", str(retry_after).encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+concurrency_limiter = AdaptiveLimiter(
+    initial_limit=settings.CONCURRENCY_INITIAL_LIMIT,
+    min_limit=settings.CONCURRENCY_MIN_LIMIT,
+    max_limit=settings.CONCURRENCY_MAX_LIMIT,
+    tolerance=settings.CONCURRENCY_LATENCY_TOLERANCE,
+    backoff=settings.CONCURRENCY_BACKOFF,
+    queue_factor=settings.CONCURRENCY_QUEUE_FACTOR,
+    queue_timeout=settings.CONCURRENCY_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+def setup_concurrency_limit(app: FastAPI) -> None:
+    if not settings.CONCURRENCY_LIMIT_ENABLED:
+        return
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        limiter=concurrency_limiter,
+        priority_paths=settings.CONCURRENCY_PRIORITY_PATHS,
+        exempt_paths=settings.CONCURRENCY_EXEMPT_PATHS,
+    )
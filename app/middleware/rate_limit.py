@@ -1,20 +1,365 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from fastapi import Request
-from fastapi.responses import JSONResponse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.tokens import access_tokens
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["1000/minute"])
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
 
 
-async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    return JSONResponse(
-        status_code=429,
-        content={"detail": "Rate limit exceeded"},
-        headers={"Retry-After": str(exc.retry_after)},
+class Limit(NamedTuple):
+    """A bucket of `capacity` tokens refilled at `rate` tokens per second"""
+
+    capacity: int
+    rate: float
+
+
+class Bucket(NamedTuple):
+    allowed: bool
+    remaining: int
+    # Seconds until the bucket is full again / until one request is allowed
+    reset_after: float
+    retry_after: float
+
+
+def parse_limit(value: str) -> Limit:
+    """Parse "100/minute" style limits"""
+    try:
+        count, period = value.strip().split("/")
+        return Limit(int(count), int(count) / PERIODS[period.strip().rstrip("s")])
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid rate limit '{value}'")
+
+
+def parse_route_limits(value: str) -> List[Tuple[str, str, Limit]]:
+    """Parse "POST /auth/login=10/minute;GET /emails=60/minute" into
+    (method, path prefix, limit) rules"""
+    rules = []
+    for item in filter(None, (part.strip() for part in value.split(";"))):
+        route, limit = item.rsplit("=", 1)
+        method, path = route.split()
+        rules.append((method.upper(), path, parse_limit(limit)))
+    return rules
+
+
+def _refill(
+    tokens: float, updated_at: float, current: float, limit: Limit, cost: int
+) -> Tuple[float, Bucket]:
+    tokens = min(limit.capacity, tokens + (current - updated_at) * limit.rate)
+    allowed = tokens >= cost
+    if allowed:
+        tokens -= cost
+    return tokens, Bucket(
+        allowed=allowed,
+        remaining=int(tokens),
+        reset_after=(limit.capacity - tokens) / limit.rate,
+        retry_after=0.0 if allowed else (cost - tokens) / limit.rate,
     )
 
 
-def setup_rate_limiting(app):
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
+class BucketStore(ABC):
+    """Token bucket state. A missing key is a full bucket, so keys can be
+    dropped once they have refilled."""
+
+    @abstractmethod
+    async def take(self, key: str, limit: Limit, cost: int = 1) -> Bucket:
+        pass
+
+    def prune(self) -> int:
+        return 0
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBucketStore(BucketStore):
+    """Per-process buckets; limits multiply by the number of workers"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at)
+        self._data: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, limit: Limit, cost: int = 1) -> Bucket:
+        current = time.time()
+        with self._lock:
+            tokens, updated_at = self._data.get(key, (limit.capacity, current))
+            tokens, bucket = _refill(tokens, updated_at, current, limit, cost)
+            self._data[key] = (tokens, current)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+        return bucket
+
+
+class SQLiteBucketStore(BucketStore):
+    """Buckets in a local SQLite file shared by every worker on the host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, "
+                "tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+                "full_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _take(self, key: str, limit: Limit, cost: int) -> Bucket:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated_at = row or (limit.capacity, current)
+            tokens, bucket = _refill(tokens, updated_at, current, limit, cost)
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated_at, full_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "tokens = excluded.tokens, updated_at = excluded.updated_at, "
+                "full_at = excluded.full_at",
+                (key, tokens, current, current + bucket.reset_after),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return bucket
+
+    async def take(self, key: str, limit: Limit, cost: int = 1) -> Bucket:
+        # A busy writer can hold the lock for a while; don't block the loop
+        return await asyncio.to_thread(self._take, key, limit, cost)
+
+    def prune(self) -> int:
+        cursor = self._connection().execute(
+            "DELETE FROM buckets WHERE full_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+
+# Refill and take atomically on the server, using its clock so workers with
+# skewed clocks agree. Returns {allowed, tokens*1000}.
+REDIS_TAKE = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local current = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or current
+tokens = math.min(capacity, tokens + (current - updated_at) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', current)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, math.floor(tokens * 1000)}
+"""
+
+
+class RedisBucketStore(BucketStore):
+    """Buckets in Redis, shared by every worker on every host. Keys expire
+    once refilled, so nothing needs pruning."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("The redis rate limit backend needs the redis package")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(REDIS_TAKE)
+
+    async def take(self, key: str, limit: Limit, cost: int = 1) -> Bucket:
+        allowed, tokens = await self._script(
+            keys=[self.prefix + key], args=[limit.capacity, limit.rate, cost]
+        )
+        tokens = tokens / 1000
+        return Bucket(
+            allowed=bool(allowed),
+            remaining=int(tokens),
+            reset_after=(limit.capacity - tokens) / limit.rate,
+            retry_after=0.0 if allowed else (cost - tokens) / limit.rate,
+        )
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_bucket_store() -> BucketStore:
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryBucketStore(settings.RATE_LIMIT_MAX_KEYS)
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBucketStore(settings.RATE_LIMIT_SQLITE_PATH)
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBucketStore(settings.RATE_LIMIT_REDIS_URL)
+    raise ValueError(f"Unknown rate limit backend '{settings.RATE_LIMIT_BACKEND}'")
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    headers: List[Tuple[bytes, bytes]] = scope.get("headers", [])
+    for key, value in headers:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+# Hashes of bearer tokens that failed verification. Valid claims are cached
+# by the token service; without this, every request with a forged token
+# would pay a full unwrap in each middleware that asks for the subject.
+invalid_tokens = TTLCache(maxsize=10000, ttl=60)
+
+
+def get_subject(scope: Scope) -> Optional[str]:
+    """The verified JWT subject of the request, if it carries a valid token"""
+    authorization = _header(scope, b"authorization")
+    if not authorization or authorization[:7].lower() != "bearer ":
+        return None
+    token = authorization[7:]
+    token_hash = hashlib.sha256(token.encode("latin-1")).digest()
+    if invalid_tokens.get(token_hash):
+        return None
+    try:
+        return access_tokens.verify(token).get("sub") or None
+    except Exception:
+        invalid_tokens.set(token_hash, True)
+        return None
+
+
+def get_principal(scope: Scope) -> str:
+    """The JWT subject for authenticated requests, else the client address"""
+    subject = get_subject(scope)
+    if subject:
+        return f"user:{subject}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """Token-bucket rate limiting as plain ASGI middleware.
+
+    Each principal has a default bucket, plus one bucket per matching route
+    rule. The most constrained bucket is reported in RateLimit-Limit /
+    RateLimit-Remaining / RateLimit-Reset, and rejected requests get a 429
+    with Retry-After.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: BucketStore,
+        default_limit: Limit,
+        route_limits: List[Tuple[str, str, Limit]],
+        exempt_paths: List[str],
+    ):
+        self.app = app
+        self.store = store
+        self.default_limit = default_limit
+        self.route_limits = route_limits
+        self.exempt_paths = exempt_paths
+
+    def _limits(self, method: str, path: str) -> List[Tuple[str, Limit]]:
+        limits = [
+            (f"{rule_method} {prefix}", limit)
+            for rule_method, prefix, limit in self.route_limits
+            if rule_method == method and path.startswith(prefix)
+        ]
+        limits.append(("default", self.default_limit))
+        return limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or any(
+            path.startswith(prefix) for prefix in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        principal = get_principal(scope)
+        reported: Optional[Tuple[Limit, Bucket]] = None
+        for name, limit in self._limits(scope["method"], path):
+            bucket = await self.store.take(f"{name}|{principal}", limit)
+            if reported is None or bucket.remaining < reported[1].remaining:
+                reported = (limit, bucket)
+            if not bucket.allowed:
+                reported = (limit, bucket)
+                break
+        # There is always at least the default limit
+        assert reported is not None
+        limit, bucket = reported
+        headers = [
+            (b"ratelimit-limit", str(limit.capacity).encode()),
+            (b"ratelimit-remaining", str(bucket.remaining).encode()),
+            (b"ratelimit-reset", str(math.ceil(bucket.reset_after)).encode()),
+        ]
+        if not bucket.allowed:
+            await self._reject(send, headers, math.ceil(bucket.retry_after))
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    async def _reject(
+        send: Send, headers: List[Tuple[bytes, bytes]], retry_after: int
+    ) -> None:
+        body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers
+                + [
+                    (b"retry-after", str(max(1, retry_after)).encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+rate_limit_store = create_bucket_store()
+
+
+def setup_rate_limiting(app: FastAPI) -> None:
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=rate_limit_store,
+        default_limit=parse_limit(settings.RATE_LIMIT_DEFAULT),
+        route_limits=parse_route_limits(settings.RATE_LIMIT_ROUTES),
+        exempt_paths=settings.RATE_LIMIT_EXEMPT_PATHS,
+    )
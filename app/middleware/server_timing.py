@@ -0,0 +1,52 @@
+import time
+from typing import List
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.core.timing import current_timings, start_timing, stop_timing, time_queries
+from app.database import engine
+from app.middleware.rate_limit import get_subject
+
+
+class ServerTimingMiddleware:
+    """Adds a Server-Timing header (auth, db, deps, endpoint, serialize,
+    total) for everyone when `enabled`, otherwise only for requests whose
+    JWT subject is in `subjects`"""
+
+    def __init__(self, app: ASGIApp, enabled: bool, subjects: List[str]):
+        self.app = app
+        self.enabled = enabled
+        self.subjects = set(subjects)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not (
+            self.enabled or get_subject(scope) in self.subjects
+        ):
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        token = start_timing()
+        timings = current_timings()
+
+        async def timing_send(message: Message) -> None:
+            if message["type"] == "http.response.start" and timings is not None:
+                header = timings.header(time.perf_counter() - started)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timing_send)
+        finally:
+            stop_timing(token)
+
+
+def setup_server_timing(app: FastAPI) -> None:
+    if settings.SERVER_TIMING_ENABLED or settings.SERVER_TIMING_SUBJECTS:
+        app.add_middleware(
+            ServerTimingMiddleware,
+            enabled=settings.SERVER_TIMING_ENABLED,
+            subjects=settings.SERVER_TIMING_SUBJECTS,
+        )
+        time_queries(engine)
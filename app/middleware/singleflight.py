@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+
+# status, headers, body
+Response = Tuple[int, List[Tuple[bytes, bytes]], bytes]
+
+
+def request_key(scope: Scope) -> str:
+    """Route, normalized query string and the caller's exact credential;
+    requests with the same key get the same response.
+
+    Keyed on the Authorization header itself rather than the token's
+    subject: a revoked or logged-out token must not be answered with what
+    a live session of the same user was sent.
+    """
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), True)
+    credential = hashlib.sha256()
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            credential.update(value)
+    return f"{scope['path']}?{urlencode(sorted(query))}|{credential.hexdigest()}"
+
+
+class SingleFlight:
+    """In-flight requests by key, plus how many requests were answered by
+    another request's execution"""
+
+    def __init__(self) -> None:
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "inflight": len(self.inflight),
+        }
+
+
+class SingleFlightMiddleware:
+    """Collapses concurrent identical GETs into one execution.
+
+    The first request for a key runs normally while its response is
+    captured; requests with the same key that arrive before it finishes
+    wait and are answered with a copy (marked X-Coalesced). Responses
+    larger than `max_body_bytes` aren't shared: the waiters run themselves.
+    """
+
+    def __init__(
+        self, app: ASGIApp, group: SingleFlight, paths: List[str], max_body_bytes: int
+    ):
+        self.app = app
+        self.group = group
+        self.paths = paths
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not any(scope["path"].startswith(prefix) for prefix in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+        key = request_key(scope)
+        leader = self.group.inflight.get(key)
+        if leader is not None:
+            shared = await asyncio.shield(leader)
+            if shared is not None:
+                response, route = shared
+                # Never reaches the router; metrics and API logs outside
+                # still label it with the leader's route
+                if route is not None:
+                    scope["route"] = route
+                self.group.coalesced += 1
+                await self._replay(send, response)
+                return
+            await self.app(scope, receive, send)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self.group.inflight[key] = future
+        self.group.executed += 1
+        captured: Optional[list] = [None, []]
+        size = 0
+        complete = False
+
+        async def capture(message: Message) -> None:
+            nonlocal captured, size, complete
+            if captured is not None:
+                if message["type"] == "http.response.start":
+                    captured[0] = message
+                else:
+                    size += len(message.get("body", b""))
+                    if size > self.max_body_bytes:
+                        captured = None
+                    else:
+                        captured[1].append(message.get("body", b""))
+                        complete = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            del self.group.inflight[key]
+            response = None
+            if captured is not None and complete:
+                start = captured[0]
+                response = (
+                    start["status"],
+                    list(start.get("headers", [])),
+                    b"".join(captured[1]),
+                )
+            # None (failed or too large) sends the waiters to run themselves
+            future.set_result(
+                None if response is None else (response, scope.get("route"))
+            )
+
+    @staticmethod
+    async def _replay(send: Send, response: Response) -> None:
+        status, headers, body = response
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": headers + [(b"x-coalesced", b"true")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+singleflight = SingleFlight()
+
+
+def setup_singleflight(app: FastAPI) -> None:
+    if not settings.SINGLEFLIGHT_ENABLED:
+        return
+    app.add_middleware(
+        SingleFlightMiddleware,
+        group=singleflight,
+        paths=settings.SINGLEFLIGHT_PATHS,
+        max_body_bytes=settings.SINGLEFLIGHT_MAX_BODY_BYTES,
+    )
@@ -0,0 +1,53 @@
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.core.tracing import tracer
+
+
+class TracingMiddleware:
+    """Opens the server span of each request, continuing the caller's trace
+    when it sends a W3C traceparent. Sampled responses carry X-Trace-Id so
+    a slow request can be looked up in the exported spans."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        traceparent = next(
+            (v.decode("latin-1") for k, v in scope["headers"] if k == b"traceparent"),
+            None,
+        )
+        with tracer.span(
+            method,
+            {"http.request.method": method, "url.path": scope["path"]},
+            kind="SERVER",
+            traceparent=traceparent,
+        ) as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def traced_send(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-trace-id", span.trace_id.encode("latin-1"))
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, traced_send)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
+
+
+def setup_tracing(app: FastAPI) -> None:
+    if settings.TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware)
@@ -1,19 +1,53 @@
+import zlib
 from datetime import datetime
 from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     func,
     Text,
 )
 from sqlalchemy.orm import relationship, declarative_mixin
+from sqlalchemy.types import TypeDecorator
 import uuid
 from app.database import Base
 
 
+class CompressedText(TypeDecorator):
+    """Text stored zlib-compressed, cut to `max_bytes` before compressing.
+    Values written before compression was introduced are read back as-is."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, max_bytes: int = 65536, level: int = 6):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.level = level
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        data = value.encode("utf-8")[: self.max_bytes]
+        return zlib.compress(data, self.level)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return value
+        try:
+            value = zlib.decompress(value)
+        except zlib.error:
+            pass
+        return value.decode("utf-8", "replace")
+
+
 @declarative_mixin
 class IDMixin:
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -44,28 +78,112 @@ class AdminUserModel(Base, IDMixin, TimestampMixin, SoftDeleteMixin):
     email = Column(String(100), nullable=False, unique=True)
     phone = Column(String(15))
     password = Column(String(255), nullable=False)
-    # OTP fields with security
-    otp = Column(String(64))  # Store hashed OTP
-    otp_expires_at = Column(DateTime)
-    otp_attempts = Column(Integer, default=0)
-    otp_generated_at = Column(DateTime)
-    otp_generation_count = Column(Integer, default=0)
-    # Password reset token fields
-    reset_token = Column(String(64))  # Secure reset token
-    reset_token_expires_at = Column(DateTime)
-    reset_token_used = Column(Boolean, default=False)
+    # Legacy; OTPs and reset tokens live in password_resets
+    otp = Column(String(64))
+
+
+class PasswordResetModel(Base, IDMixin):
+    """One outstanding OTP or reset link per admin and kind, kept off the
+    admin_users row so reset traffic never locks it"""
+
+    __tablename__ = "password_resets"
+    admin_user_id = Column(
+        String(36), ForeignKey("admin_users.id"), nullable=False, index=True
+    )
+    kind = Column(String(10), nullable=False)  # otp | link
+    secret_hash = Column(String(64), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    used_at = Column(DateTime)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class RefreshSessionModel(Base, IDMixin, TimestampMixin):
+    __tablename__ = "refresh_sessions"
+    admin_user_id = Column(
+        String(36), ForeignKey("admin_users.id"), nullable=False, index=True
+    )
+    # Current refresh token id; rotated on every refresh so reuse is detectable
+    refresh_jti = Column(String(36), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, index=True)
+
+
+class EmailOutboxModel(Base, IDMixin, TimestampMixin):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    recipients = Column(Text, nullable=False)  # JSON list of addresses
+    subject = Column(String(255), nullable=False)
+    html_body = Column(Text, nullable=False)
+    # pending -> sending -> sent | failed; sending rows past their lease are
+    # picked up again in case a worker died mid-delivery
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text)
+    sent_at = Column(DateTime)
 
 
 class APILogModel(Base, IDMixin):
+    """Range-partitioned by created_at on MySQL (see app.core.partitions),
+    which is why created_at is part of the primary key"""
+
     __tablename__ = "api_logs"
+    __table_args__ = (
+        Index("ix_api_logs_created_at_status_code", "created_at", "status_code"),
+        Index("ix_api_logs_user_id_created_at", "user_id", "created_at"),
+    )
     url = Column(Text, nullable=False)
     method = Column(String(10), nullable=False)
-    payload = Column(Text)
+    payload = Column(CompressedText())
     status_code = Column(Integer, nullable=False)
     error_message = Column(Text)
     user_id = Column(String(36))
     user_type = Column(String(30))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Route template (e.g. /countries/{country_id}) and time to respond
+    route = Column(String(255))
+    duration_ms = Column(Integer)
+    created_at = Column(
+        DateTime, primary_key=True, nullable=False, default=datetime.utcnow
+    )
+
+
+class APILogRollupModel(Base, IDMixin):
+    """Per-minute, per-route request counts and latency histogram, upserted
+    by the api_logs writer (see app.core.rollups)"""
+
+    __tablename__ = "api_log_rollups"
+    __table_args__ = (
+        Index(
+            "ux_api_log_rollups_bucket_method_route",
+            "bucket",
+            "method",
+            "route",
+            unique=True,
+        ),
+    )
+    bucket = Column(DateTime, nullable=False)  # start of the minute, UTC
+    method = Column(String(10), nullable=False)
+    route = Column(String(255), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    status_2xx = Column(Integer, nullable=False, default=0)
+    status_3xx = Column(Integer, nullable=False, default=0)
+    status_4xx = Column(Integer, nullable=False, default=0)
+    status_5xx = Column(Integer, nullable=False, default=0)
+    latency_sum_ms = Column(Integer, nullable=False, default=0)
+    # Requests per latency bucket (not cumulative), upper bounds in ms
+    latency_le_5 = Column(Integer, nullable=False, default=0)
+    latency_le_10 = Column(Integer, nullable=False, default=0)
+    latency_le_25 = Column(Integer, nullable=False, default=0)
+    latency_le_50 = Column(Integer, nullable=False, default=0)
+    latency_le_100 = Column(Integer, nullable=False, default=0)
+    latency_le_250 = Column(Integer, nullable=False, default=0)
+    latency_le_500 = Column(Integer, nullable=False, default=0)
+    latency_le_1000 = Column(Integer, nullable=False, default=0)
+    latency_le_2500 = Column(Integer, nullable=False, default=0)
+    latency_le_5000 = Column(Integer, nullable=False, default=0)
+    latency_le_inf = Column(Integer, nullable=False, default=0)
 
 
 class CountryModel(Base, IDMixin, TimestampMixin, SoftDeleteMixin, NameMixin):
@@ -5,6 +5,10 @@ from app.routers.admin.crud.auth_mod.api import router as auth_router
 from app.routers.admin.crud.country.api import router as country_router
 from app.routers.admin.crud.state.api import router as state_router
 from app.routers.admin.crud.city.api import router as city_router
+from app.routers.admin.crud.events.api import router as events_router
+from app.routers.admin.crud.emails.api import router as emails_router
+from app.routers.admin.crud.analytics.api import router as analytics_router
+from app.routers.admin.crud.diagnostics.api import router as diagnostics_router
 
 router = APIRouter()
 # Include module routers
@@ -12,3 +16,7 @@ router.include_router(auth_router)
 router.include_router(country_router)
 router.include_router(state_router)
 router.include_router(city_router)
+router.include_router(events_router)
+router.include_router(emails_router)
+router.include_router(analytics_router)
+router.include_router(diagnostics_router)
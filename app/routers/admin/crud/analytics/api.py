@@ -0,0 +1,55 @@
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.core.timing import TimedRoute
+from app.database import get_db
+from app.routers.admin.crud.auth_mod.crud import get_current_admin
+from app.routers.admin.crud.auth_mod.schemas import AdminPrincipal
+from . import crud, schemas
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"], route_class=TimedRoute)
+
+
+def admin_auth(
+    db: Session = Depends(get_db),
+    current_user: AdminPrincipal = Depends(get_current_admin),
+) -> Session:
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required"
+        )
+    return db
+
+
+@router.get(
+    "/routes",
+    response_model=schemas.RouteStatsList,
+    summary="Per-route request stats",
+    description="GET /analytics/routes - Request count, status classes, error rate and latency percentiles per route over the last N minutes",
+)
+def get_route_stats(
+    minutes: int = Query(1440, ge=1, le=43200, description="Window in minutes"),
+    method: Optional[str] = Query(None, max_length=10, description="HTTP method"),
+    route: Optional[str] = Query(
+        None, max_length=255, description="Route template, e.g. /countries/"
+    ),
+    db: Session = Depends(admin_auth),
+) -> Dict[str, Any]:
+    return crud.get_route_stats(db, minutes=minutes, method=method, route=route)
+
+
+@router.get(
+    "/timeseries",
+    response_model=schemas.MinuteStatsList,
+    summary="Per-minute request stats",
+    description="GET /analytics/timeseries - Request stats per minute over the last N minutes, optionally for one route",
+)
+def get_timeseries(
+    minutes: int = Query(60, ge=1, le=10080, description="Window in minutes"),
+    method: Optional[str] = Query(None, max_length=10, description="HTTP method"),
+    route: Optional[str] = Query(
+        None, max_length=255, description="Route template, e.g. /countries/"
+    ),
+    db: Session = Depends(admin_auth),
+) -> Dict[str, Any]:
+    return crud.get_timeseries(db, minutes=minutes, method=method, route=route)
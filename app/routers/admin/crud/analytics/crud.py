@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+from app.core.rollups import COUNTER_COLUMNS, LATENCY_BUCKETS, percentile
+from app.libs.utils import now
+from app.models import APILogRollupModel
+
+# Summed over the window, so the cost depends on routes x minutes, never on
+# how many raw requests were logged
+TOTALS = [
+    func.coalesce(func.sum(getattr(APILogRollupModel, column)), 0).label(column)
+    for column in COUNTER_COLUMNS
+]
+
+
+def get_window(minutes: int) -> Tuple[datetime, datetime]:
+    until = now().replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+    return until - timedelta(minutes=minutes), until
+
+
+def summarize(row: Any) -> Dict[str, Any]:
+    count = row.count
+    latency_counts = [getattr(row, column) for _, column in LATENCY_BUCKETS]
+    return {
+        "count": count,
+        "status_2xx": row.status_2xx,
+        "status_3xx": row.status_3xx,
+        "status_4xx": row.status_4xx,
+        "status_5xx": row.status_5xx,
+        "error_rate": row.status_5xx / count if count else 0.0,
+        "avg_ms": row.latency_sum_ms / count if count else None,
+        "p50_ms": percentile(latency_counts, 0.50),
+        "p95_ms": percentile(latency_counts, 0.95),
+        "p99_ms": percentile(latency_counts, 0.99),
+    }
+
+
+def _filter(
+    query: Query, since: datetime, method: Optional[str], route: Optional[str]
+) -> Query:
+    query = query.filter(APILogRollupModel.bucket >= since)
+    if method:
+        query = query.filter(APILogRollupModel.method == method.upper())
+    if route:
+        query = query.filter(APILogRollupModel.route == route)
+    return query
+
+
+def get_route_stats(
+    db: Session,
+    minutes: int,
+    method: Optional[str] = None,
+    route: Optional[str] = None,
+) -> Dict[str, Any]:
+    since, until = get_window(minutes)
+    query = _filter(
+        db.query(APILogRollupModel.method, APILogRollupModel.route, *TOTALS),
+        since,
+        method,
+        route,
+    ).group_by(APILogRollupModel.method, APILogRollupModel.route)
+    stats = [
+        {"method": row.method, "route": row.route, **summarize(row)} for row in query
+    ]
+    stats.sort(key=lambda item: item["count"], reverse=True)
+    return {"since": since, "until": until, "list": stats}
+
+
+def get_timeseries(
+    db: Session,
+    minutes: int,
+    method: Optional[str] = None,
+    route: Optional[str] = None,
+) -> Dict[str, Any]:
+    since, until = get_window(minutes)
+    query = (
+        _filter(db.query(APILogRollupModel.bucket, *TOTALS), since, method, route)
+        .group_by(APILogRollupModel.bucket)
+        .order_by(APILogRollupModel.bucket)
+    )
+    return {
+        "since": since,
+        "until": until,
+        "list": [{"bucket": row.bucket, **summarize(row)} for row in query],
+    }
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class RequestStats(BaseModel):
+    count: int
+    status_2xx: int
+    status_3xx: int
+    status_4xx: int
+    status_5xx: int
+    # Share of requests answered with a 5xx
+    error_rate: float
+    avg_ms: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+
+
+class RouteStats(RequestStats):
+    method: str
+    route: str
+
+
+class MinuteStats(RequestStats):
+    bucket: datetime
+
+
+class RouteStatsList(BaseModel):
+    since: datetime
+    until: datetime
+    list: List[RouteStats]
+
+
+class MinuteStatsList(BaseModel):
+    since: datetime
+    until: datetime
+    list: List[MinuteStats]
@@ -1,11 +1,16 @@
+from typing import Any, Dict
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
+from app.core.timing import TimedRoute
 from app.database import get_db
+from app.security import get_current_user
 from app.routers.admin.crud.auth_mod import crud
 from app.routers.admin.crud.auth_mod.schemas import (
     LoginRequest,
     LoginResponse,
     Profile,
+    RefreshTokenRequest,
+    TokenPairResponse,
     ChangePassword,
     ForgotPasswordRequest,
     OTPVerifyRequest,
@@ -14,12 +19,28 @@ from app.routers.admin.crud.auth_mod.schemas import (
     VerifyResetTokenRequest,
 )
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=TimedRoute)
 
 
 @router.post("/login", response_model=LoginResponse, summary="User login", description="POST /auth/login - Admin user login")
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
-    return crud.sign_in(db, request)
+async def login(
+    request: LoginRequest, http_request: Request, db: Session = Depends(get_db)
+):
+    client_ip = http_request.client.host if http_request.client else None
+    return await crud.sign_in(db, request, client_ip)
+
+
+@router.post("/refresh", response_model=TokenPairResponse, summary="Refresh tokens", description="POST /auth/refresh - Exchange a refresh token for a new token pair")
+async def refresh(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+    return crud.refresh_session(db, request.refresh_token)
+
+
+@router.post("/logout", summary="Logout", description="POST /auth/logout - Revoke the current session")
+async def logout(
+    db: Session = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    return crud.logout(db, current_user)
 
 
 @router.put("/profile", summary="Update profile", description="PUT /auth/profile - Update admin user profile")
@@ -31,7 +52,7 @@ async def update_profile(request: Profile, token: str, db: Session = Depends(get
 async def change_password(
     request: ChangePassword, token: str, db: Session = Depends(get_db)
 ):
-    return crud.change_password(db, request, token)
+    return await crud.change_password(db, request, token)
 
 
 @router.post("/forgot-password", summary="Forgot password (legacy)", description="POST /auth/forgot-password - Send OTP for password reset (legacy)")
@@ -59,7 +80,7 @@ async def verify_otp(request: OTPVerifyRequest, db: Session = Depends(get_db)):
 @router.post("/reset-password")
 async def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)):
     """Reset password with OTP (legacy)"""
-    return crud.reset_password(db, request)
+    return await crud.reset_password(db, request)
 
 
 @router.post("/verify-reset-token")
@@ -81,4 +102,4 @@ async def reset_password_with_token(
     request: ResetPasswordWithTokenRequest, db: Session = Depends(get_db)
 ):
     """Reset password using secure token"""
-    return crud.reset_password_with_token(db, request.token, request.new_password)
+    return await crud.reset_password_with_token(db, request.token, request.new_password)
@@ -1,22 +1,38 @@
-import json
 import traceback
 import logging
-import bcrypt
 import hashlib
 import re
 import secrets
 from datetime import timedelta
-from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Mapper, Session, object_session
 from sqlalchemy.exc import SQLAlchemyError
-from jwcrypto import jwk, jwt
 from app.config import settings
-from app.libs.utils import now, create_password, generate_otp
-from app.models import AdminUserModel
+from app.core.cache import TTLCache
+from app.core.counters import auth_counters
+from app.core.passwords import password_hasher, password_pool
+from app.core.revocation import revocation_list
+from app.core.throttle import login_throttle
+from app.core.timing import phase
+from app.database import get_db
+from app.libs.utils import now, decode_token, generate_id, generate_otp
+from app.models import AdminUserModel, PasswordResetModel, RefreshSessionModel
+from app.security import (
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    create_token_pair,
+    ensure_session_active,
+    get_current_user,
+    verify_refresh_token,
+)
 from .schemas import (
+    AdminPrincipal,
     LoginRequest,
     LoginResponse,
     Profile,
+    TokenPairResponse,
     ChangePassword,
     ForgotPasswordRequest,
     OTPVerifyRequest,
@@ -25,7 +41,7 @@ from .schemas import (
 
 # Import functions that were in the old auth.py - need to be implemented or moved
 # from app.routers.admin.crud.auth import generate_access_token, generate_refresh_token, refresh_access_token
-from app.libs.emails import send_email
+from app.core.outbox import enqueue_email
 from app.libs.template_manager import (
     forgot_password_template,
     password_reset_link_template,
@@ -40,6 +56,13 @@ RATE_LIMIT_HOURS = 1
 # Reset Token Configuration
 RESET_TOKEN_EXPIRY_MINUTES = 30
 RESET_TOKEN_LENGTH = 32
+# Authenticated admin id -> AdminPrincipal, so token checks skip the user query
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+principal_invalidation_hooks: List[Callable[[str], None]] = []
+# Session.info key: ids of admins soft-deleted in the open transaction
+PENDING_INVALIDATIONS = "pending_principal_invalidations"
 
 
 def hash_otp(otp: str) -> str:
@@ -64,21 +87,55 @@ def validate_otp_format(otp: str) -> bool:
     return bool(re.match(r"^\d{6}$", otp))
 
 
-def is_rate_limited(user: AdminUserModel) -> bool:
-    """Check if user is rate limited for OTP generation"""
-    if not user.otp_generated_at:
-        return False
-    time_diff = now() - user.otp_generated_at
-    if time_diff < timedelta(hours=RATE_LIMIT_HOURS):
-        return (user.otp_generation_count or 0) >= MAX_GENERATION_ATTEMPTS
-    return False
+def reset_request_key(admin_user_id: str) -> str:
+    return f"reset-request:{admin_user_id}"
+
+
+def otp_attempts_key(reset_id: str) -> str:
+    return f"otp-attempts:{reset_id}"
 
 
-def is_otp_expired(user: AdminUserModel) -> bool:
-    """Check if OTP is expired"""
-    if not user.otp_expires_at:
-        return True
-    return now() > user.otp_expires_at
+def is_rate_limited(admin_user_id: str) -> bool:
+    """Check if user is rate limited for OTP / reset link generation"""
+    requests = auth_counters.count(
+        reset_request_key(admin_user_id), RATE_LIMIT_HOURS * 3600
+    )
+    return requests >= MAX_GENERATION_ATTEMPTS
+
+
+def is_expired(reset: PasswordResetModel) -> bool:
+    """Check if an OTP or reset link is expired"""
+    return now().replace(tzinfo=None) > reset.expires_at
+
+
+def create_password_reset(
+    db: Session, admin_user_id: str, kind: str, secret_hash: str, expires_in: timedelta
+) -> PasswordResetModel:
+    """Replace any outstanding OTP/link of this kind; the caller commits"""
+    db.query(PasswordResetModel).filter(
+        PasswordResetModel.admin_user_id == admin_user_id,
+        PasswordResetModel.kind == kind,
+    ).delete(synchronize_session=False)
+    reset = PasswordResetModel(
+        id=generate_id(),
+        admin_user_id=admin_user_id,
+        kind=kind,
+        secret_hash=secret_hash,
+        expires_at=(now() + expires_in).replace(tzinfo=None),
+    )
+    db.add(reset)
+    auth_counters.hit(
+        reset_request_key(admin_user_id),
+        RATE_LIMIT_HOURS * 3600,
+        MAX_GENERATION_ATTEMPTS,
+    )
+    return reset
+
+
+def discard_password_reset(db: Session, reset: PasswordResetModel) -> None:
+    db.delete(reset)
+    db.commit()
+    auth_counters.reset(otp_attempts_key(reset.id))
 
 
 def generate_reset_token() -> str:
@@ -96,11 +153,70 @@ def verify_reset_token(token: str, hashed_token: str) -> bool:
     return hashlib.sha256(token.encode()).hexdigest() == hashed_token
 
 
-def is_reset_token_expired(user: AdminUserModel) -> bool:
-    """Check if reset token is expired"""
-    if not user.reset_token_expires_at:
-        return True
-    return now() > user.reset_token_expires_at
+def register_principal_invalidation_hook(hook: Callable[[str], None]) -> None:
+    """Register a callback that forwards invalidations to other workers"""
+    principal_invalidation_hooks.append(hook)
+
+
+def invalidate_principal(admin_user_id: str, propagate: bool = True) -> None:
+    principal_cache.delete(admin_user_id)
+    if not propagate:
+        return
+    for hook in principal_invalidation_hooks:
+        try:
+            hook(admin_user_id)
+        except Exception as e:
+            logger.error(f"Principal invalidation hook failed: {e}")
+
+
+@event.listens_for(AdminUserModel, "after_update")
+def _invalidate_on_soft_delete(
+    mapper: Mapper, connection: Connection, target: AdminUserModel
+) -> None:
+    # Catches soft deletes from any code path, not just this module. Runs at
+    # flush time, so only note the id: invalidating now would let a request
+    # re-cache the old row before the delete commits
+    session = object_session(target)
+    if target.is_deleted and session is not None:
+        session.info.setdefault(PENDING_INVALIDATIONS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for admin_user_id in session.info.pop(PENDING_INVALIDATIONS, ()):
+        invalidate_principal(admin_user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS, None)
+
+
+def get_principal(db: Session, admin_user_id: str) -> AdminPrincipal:
+    """Confirm the admin still exists, from cache when possible"""
+    principal = principal_cache.get(admin_user_id)
+    if principal is None:
+        db_admin_user = get_admin_user_by_id(db, id=admin_user_id)
+        if db_admin_user is None or db_admin_user.is_deleted:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Admin not found."
+            )
+        principal = AdminPrincipal.model_validate(db_admin_user)
+        principal_cache.set(admin_user_id, principal)
+    return principal
+
+
+def get_current_admin(
+    db: Session = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+) -> AdminPrincipal:
+    admin_user_id = current_user.get("sub") or current_user.get("id")
+    if not admin_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+    with phase("auth"):
+        return get_principal(db, admin_user_id)
 
 
 def verify_token(db: Session, token: str):
@@ -109,11 +225,11 @@ def verify_token(db: Session, token: str):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token"
         )
     try:
-        key = jwk.JWK(**json.loads(settings.ACCESS_JWT_KEY))
-        ET = jwt.JWT(key=key, jwt=token, expected_type="JWE")
-        ST = jwt.JWT(key=key, jwt=ET.claims)
-        claims = json.loads(ST.claims)
-        db_admin_user = get_admin_user_by_id(db, id=claims["id"])
+        claims = decode_token(token)
+        ensure_session_active(claims)
+        db_admin_user = get_admin_user_by_id(
+            db, id=claims.get("sub") or claims.get("id")
+        )
         if db_admin_user is None or db_admin_user.is_deleted:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Admin not found."
@@ -180,9 +296,50 @@ def get_admin_user_by_email_with_otp(db: Session, email: str) -> AdminUserModel:
         )
 
 
-def sign_in(db: Session, admin_user: LoginRequest) -> LoginResponse:
+async def rehash_password(
+    db: Session, db_admin_user: AdminUserModel, password: str
+) -> None:
+    """Upgrade a stored hash to the current cost after a successful login"""
+    try:
+        db_admin_user.password = await password_pool.hash(password)
+        db.commit()
+    except Exception as e:
+        # The login already succeeded; keep the old hash and retry next time
+        db.rollback()
+        logger.error(f"Password rehash failed for {db_admin_user.id}: {e}")
+
+
+def login_throttle_keys(email: str, client_ip: Optional[str]) -> List[Tuple[str, int]]:
+    keys = [(f"email:{email.lower()}", settings.LOGIN_THROTTLE_EMAIL_FAILURES)]
+    if client_ip:
+        keys.append((f"ip:{client_ip}", settings.LOGIN_THROTTLE_IP_FAILURES))
+    return keys
+
+
+def check_login_throttle(keys: List[Tuple[str, int]]) -> None:
+    retry_after = max(login_throttle.retry_after(key) for key, _ in keys)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts. Please try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def record_login_failure(keys: List[Tuple[str, int]]) -> None:
+    for key, free_failures in keys:
+        login_throttle.record_failure(key, free_failures)
+
+
+async def sign_in(
+    db: Session, admin_user: LoginRequest, client_ip: Optional[str] = None
+) -> LoginResponse:
+    # Throttled attempts are refused before any query or bcrypt work
+    throttle_keys = login_throttle_keys(admin_user.email, client_ip)
+    check_login_throttle(throttle_keys)
     db_admin_user = get_admin_user_by_email(db, email=admin_user.email)
     if db_admin_user is None:
+        record_login_failure(throttle_keys)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
@@ -190,20 +347,122 @@ def sign_in(db: Session, admin_user: LoginRequest) -> LoginResponse:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Account is deleted"
         )
-    hashed = db_admin_user.password.encode("utf-8")
-    password = admin_user.password.encode("utf-8")
-    if not bcrypt.checkpw(password, hashed):
+    if not await password_pool.verify(admin_user.password, db_admin_user.password):
+        record_login_failure(throttle_keys)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
-    # TODO: Implement token generation functions
-    db_admin_user.token = (
-        "temp_token"  # generate_access_token(db_admin_user.id, db_admin_user.email)
-    )
-    db_admin_user.refresh_token = "temp_refresh_token"  # generate_refresh_token(db_admin_user.id, db_admin_user.email)
+    login_throttle.reset(throttle_keys[0][0])
+    if password_hasher.needs_rehash(db_admin_user.password):
+        await rehash_password(db, db_admin_user, admin_user.password)
+    tokens = create_refresh_session(db, db_admin_user)
+    db_admin_user.token = tokens["token"]
+    db_admin_user.refresh_token = tokens["refresh_token"]
     return db_admin_user
 
 
+def create_refresh_session(
+    db: Session, db_admin_user: AdminUserModel
+) -> Dict[str, str]:
+    """Open a server-side refresh session and issue its first token pair"""
+    session_id = generate_id()
+    refresh_jti = generate_id()
+    admin_user_id = db_admin_user.id
+    email = db_admin_user.email
+    try:
+        db.add(
+            RefreshSessionModel(
+                id=session_id,
+                admin_user_id=admin_user_id,
+                refresh_jti=refresh_jti,
+                expires_at=(now() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)).replace(
+                    tzinfo=None
+                ),
+            )
+        )
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Failed to create refresh session for {admin_user_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error occurred",
+        )
+    return create_token_pair(admin_user_id, email, session_id, refresh_jti)
+
+
+def revoke_session(db: Session, session: RefreshSessionModel) -> None:
+    if session.revoked_at is None:
+        session.revoked_at = now().replace(tzinfo=None)
+        db.commit()
+    revocation_list.revoke(session.id)
+
+
+def revoke_admin_sessions(db: Session, admin_user_id: str) -> None:
+    """Revoke every open session, e.g. after the password changes"""
+    sessions = (
+        db.query(RefreshSessionModel)
+        .filter(
+            RefreshSessionModel.admin_user_id == admin_user_id,
+            RefreshSessionModel.revoked_at.is_(None),
+        )
+        .all()
+    )
+    revoked_at = now().replace(tzinfo=None)
+    for session in sessions:
+        session.revoked_at = revoked_at
+    db.commit()
+    for session in sessions:
+        revocation_list.revoke(session.id)
+
+
+def refresh_session(db: Session, refresh_token: str) -> TokenPairResponse:
+    """Rotate the refresh token and issue a new pair for the same session"""
+    try:
+        claims = verify_refresh_token(refresh_token)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+    if claims.get("type") != "refresh" or not claims.get("sid"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+    session = db.get(RefreshSessionModel, claims["sid"])
+    if (
+        session is None
+        or session.revoked_at is not None
+        or session.expires_at <= now().replace(tzinfo=None)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired"
+        )
+    if session.refresh_jti != claims.get("jti"):
+        # An already rotated token was replayed: assume it leaked
+        logger.warning(f"Refresh token reuse detected for session {session.id}")
+        revoke_session(db, session)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Session revoked"
+        )
+    get_principal(db, session.admin_user_id)
+    session.refresh_jti = generate_id()
+    session.updated_at = now()
+    db.commit()
+    return TokenPairResponse(
+        **create_token_pair(
+            session.admin_user_id, claims.get("email"), session.id, session.refresh_jti
+        )
+    )
+
+
+def logout(db: Session, current_user: Dict[str, Any]) -> Dict[str, str]:
+    session_id = current_user.get("sid")
+    session = db.get(RefreshSessionModel, session_id) if session_id else None
+    if session is not None:
+        revoke_session(db, session)
+    return {"detail": "Logged out successfully"}
+
+
 def update_profile(db: Session, admin_user: Profile, token: str):
     db_admin_user = verify_token(db, token=token)
     db_admin_user.first_name = admin_user.first_name
@@ -212,15 +471,18 @@ def update_profile(db: Session, admin_user: Profile, token: str):
     db_admin_user.phone = admin_user.phone
     db_admin_user.updated_at = now()
     db.commit()
+    invalidate_principal(db_admin_user.id)
     return db_admin_user
 
 
-def change_password(db: Session, admin_user: ChangePassword, token: str):
+async def change_password(db: Session, admin_user: ChangePassword, token: str):
     db_admin_user = verify_token(db, token=token)
     try:
-        hashed = bytes(db_admin_user.password, "utf-8")
-        password = bytes(admin_user.old_password, "utf-8")
-        result = bcrypt.checkpw(password, hashed)
+        result = await password_pool.verify(
+            admin_user.old_password, db_admin_user.password
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
         print(traceback.format_exc())
@@ -229,10 +491,12 @@ def change_password(db: Session, admin_user: ChangePassword, token: str):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect old password"
         )
-    password = create_password(admin_user.new_password)
+    password = await password_pool.hash(admin_user.new_password)
     db_admin_user.password = password
     db_admin_user.updated_at = now()
     db.commit()
+    revoke_admin_sessions(db, db_admin_user.id)
+    invalidate_principal(db_admin_user.id)
     return db_admin_user
 
 
@@ -247,53 +511,34 @@ def send_forgot_password_email(db: Session, request: ForgotPasswordRequest):
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="User Not Found."
             )
         # Check rate limiting
-        if is_rate_limited(db_admin_user):
+        if is_rate_limited(db_admin_user.id):
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"Too many OTP requests. Try again after {RATE_LIMIT_HOURS} hour(s).",
             )
-        # Generate secure OTP
+        # Generate secure OTP and store its hash with expiration
         otp = generate_otp()
-        current_time = now()
-        # Update rate limiting counters
-        if (
-            db_admin_user.otp_generated_at
-            and current_time - db_admin_user.otp_generated_at
-            < timedelta(hours=RATE_LIMIT_HOURS)
-        ):
-            db_admin_user.otp_generation_count = (
-                db_admin_user.otp_generation_count or 0
-            ) + 1
-        else:
-            db_admin_user.otp_generation_count = 1
-        # Store hashed OTP with expiration
-        db_admin_user.otp = hash_otp(otp)
-        db_admin_user.otp_generated_at = current_time
-        db_admin_user.otp_expires_at = current_time + timedelta(
-            minutes=OTP_EXPIRY_MINUTES
-        )
-        db_admin_user.otp_attempts = 0
-        db_admin_user.updated_at = current_time
-        db.commit()
-        logger.info(f"OTP generated for user: {db_admin_user.email}")
+        create_password_reset(
+            db,
+            db_admin_user.id,
+            "otp",
+            hash_otp(otp),
+            timedelta(minutes=OTP_EXPIRY_MINUTES),
+        )
         email_body = forgot_password_template(
             first_name=db_admin_user.first_name,
             last_name=db_admin_user.last_name,
             otp=otp,  # Send plain OTP in email
         )
-        if not send_email(
+        # Queued in the same transaction as the OTP; the outbox worker sends it
+        enqueue_email(
+            db,
             recipients=[db_admin_user.email],
             subject="DailyVeg: OTP for Password Reset",
             html_body=email_body,
-        ):
-            logger.error(
-                f"Failed to send password reset email to: {db_admin_user.email}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error while sending email.",
-            )
-        logger.info(f"Password reset email sent successfully to: {db_admin_user.email}")
+        )
+        db.commit()
+        logger.info(f"OTP generated and email queued for: {db_admin_user.email}")
         return {
             "detail": f"OTP has been sent successfully. Valid for {OTP_EXPIRY_MINUTES} minutes."
         }
@@ -325,47 +570,40 @@ def otp_verify(db: Session, request: OTPVerifyRequest):
     # For now, we'll search by OTP hash (less secure but maintains compatibility)
     otp_hash = hash_otp(request.otp)
     try:
-        db_admin_user = (
-            db.query(AdminUserModel)
+        reset = (
+            db.query(PasswordResetModel)
             .filter(
-                AdminUserModel.otp == otp_hash, AdminUserModel.is_deleted.is_(False)
+                PasswordResetModel.secret_hash == otp_hash,
+                PasswordResetModel.kind == "otp",
             )
             .first()
         )
+        db_admin_user = get_admin_user_by_id(db, reset.admin_user_id) if reset else None
         if not db_admin_user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid OTP or OTP expired.",
             )
         # Check expiration
-        if is_otp_expired(db_admin_user):
-            # Clear expired OTP
-            db_admin_user.otp = None
-            db_admin_user.otp_expires_at = None
-            db_admin_user.otp_attempts = 0
-            db.commit()
+        if is_expired(reset):
+            # Left for the sweeper; no cleanup commit on the request path
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="OTP has expired. Please request a new one.",
             )
         # Check attempt limit
-        if (db_admin_user.otp_attempts or 0) >= MAX_OTP_ATTEMPTS:
-            # Clear OTP after max attempts
-            db_admin_user.otp = None
-            db_admin_user.otp_expires_at = None
-            db_admin_user.otp_attempts = 0
-            db.commit()
+        attempts = auth_counters.count(
+            otp_attempts_key(reset.id), OTP_EXPIRY_MINUTES * 60
+        )
+        if attempts >= MAX_OTP_ATTEMPTS:
+            discard_password_reset(db, reset)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Too many verification attempts. Please request a new OTP.",
             )
         # OTP is valid - clear it immediately
-        db_admin_user.otp = None
-        db_admin_user.otp_expires_at = None
-        db_admin_user.otp_attempts = 0
+        discard_password_reset(db, reset)
         db_admin_user.user_type = request.user_type
-        db_admin_user.updated_at = now()
-        db.commit()
         logger.info(f"OTP verified successfully for user: {db_admin_user.email}")
         return db_admin_user
     except HTTPException:
@@ -378,7 +616,7 @@ def otp_verify(db: Session, request: OTPVerifyRequest):
         )
 
 
-def reset_password(db: Session, request: ResetPasswordRequest):
+async def reset_password(db: Session, request: ResetPasswordRequest):
     # Validate OTP format
     if not validate_otp_format(request.otp):
         raise HTTPException(
@@ -391,39 +629,41 @@ def reset_password(db: Session, request: ResetPasswordRequest):
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
         )
     # Check if OTP exists
-    if not db_admin_user.otp:
+    reset = (
+        db.query(PasswordResetModel)
+        .filter(
+            PasswordResetModel.admin_user_id == db_admin_user.id,
+            PasswordResetModel.kind == "otp",
+        )
+        .first()
+    )
+    if not reset:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No OTP found. Please request a new one.",
         )
     # Check expiration
-    if is_otp_expired(db_admin_user):
-        # Clear expired OTP
-        db_admin_user.otp = None
-        db_admin_user.otp_expires_at = None
-        db_admin_user.otp_attempts = 0
-        db.commit()
+    if is_expired(reset):
+        # Left for the sweeper; no cleanup commit on the request path
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="OTP has expired. Please request a new one.",
         )
     # Check attempt limit
-    if (db_admin_user.otp_attempts or 0) >= MAX_OTP_ATTEMPTS:
-        # Clear OTP after max attempts
-        db_admin_user.otp = None
-        db_admin_user.otp_expires_at = None
-        db_admin_user.otp_attempts = 0
-        db.commit()
+    attempts_key = otp_attempts_key(reset.id)
+    if auth_counters.count(attempts_key, OTP_EXPIRY_MINUTES * 60) >= MAX_OTP_ATTEMPTS:
+        discard_password_reset(db, reset)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Too many verification attempts. Please request a new OTP.",
         )
     # Verify OTP
-    if not verify_otp_hash(request.otp, db_admin_user.otp):
-        # Increment attempt counter
-        db_admin_user.otp_attempts = (db_admin_user.otp_attempts or 0) + 1
-        db.commit()
-        remaining_attempts = MAX_OTP_ATTEMPTS - db_admin_user.otp_attempts
+    if not verify_otp_hash(request.otp, reset.secret_hash):
+        # Count the failure outside the database
+        attempts = auth_counters.hit(
+            attempts_key, OTP_EXPIRY_MINUTES * 60, MAX_OTP_ATTEMPTS
+        )
+        remaining_attempts = MAX_OTP_ATTEMPTS - attempts
         if remaining_attempts <= 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -434,12 +674,13 @@ def reset_password(db: Session, request: ResetPasswordRequest):
             detail=f"Invalid OTP. {remaining_attempts} attempts remaining.",
         )
     # OTP is valid - reset password and clear OTP
-    db_admin_user.password = create_password(request.new_password)
-    db_admin_user.otp = None
-    db_admin_user.otp_expires_at = None
-    db_admin_user.otp_attempts = 0
+    db_admin_user.password = await password_pool.hash(request.new_password)
     db_admin_user.updated_at = now()
+    db.delete(reset)
     db.commit()
+    auth_counters.reset(attempts_key)
+    revoke_admin_sessions(db, db_admin_user.id)
+    invalidate_principal(db_admin_user.id)
     logger.info(f"Password reset successfully for user: {db_admin_user.email}")
     return db_admin_user
 
@@ -457,34 +698,20 @@ def send_password_reset_link(
             # Don't reveal if email exists or not for security
             return {"detail": "If the email exists, a reset link has been sent."}
         # Check rate limiting
-        if is_rate_limited(db_admin_user):
+        if is_rate_limited(db_admin_user.id):
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"Too many reset requests. Try again after {RATE_LIMIT_HOURS} hour(s).",
             )
-        # Generate secure reset token
+        # Generate secure reset token and store its hash
         reset_token = generate_reset_token()
-        current_time = now()
-        # Update rate limiting counters
-        if (
-            db_admin_user.otp_generated_at
-            and current_time - db_admin_user.otp_generated_at
-            < timedelta(hours=RATE_LIMIT_HOURS)
-        ):
-            db_admin_user.otp_generation_count = (
-                db_admin_user.otp_generation_count or 0
-            ) + 1
-        else:
-            db_admin_user.otp_generation_count = 1
-        # Store hashed reset token
-        db_admin_user.reset_token = hash_reset_token(reset_token)
-        db_admin_user.reset_token_expires_at = current_time + timedelta(
-            minutes=RESET_TOKEN_EXPIRY_MINUTES
-        )
-        db_admin_user.reset_token_used = False
-        db_admin_user.otp_generated_at = current_time
-        db_admin_user.updated_at = current_time
-        db.commit()
+        create_password_reset(
+            db,
+            db_admin_user.id,
+            "link",
+            hash_reset_token(reset_token),
+            timedelta(minutes=RESET_TOKEN_EXPIRY_MINUTES),
+        )
         # Create reset link
         reset_link = f"{base_url}/reset-password?token={reset_token}"
         logger.info(f"Reset token generated for user: {db_admin_user.email}")
@@ -495,19 +722,14 @@ def send_password_reset_link(
             reset_link=reset_link,
             expiry_minutes=RESET_TOKEN_EXPIRY_MINUTES,
         )
-        if not send_email(
+        enqueue_email(
+            db,
             recipients=[db_admin_user.email],
             subject="Password Reset Request - Secure Link",
             html_body=email_body,
-        ):
-            logger.error(
-                f"Failed to send password reset email to: {db_admin_user.email}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error while sending email.",
-            )
-        logger.info(f"Password reset link sent successfully to: {db_admin_user.email}")
+        )
+        db.commit()
+        logger.info(f"Password reset link queued for: {db_admin_user.email}")
         return {
             "detail": f"Password reset link has been sent to your email. Valid for {RESET_TOKEN_EXPIRY_MINUTES} minutes."
         }
@@ -528,8 +750,10 @@ def send_password_reset_link(
         )
 
 
-def verify_reset_token_and_get_user(db: Session, token: str) -> AdminUserModel:
-    """Verify reset token and return user if valid"""
+def get_reset_link(
+    db: Session, token: str
+) -> Tuple[PasswordResetModel, AdminUserModel]:
+    """Verify reset token and return it with its user if valid"""
     try:
         if not token:
             raise HTTPException(
@@ -538,38 +762,34 @@ def verify_reset_token_and_get_user(db: Session, token: str) -> AdminUserModel:
             )
         # Hash the provided token to compare with stored hash
         token_hash = hash_reset_token(token)
-        # Find user with this token
-        db_admin_user = (
-            db.query(AdminUserModel)
+        reset = (
+            db.query(PasswordResetModel)
             .filter(
-                AdminUserModel.reset_token == token_hash,
-                AdminUserModel.is_deleted.is_(False),
+                PasswordResetModel.secret_hash == token_hash,
+                PasswordResetModel.kind == "link",
             )
             .first()
         )
+        db_admin_user = get_admin_user_by_id(db, reset.admin_user_id) if reset else None
         if not db_admin_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid or expired reset token",
             )
         # Check if token is expired
-        if is_reset_token_expired(db_admin_user):
-            # Clear expired token
-            db_admin_user.reset_token = None
-            db_admin_user.reset_token_expires_at = None
-            db_admin_user.reset_token_used = False
-            db.commit()
+        if is_expired(reset):
+            # Left for the sweeper; no cleanup commit on the request path
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Reset token has expired. Please request a new one.",
             )
         # Check if token was already used
-        if db_admin_user.reset_token_used:
+        if reset.used_at is not None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Reset token has already been used. Please request a new one.",
             )
-        return db_admin_user
+        return reset, db_admin_user
     except HTTPException:
         raise
     except Exception as e:
@@ -580,19 +800,24 @@ def verify_reset_token_and_get_user(db: Session, token: str) -> AdminUserModel:
         )
 
 
-def reset_password_with_token(db: Session, token: str, new_password: str):
+def verify_reset_token_and_get_user(db: Session, token: str) -> AdminUserModel:
+    """Verify reset token and return user if valid"""
+    return get_reset_link(db, token)[1]
+
+
+async def reset_password_with_token(db: Session, token: str, new_password: str):
     """Reset password using secure token"""
     try:
         # Verify token and get user
-        db_admin_user = verify_reset_token_and_get_user(db, token)
+        reset, db_admin_user = get_reset_link(db, token)
         # Reset password
-        db_admin_user.password = create_password(new_password)
-        # Mark token as used and clear it
-        db_admin_user.reset_token = None
-        db_admin_user.reset_token_expires_at = None
-        db_admin_user.reset_token_used = True
+        db_admin_user.password = await password_pool.hash(new_password)
         db_admin_user.updated_at = now()
+        # Mark token as used
+        reset.used_at = now().replace(tzinfo=None)
         db.commit()
+        revoke_admin_sessions(db, db_admin_user.id)
+        invalidate_principal(db_admin_user.id)
         logger.info(
             f"Password reset successfully using token for user: {db_admin_user.email}"
         )
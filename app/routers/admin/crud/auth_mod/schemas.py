@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, validator
 from typing import Optional
 
 
@@ -17,6 +17,23 @@ class LoginResponse(BaseModel):
     refresh_token: str
 
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+
+class TokenPairResponse(BaseModel):
+    token: str
+    refresh_token: str
+
+
+class AdminPrincipal(BaseModel):
+    id: str
+    first_name: str
+    last_name: str
+    email: str
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
 class Profile(BaseModel):
     first_name: str
     last_name: str
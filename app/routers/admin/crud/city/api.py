@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Query, Path, Depends, HTTPException, status
-from typing import Optional, Dict, Any
+from typing import Optional, Dict
 from sqlalchemy.orm import Session
+from app.core.timing import TimedRoute
 from app.database import get_db
-from app.security import get_current_user
+from app.routers.admin.crud.auth_mod.crud import get_current_admin
+from app.routers.admin.crud.auth_mod.schemas import AdminPrincipal
 from . import crud, schemas
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 def admin_auth(
     db: Session = Depends(get_db),
-    current_user: Dict[str, Any] = Depends(get_current_user),
+    current_user: AdminPrincipal = Depends(get_current_admin),
 ) -> Session:
     if not current_user:
         raise HTTPException(
@@ -18,7 +20,7 @@ def admin_auth(
     return db
 
 @router.get("/cities", response_model=schemas.CityList, tags=["Cities"], summary="Get all cities", description="GET /cities - Retrieve paginated list of cities with optional filtering by state/country")
-async def get_cities(
+def get_cities(
     start: int = Query(0, ge=0, description="Starting offset"),
     limit: int = Query(10, ge=1, le=100, description="Number of records to return"),
     sort_by: Optional[str] = Query(None, max_length=50),
@@ -1,16 +1,18 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
 from sqlalchemy.orm import Session
+from app.core.timing import TimedRoute
 from app.database import get_db
-from app.security import get_current_user
+from app.routers.admin.crud.auth_mod.crud import get_current_admin
+from app.routers.admin.crud.auth_mod.schemas import AdminPrincipal
 from . import crud, schemas
 
-router = APIRouter(prefix="/countries", tags=["Countries"])
+router = APIRouter(prefix="/countries", tags=["Countries"], route_class=TimedRoute)
 
 
 def admin_auth(
     db: Session = Depends(get_db),
-    current_user: Dict[str, Any] = Depends(get_current_user),
+    current_user: AdminPrincipal = Depends(get_current_admin),
 ) -> Session:
     if not current_user:
         raise HTTPException(
@@ -25,7 +27,7 @@ def admin_auth(
     summary="Get all countries",
     description="GET /countries - Retrieve a paginated list of countries with optional search and sorting",
 )
-async def get_countries(
+def get_countries(
     start: int = Query(0, ge=0, description="Starting index for pagination"),
     limit: int = Query(10, ge=1, le=100, description="Number of items to return"),
     search: Optional[str] = Query(
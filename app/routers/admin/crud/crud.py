@@ -7,11 +7,18 @@ from sqlalchemy.orm import DeclarativeMeta
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 from sqlalchemy.sql.sqltypes import String as SQLAlchemyString
 from sqlalchemy.inspection import inspect
+from app.core.events import publish_change
+from app.core.tracing import traced
 from app.libs.utils import generate_id, now
 
 logger = logging.getLogger(__name__)
 
 
+def _table(db: Session, model_class: Type[DeclarativeMeta], *args, **kwargs):
+    return {"db.sql.table": model_class.__tablename__}
+
+
+@traced("crud.get_record_by_id", _table)
 def get_record_by_id(
     db: Session, model_class: Type[DeclarativeMeta], id: str
 ) -> Optional[Any]:
@@ -25,6 +32,7 @@ def get_record_by_id(
     )
 
 
+@traced("crud.get_record_by_value", _table)
 def get_record_by_value(
     db: Session, model_class: Type[DeclarativeMeta], value: str
 ) -> Optional[Any]:
@@ -164,6 +172,7 @@ def get_sort_field(sort_by: str, sort_listing: List[str]) -> str:
     raise HTTPException(status_code=400, detail=f"Invalid sort field: {sort_by}")
 
 
+@traced("crud.get_records", _table)
 def get_records(
     db: Session,
     model_class: Type[DeclarativeMeta],
@@ -210,6 +219,7 @@ def get_records(
     return {"count": count, "list": results}
 
 
+@traced("crud.get_record", _table)
 def get_record(
     db: Session,
     model_class: Type[DeclarativeMeta],
@@ -237,15 +247,18 @@ def get_record(
     return db_record
 
 
+@traced("crud.create_record", _table)
 def create_record(
     db: Session, model_class: Type[DeclarativeMeta], request_schema: Any
 ) -> Any:
     record = model_class(id=generate_id(), **request_schema.model_dump())
     db.add(record)
     db.commit()
+    publish_change(record, "created")
     return record
 
 
+@traced("crud.update_record", _table)
 def update_record(
     db: Session, model_class: Type[DeclarativeMeta], record_id: str, request_schema: Any
 ) -> Any:
@@ -264,9 +277,11 @@ def update_record(
         setattr(db_record, field, value)
     db_record.updated_at = now()
     db.commit()
+    publish_change(db_record, "updated")
     return db_record
 
 
+@traced("crud.delete_record", _table)
 def delete_record(
     db: Session, model_class: Type[DeclarativeMeta], record_id: str
 ) -> Any:
@@ -284,6 +299,7 @@ def delete_record(
     db_record.is_deleted = True
     db_record.updated_at = now()
     db.commit()
+    publish_change(db_record, "deleted")
     return db_record
 
 
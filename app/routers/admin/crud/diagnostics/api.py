@@ -0,0 +1,142 @@
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.timing import TimedRoute
+from app.database import get_db
+from app.routers.admin.crud.auth_mod.crud import get_current_admin
+from app.routers.admin.crud.auth_mod.schemas import AdminPrincipal
+from . import crud, schemas
+
+router = APIRouter(prefix="/diagnostics", tags=["Diagnostics"], route_class=TimedRoute)
+
+
+def admin_auth(
+    db: Session = Depends(get_db),
+    current_user: AdminPrincipal = Depends(get_current_admin),
+) -> Session:
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required"
+        )
+    return db
+
+
+@router.get(
+    "/profile",
+    summary="Sample a CPU profile",
+    description="GET /diagnostics/profile - Profile this worker process for N seconds and return collapsed stacks or a speedscope profile",
+)
+async def get_profile(
+    request: Request,
+    seconds: float = Query(10, gt=0, description="How long to sample"),
+    interval_ms: float = Query(
+        10, ge=1, le=1000, description="Time between samples in milliseconds"
+    ),
+    route: Optional[str] = Query(
+        None, max_length=255, description="Only stacks of this route, e.g. /countries/"
+    ),
+    method: Optional[str] = Query(None, max_length=10, description="HTTP method"),
+    format: str = Query(
+        "speedscope", pattern="^(speedscope|collapsed)$", description="Output format"
+    ),
+    db: Session = Depends(admin_auth),
+) -> Response:
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be at most {settings.PROFILER_MAX_SECONDS}",
+        )
+    # Don't keep a pooled connection checked out while sampling
+    db.close()
+    codes = crud.route_codes(request.app.routes, route, method) if route else None
+    profile = await run_in_threadpool(
+        crud.run_profile, seconds, interval_ms / 1000, codes
+    )
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    name = f"{method or ''} {route or 'all routes'}".strip()
+    return JSONResponse(profile.speedscope(name))
+
+
+@router.get(
+    "/memory",
+    response_model=schemas.MemoryStatus,
+    summary="Memory tracing status",
+    description="GET /diagnostics/memory - Whether tracemalloc is on, traced and resident memory, and the stored snapshots",
+)
+def get_memory_status(db: Session = Depends(admin_auth)) -> Dict[str, Any]:
+    return crud.get_memory_status()
+
+
+@router.post(
+    "/memory/start",
+    response_model=schemas.MemoryStatus,
+    summary="Start memory tracing",
+    description="POST /diagnostics/memory/start - Start tracemalloc in this worker, keeping N frames per allocation",
+)
+def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=50, description="Stack frames per allocation"),
+    db: Session = Depends(admin_auth),
+) -> Dict[str, Any]:
+    return crud.start_memory_tracing(frames)
+
+
+@router.post(
+    "/memory/stop",
+    response_model=schemas.MemoryStatus,
+    summary="Stop memory tracing",
+    description="POST /diagnostics/memory/stop - Stop tracemalloc; stored snapshots are kept",
+)
+def stop_memory_tracing(db: Session = Depends(admin_auth)) -> Dict[str, Any]:
+    return crud.stop_memory_tracing()
+
+
+@router.post(
+    "/memory/snapshots",
+    response_model=schemas.SnapshotInfo,
+    summary="Take a memory snapshot",
+    description="POST /diagnostics/memory/snapshots - Snapshot the allocations traced so far",
+)
+def take_memory_snapshot(db: Session = Depends(admin_auth)) -> Dict[str, Any]:
+    return crud.take_memory_snapshot()
+
+
+@router.delete(
+    "/memory/snapshots/{snapshot_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a memory snapshot",
+    description="DELETE /diagnostics/memory/snapshots/{id} - Drop a stored snapshot",
+)
+def delete_memory_snapshot(snapshot_id: int, db: Session = Depends(admin_auth)) -> None:
+    crud.delete_memory_snapshot(snapshot_id)
+
+
+@router.get(
+    "/memory/diff",
+    response_model=schemas.AllocationDiffList,
+    summary="Diff two memory snapshots",
+    description="GET /diagnostics/memory/diff - Allocation growth between two snapshots by file or file and line",
+)
+def diff_memory_snapshots(
+    base: int = Query(..., description="Earlier snapshot ID"),
+    compare: int = Query(..., description="Later snapshot ID"),
+    group_by: str = Query(
+        "lineno", pattern="^(lineno|filename)$", description="lineno | filename"
+    ),
+    limit: int = Query(25, ge=1, le=500, description="Number of rows"),
+    db: Session = Depends(admin_auth),
+) -> Dict[str, Any]:
+    return crud.diff_memory_snapshots(base, compare, group_by, limit)
+
+
+@router.get(
+    "/memory/objects",
+    response_model=schemas.ObjectCounts,
+    summary="Live object counts",
+    description="GET /diagnostics/memory/objects - Live SQLAlchemy sessions, identity map entries, model instances and cache sizes in this worker",
+)
+def get_object_counts(db: Session = Depends(admin_auth)) -> Dict[str, Any]:
+    return crud.get_object_counts()
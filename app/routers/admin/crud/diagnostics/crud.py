@@ -0,0 +1,113 @@
+import inspect
+from types import CodeType
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set
+from fastapi import HTTPException, status
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute
+from app.core.memory import memory_diagnostics, object_counts, rss_bytes
+from app.core.profiler import Profile, ProfilerBusy, profiler
+from app.middleware.api_logging import api_log_writer
+
+
+def _code(call: Any) -> Optional[CodeType]:
+    # Endpoints are wrapped by TimedRoute / traced; profile the original
+    return getattr(inspect.unwrap(call), "__code__", None)
+
+
+def _dependency_codes(dependant: Dependant, codes: Set[CodeType]) -> None:
+    for dependency in dependant.dependencies:
+        if dependency.call is not None:
+            code = _code(dependency.call)
+            if code is not None:
+                codes.add(code)
+        _dependency_codes(dependency, codes)
+
+
+def _api_routes(routes: List[BaseRoute]) -> Iterator[APIRoute]:
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+            continue
+        # Newer FastAPI keeps included routers nested instead of copying
+        # their routes into the app
+        nested = getattr(route, "original_router", None) or route
+        yield from _api_routes(getattr(nested, "routes", None) or [])
+
+
+def route_codes(
+    routes: List[BaseRoute], path: str, method: Optional[str] = None
+) -> FrozenSet[CodeType]:
+    """Code objects of a route's endpoint and of the dependencies only it
+    uses. Shared ones (database session, auth) run for every route, so
+    keeping them would pull in stacks from all traffic."""
+    codes: Set[CodeType] = set()
+    shared: Set[CodeType] = set()
+    endpoints: Set[CodeType] = set()
+    for route in _api_routes(routes):
+        methods = route.methods or set()
+        if route.path == path and (method is None or method.upper() in methods):
+            code = _code(route.dependant.call)
+            if code is not None:
+                endpoints.add(code)
+            _dependency_codes(route.dependant, codes)
+        else:
+            _dependency_codes(route.dependant, shared)
+    if not endpoints:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Route {path} not found"
+        )
+    return frozenset(endpoints | (codes - shared))
+
+
+def run_profile(
+    seconds: float, interval: float, codes: Optional[FrozenSet[CodeType]]
+) -> Profile:
+    try:
+        return profiler.sample(seconds, interval, codes)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+def get_memory_status() -> Dict[str, Any]:
+    return memory_diagnostics.status()
+
+
+def start_memory_tracing(frames: int) -> Dict[str, Any]:
+    return memory_diagnostics.start(frames)
+
+
+def stop_memory_tracing() -> Dict[str, Any]:
+    return memory_diagnostics.stop()
+
+
+def take_memory_snapshot() -> Dict[str, Any]:
+    try:
+        return memory_diagnostics.take_snapshot()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+def diff_memory_snapshots(
+    base: int, compare: int, group_by: str, limit: int
+) -> Dict[str, Any]:
+    try:
+        rows = memory_diagnostics.diff(base, compare, group_by, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+    return {"base": base, "compare": compare, "list": rows}
+
+
+def delete_memory_snapshot(snapshot_id: int) -> None:
+    try:
+        memory_diagnostics.delete(snapshot_id)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+
+
+def get_object_counts() -> Dict[str, Any]:
+    return {
+        **object_counts(),
+        "api_log_buffered": api_log_writer.stats()["buffered"],
+        "rss_bytes": rss_bytes(),
+    }
@@ -0,0 +1,51 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+
+class SnapshotInfo(BaseModel):
+    id: int
+    # Epoch seconds
+    taken_at: float
+    rss_bytes: Optional[int] = None
+    traced_bytes: int
+
+
+class MemoryStatus(BaseModel):
+    tracing: bool
+    frames: int
+    traced_bytes: int
+    traced_peak_bytes: int
+    tracemalloc_overhead_bytes: int
+    rss_bytes: Optional[int] = None
+    snapshots: List[SnapshotInfo]
+
+
+class AllocationDiff(BaseModel):
+    file: str
+    line: Optional[int] = None
+    size_diff_bytes: int
+    count_diff: int
+    size_bytes: int
+    count: int
+
+
+class AllocationDiffList(BaseModel):
+    base: int
+    compare: int
+    list: List[AllocationDiff]
+
+
+class CacheSize(BaseModel):
+    size: int
+    maxsize: int
+
+
+class ObjectCounts(BaseModel):
+    sessions: int
+    identity_map_entries: int
+    model_instances: Dict[str, int]
+    ttl_caches: List[CacheSize]
+    gc_counts: List[int]
+    # Rows waiting in the api_logs writer
+    api_log_buffered: int
+    rss_bytes: Optional[int] = None
@@ -0,0 +1,58 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
+from sqlalchemy.orm import Session
+from app.core.timing import TimedRoute
+from app.database import get_db
+from app.routers.admin.crud.auth_mod.crud import get_current_admin
+from app.routers.admin.crud.auth_mod.schemas import AdminPrincipal
+from . import crud, schemas
+
+router = APIRouter(prefix="/emails", tags=["Emails"], route_class=TimedRoute)
+
+
+def admin_auth(
+    db: Session = Depends(get_db),
+    current_user: AdminPrincipal = Depends(get_current_admin),
+) -> Session:
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required"
+        )
+    return db
+
+
+@router.get(
+    "/",
+    response_model=schemas.EmailStatusList,
+    summary="Get outbox emails",
+    description="GET /emails - Delivery status of queued emails, newest first",
+)
+def get_emails(
+    start: int = Query(0, ge=0, description="Starting index for pagination"),
+    limit: int = Query(10, ge=1, le=100, description="Number of items to return"),
+    status: Optional[str] = Query(
+        None,
+        pattern="^(pending|sending|sent|failed)$",
+        description="pending | sending | sent | failed",
+    ),
+    search: Optional[str] = Query(
+        None, max_length=100, description="Search term for recipient or subject"
+    ),
+    db: Session = Depends(admin_auth),
+) -> schemas.EmailStatusList:
+    return crud.get_emails(
+        db=db, start=start, limit=limit, status=status, search=search
+    )
+
+
+@router.get(
+    "/{email_id}",
+    response_model=schemas.EmailStatus,
+    summary="Get email status",
+    description="GET /emails/{id} - Delivery status of one queued email",
+)
+async def get_email(
+    email_id: str = Path(..., min_length=36, max_length=36, description="Email ID"),
+    db: Session = Depends(admin_auth),
+) -> schemas.EmailStatus:
+    return crud.get_email_by_id(db, email_id)
@@ -0,0 +1,31 @@
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
+from app.models import EmailOutboxModel
+from app.routers.admin.crud.crud import get_records, get_record
+
+
+def get_emails(
+    db: Session,
+    start: int,
+    limit: int,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+) -> Dict[str, Any]:
+    filters: Dict[str, Any] = {"status": status} if status else {}
+    return get_records(
+        db=db,
+        model_class=EmailOutboxModel,
+        start=start,
+        limit=limit,
+        search=search,
+        search_fields=["recipients", "subject"] if search else None,
+        sort_by="created_at",
+        order="desc",
+        filters=filters,
+    )
+
+
+def get_email_by_id(db: Session, email_id: str) -> EmailOutboxModel:
+    return get_record(
+        db=db, model_class=EmailOutboxModel, filters={"id": email_id.strip()}
+    )
@@ -0,0 +1,24 @@
+import json
+from datetime import datetime
+from typing import List, Optional
+from pydantic import field_validator
+from app.routers.admin.crud.schemas import EntityMixin, ListResponseMixin
+
+
+class EmailStatus(EntityMixin):
+    recipients: List[str]
+    subject: str
+    status: str
+    attempts: int
+    next_attempt_at: datetime
+    last_error: Optional[str] = None
+    sent_at: Optional[datetime] = None
+
+    @field_validator("recipients", mode="before")
+    @classmethod
+    def parse_recipients(cls, v):
+        return json.loads(v) if isinstance(v, str) else v
+
+
+class EmailStatusList(ListResponseMixin):
+    list: List[EmailStatus]
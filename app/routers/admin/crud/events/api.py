@@ -0,0 +1,71 @@
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.core.timing import TimedRoute
+from app.config import settings
+from app.database import get_db
+from app.core.events import event_broker, event_matches, format_sse
+from app.routers.admin.crud.auth_mod.crud import get_current_admin
+from app.routers.admin.crud.auth_mod.schemas import AdminPrincipal
+
+router = APIRouter(prefix="/events", tags=["Events"], route_class=TimedRoute)
+
+
+async def change_stream(
+    last_seq: int,
+    reset: bool,
+    tables: Optional[List[str]],
+    country_id: Optional[str],
+    state_id: Optional[str],
+) -> AsyncIterator[str]:
+    # Tell the client how often to retry and whether it must refetch
+    yield f"retry: {int(settings.EVENTS_HEARTBEAT_SECONDS * 1000)}\n\n"
+    if reset:
+        yield f"id: {event_broker.epoch}-{last_seq}\nevent: reset\ndata: {{}}\n\n"
+    event_broker.subscribers += 1
+    try:
+        while not event_broker.closed:
+            events = await event_broker.wait_for_events(
+                last_seq, settings.EVENTS_HEARTBEAT_SECONDS
+            )
+            if events is None:
+                # Client fell behind the ring buffer; it has to reload
+                last_seq = event_broker.last_seq
+                yield f"id: {event_broker.epoch}-{last_seq}\nevent: reset\ndata: {{}}\n\n"
+                continue
+            if not events:
+                yield ": heartbeat\n\n"
+                continue
+            for event in events:
+                last_seq = event["seq"]
+                if event_matches(event, tables, country_id, state_id):
+                    yield format_sse(event)
+    finally:
+        event_broker.subscribers -= 1
+
+
+@router.get(
+    "/stream",
+    summary="Stream data changes",
+    description="GET /events/stream - Server-sent events for country, state and city changes",
+)
+async def stream_events(
+    tables: Optional[str] = Query(
+        None, description="Comma separated tables: countries,states,cities"
+    ),
+    country_id: Optional[str] = Query(None, description="Only changes in this country"),
+    state_id: Optional[str] = Query(None, description="Only changes in this state"),
+    last_event_id: Optional[str] = Header(None),
+    current_user: AdminPrincipal = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    # Auth is done; don't pin a pooled connection for the life of the stream
+    db.close()
+    last_seq, reset = event_broker.parse_event_id(last_event_id)
+    table_list = [t.strip() for t in tables.split(",") if t.strip()] if tables else None
+    return StreamingResponse(
+        change_stream(last_seq, reset, table_list, country_id, state_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
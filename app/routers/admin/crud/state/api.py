@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Query, Path, Depends, HTTPException, status
-from typing import Optional, Dict, Any
+from typing import Optional, Dict
 from sqlalchemy.orm import Session
+from app.core.timing import TimedRoute
 from app.database import get_db
-from app.security import get_current_user
+from app.routers.admin.crud.auth_mod.crud import get_current_admin
+from app.routers.admin.crud.auth_mod.schemas import AdminPrincipal
 from . import crud, schemas
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
-def admin_auth(db: Session = Depends(get_db), current_user: Dict[str, Any] = Depends(get_current_user)) -> Session:
+def admin_auth(db: Session = Depends(get_db), current_user: AdminPrincipal = Depends(get_current_admin)) -> Session:
     if not current_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -16,7 +18,7 @@ def admin_auth(db: Session = Depends(get_db), current_user: Dict[str, Any] = Dep
     return db
 
 @router.get("/states", response_model=schemas.StateList, tags=["States"], summary="Get all states", description="GET /states - Retrieve paginated list of states with optional filtering by country")
-async def get_states(
+def get_states(
     start: int = Query(0, ge=0, description="Starting offset"),
     limit: int = Query(10, ge=1, le=100, description="Number of records to return"),
     sort_by: Optional[str] = Query(None, max_length=50),
@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from app.core.health import health_monitor
+from app.core.metrics import render_metrics
+from app.project_info import PROJECT_VERSION
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/health")
+async def health():
+    """Overall status for people and dashboards; always 200"""
+    ready, report = health_monitor.readiness()
+    report["status"] = "ok" if ready else "degraded"
+    return {"version": PROJECT_VERSION, **report}
+
+
+@router.get("/health/live")
+async def liveness():
+    """Answers as long as the event loop does; no I/O"""
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def readiness():
+    """503 until the last background database check succeeded"""
+    ready, report = health_monitor.readiness()
+    return JSONResponse(report, status_code=200 if ready else 503)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Multiprocess collection reads every worker's files; keep it off the loop
+    body, content_type = await run_in_threadpool(render_metrics)
+    return Response(content=body, media_type=content_type)
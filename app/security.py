@@ -1,31 +1,31 @@
 import secrets
 import hashlib
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from typing import Optional, Dict, Any
-from jose import jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from app.config import settings
+from app.core.passwords import password_hasher
+from app.core.revocation import revocation_list, session_revoked_in_db
+from app.core.timing import phase
+from app.core.tokens import access_tokens, refresh_tokens
+from app.libs.utils import generate_id
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # JWT settings
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-REFRESH_TOKEN_EXPIRE_DAYS = 7
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 # Security scheme
 security = HTTPBearer()
 
 
 def hash_password(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def generate_otp(length: int = 6) -> str:
@@ -36,35 +36,56 @@ def generate_otp(length: int = 6) -> str:
 def create_access_token(data: Dict[str, Any]) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, settings.ACCESS_JWT_KEY, algorithm=ALGORITHM)
+    to_encode.update({"type": "access"})
+    return access_tokens.issue(
+        to_encode, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
 
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
     """Create JWT refresh token"""
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, settings.REFRESH_JWT_KEY, algorithm=ALGORITHM)
+    to_encode.update({"type": "refresh"})
+    return refresh_tokens.issue(to_encode, timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+
+
+def create_token_pair(
+    admin_user_id: str, email: str, session_id: str, refresh_jti: str
+) -> Dict[str, str]:
+    """Create the access/refresh pair for a refresh session"""
+    claims = {"sub": admin_user_id, "email": email, "sid": session_id}
+    return {
+        "token": create_access_token({**claims, "jti": generate_id()}),
+        "refresh_token": create_refresh_token({**claims, "jti": refresh_jti}),
+    }
 
 
 def verify_access_token(token: str) -> Dict[str, Any]:
     """Verify and decode access token"""
-    return jwt.decode(token, settings.ACCESS_JWT_KEY, algorithms=[ALGORITHM])
+    return access_tokens.verify(token)
 
 
 def verify_refresh_token(token: str) -> Dict[str, Any]:
     """Verify and decode refresh token"""
-    return jwt.decode(token, settings.REFRESH_JWT_KEY, algorithms=[ALGORITHM])
+    return refresh_tokens.verify(token)
+
+
+def ensure_session_active(payload: Dict[str, Any]) -> None:
+    """Reject access tokens whose refresh session has been revoked"""
+    session_id = payload.get("sid")
+    if session_id and revocation_list.is_revoked(session_id, session_revoked_in_db):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Session revoked")
 
 
-async def get_current_user(credentials=Depends(security)) -> Dict[str, Any]:
-    """Get current user from JWT token"""
-    try:
-        payload = verify_access_token(credentials.credentials)
-        if not payload.get("sub"):
+def get_current_user(credentials=Depends(security)) -> Dict[str, Any]:
+    """Get current user from JWT token. Sync, so FastAPI runs it in the
+    threadpool: confirming a revocation-filter hit queries the database"""
+    with phase("auth"):
+        try:
+            payload = verify_access_token(credentials.credentials)
+            if not payload.get("sub") or payload.get("type") == "refresh":
+                raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token")
+        except Exception:
             raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token")
-        return payload
-    except Exception:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token")
+        ensure_session_active(payload)
+    return payload
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Read latency during a login storm, inline bcrypt vs the password pool.
+
+A probe coroutine stands in for cheap read endpoints: it wakes every few
+milliseconds and records how late it was scheduled. Meanwhile a burst of
+concurrent logins verifies passwords either inline on the event loop (the
+old behaviour) or through password_pool.
+"""
+
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+import asyncio
+import statistics
+import time
+import bcrypt
+from app.core.passwords import PasswordPool
+
+PROBE_INTERVAL = 0.005
+
+
+async def probe(stop: asyncio.Event, delays: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def storm(label: str, verify, logins: int, concurrency: int) -> None:
+    stop = asyncio.Event()
+    delays: list = []
+    probe_task = asyncio.create_task(probe(stop, delays))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            await verify()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    delays.sort()
+    p99 = delays[min(len(delays) - 1, int(len(delays) * 0.99))] if delays else 0.0
+    print(
+        f"{label:<8} {logins / elapsed:>7.1f} logins/s  "
+        f"read lag p50 {statistics.median(delays or [0]) * 1000:>7.2f} ms  "
+        f"p99 {p99 * 1000:>7.2f} ms  max {max(delays or [0]) * 1000:>7.2f} ms"
+    )
+
+
+async def main(args) -> None:
+    password = "correct horse battery staple"
+    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt(args.rounds)).decode()
+    pool = PasswordPool(workers=args.workers, max_queue=args.logins)
+
+    async def inline_verify():
+        bcrypt.checkpw(password.encode(), hashed.encode())
+        await asyncio.sleep(0)
+
+    async def pooled_verify():
+        await pool.verify(password, hashed)
+
+    await pool.verify(password, hashed)  # spawn workers before timing
+    await storm("inline", inline_verify, args.logins, args.concurrency)
+    await storm("pool", pooled_verify, args.logins, args.concurrency)
+    print(f"pool stats: {pool.stats()}")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    asyncio.run(main(parser.parse_args()))
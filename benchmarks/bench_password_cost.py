@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Print bcrypt verify latency for each cost level on this host.
+
+Use it to choose PASSWORD_HASH_TARGET_MS or to pin PASSWORD_HASH_ROUNDS.
+"""
+
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+from app.config import settings
+from app.core.passwords import PasswordHasher, measure_rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-rounds", type=int, default=4)
+    parser.add_argument("--max-rounds", type=int, default=14)
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument(
+        "--target-ms", type=float, default=settings.PASSWORD_HASH_TARGET_MS
+    )
+    args = parser.parse_args()
+    print(f"{'cost':>4}  {'verify ms':>10}  {'verifies/s/core':>16}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        elapsed = measure_rounds(rounds, samples=args.samples)
+        print(f"{rounds:>4}  {elapsed * 1000:>10.1f}  {1 / elapsed:>16.1f}")
+    hasher = PasswordHasher(
+        rounds=0,
+        min_rounds=settings.PASSWORD_HASH_MIN_ROUNDS,
+        max_rounds=settings.PASSWORD_HASH_MAX_ROUNDS,
+    )
+    chosen = hasher.calibrate(args.target_ms)
+    print(f"calibrated cost for {args.target_ms:.0f} ms target: {chosen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""SMTP throughput: a new session per message vs the pooled sessions.
+
+Runs a local aiosmtpd server and sends the same messages three ways:
+connect/EHLO/send/QUIT for every message (the old send_email), one pooled
+session reused per message, and pooled batches. Real providers add TLS and
+AUTH round trips on top of every connect, so the gap only grows there.
+"""
+
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+import smtplib
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from aiosmtpd.controller import Controller
+from app.config import settings
+from app.libs.emails import SMTPPool, build_message
+
+
+class NullHandler:
+    async def handle_DATA(self, server, session, envelope):
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def report(label: str, count: int, elapsed: float, connects: int) -> None:
+    print(
+        f"{label:<16} {count / elapsed:>8.1f} msg/s  "
+        f"{elapsed * 1000 / count:>6.2f} ms/msg  connects {connects}"
+    )
+
+
+def main(args) -> None:
+    emails = [
+        ([f"user{i}@example.com"], "Benchmark", "<p>Hello</p>")
+        for i in range(args.messages)
+    ]
+
+    started = time.perf_counter()
+
+    def send_unpooled(email):
+        recipients, subject, body = email
+        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
+            server.sendmail(
+                settings.SMTP_USER,
+                recipients,
+                build_message(recipients, subject, body).as_string(),
+            )
+
+    with ThreadPoolExecutor(args.workers) as executor:
+        list(executor.map(send_unpooled, emails))
+    report("per-message", len(emails), time.perf_counter() - started, len(emails))
+
+    pool = SMTPPool(size=args.workers, idle_timeout=60, timeout=10)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.workers) as executor:
+        list(executor.map(lambda email: pool.send_many([email]), emails))
+    report("pooled", len(emails), time.perf_counter() - started, pool.connects)
+    pool.close()
+
+    pool = SMTPPool(size=args.workers, idle_timeout=60, timeout=10)
+    batches = [emails[i : i + args.batch] for i in range(0, len(emails), args.batch)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.workers) as executor:
+        list(executor.map(pool.send_many, batches))
+    report("pooled batches", len(emails), time.perf_counter() - started, pool.connects)
+    pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=20)
+    args = parser.parse_args()
+    port = free_port()
+    controller = Controller(NullHandler(), hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        with patch.multiple(
+            settings,
+            SMTP_HOST="127.0.0.1",
+            SMTP_PORT=port,
+            SMTP_USER="bench@example.com",
+            SMTP_PASSWORD="",
+            SMTP_STARTTLS=False,
+        ):
+            main(args)
+    finally:
+        controller.stop()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Per-request auth cost with and without key/claims caching.
+
+Simulates a pool of active sessions where a few admins issue most requests
+(Zipf-like reuse), then validates every request token both the old way
+(parse JWK + JWE decrypt + JWS verify) and through decode_token.
+"""
+
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+import json
+import random
+import time
+from jwcrypto import jwk, jwt
+from app.config import settings
+from app.core.tokens import access_tokens
+from app.libs import utils
+
+
+def uncached_decode(token: str) -> dict:
+    key = jwk.JWK(**json.loads(settings.ACCESS_JWT_KEY))
+    outer = jwt.JWT(key=key, jwt=token, expected_type="JWE")
+    inner = jwt.JWT(key=key, jwt=outer.claims)
+    return json.loads(inner.claims)
+
+
+def run(label: str, decode, tokens) -> float:
+    started = time.perf_counter()
+    for token in tokens:
+        decode(token)
+    elapsed = time.perf_counter() - started
+    per_request = elapsed / len(tokens) * 1e6
+    print(f"{label:<10} {len(tokens):>7} requests  {per_request:>9.1f} us/request")
+    return per_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    if not settings.ACCESS_JWT_KEY:
+        settings.ACCESS_JWT_KEY = jwk.JWK.generate(kty="oct", size=256).export()
+    tokens = [
+        utils.get_token(utils.generate_id(), f"admin{i}@example.com", "admin")
+        for i in range(args.sessions)
+    ]
+    weights = [1 / (rank + 1) for rank in range(args.sessions)]
+    workload = random.choices(tokens, weights=weights, k=args.requests)
+    before = run("uncached", uncached_decode, workload)
+    access_tokens.cache.clear()
+    after = run("cached", utils.decode_token, workload)
+    stats = access_tokens.cache.stats()
+    print(f"hit ratio {stats['hit_ratio']:.1%}, speedup {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
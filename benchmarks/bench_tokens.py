@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Issue/verify throughput for each supported token format.
+
+Verification goes through the public verify() with the claims cache
+sized to zero, so the numbers show raw crypto cost: a cache miss, a new
+session, or a token seen by another worker.
+"""
+
+import sys, os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+import time
+from datetime import timedelta
+from jwcrypto import jwk
+from app.core.tokens import TOKEN_FORMATS, Keyring, TokenService
+
+
+def make_service(token_format: str) -> TokenService:
+    if token_format == "eddsa":
+        key = jwk.JWK.generate(kty="OKP", crv="Ed25519")
+    else:
+        key = jwk.JWK.generate(kty="oct", size=256)
+    keyring = Keyring({"bench": key.export(as_dict=True)}, "bench")
+    return TokenService(lambda: keyring, token_format=token_format, cache_size=0)
+
+
+def rate(count: int, started: float) -> float:
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+    claims = {"sub": "0" * 36, "email": "admin@example.com", "type": "access"}
+    print(f"{'format':<7} {'issue/s':>10} {'verify/s':>10} {'bytes':>6}")
+    for token_format in TOKEN_FORMATS:
+        service = make_service(token_format)
+        started = time.perf_counter()
+        tokens = [
+            service.issue(claims, timedelta(minutes=30)) for _ in range(args.tokens)
+        ]
+        issue_rate = rate(args.tokens, started)
+        started = time.perf_counter()
+        for token in tokens:
+            service.verify(token)
+        verify_rate = rate(args.tokens, started)
+        print(
+            f"{token_format:<7} {issue_rate:>10.0f} {verify_rate:>10.0f} "
+            f"{len(tokens[0]):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from app.database import Base, get_db
 
 # Import fixtures
 from tests.fixtures.test_data import *
+from tests.fixtures.smtp_server import *
 
 SQLITE_DATABASE_URL = "sqlite:///:memory:"
 
@@ -0,0 +1,41 @@
+import socket
+import pytest
+from unittest.mock import patch
+from app.config import settings
+
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps every message it receives"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """Local SMTP stand-in; settings point at it for the test's duration"""
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+    handler = RecordingHandler()
+    port = free_port()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    with patch.multiple(
+        settings,
+        SMTP_HOST="127.0.0.1",
+        SMTP_PORT=port,
+        SMTP_USER="noreply@example.com",
+        SMTP_PASSWORD="",
+        SMTP_STARTTLS=False,
+    ):
+        yield handler
+    controller.stop()
@@ -0,0 +1,127 @@
+import asyncio
+import json
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.middleware.api_logging import APILogMiddleware, APILogWriter, mask_payload
+from app.models import APILogModel, APILogRollupModel
+
+
+def make_writer(db_session, capacity=100, batch_size=10):
+    return APILogWriter(
+        session_factory=lambda: db_session,
+        capacity=capacity,
+        batch_size=batch_size,
+        flush_interval=60,
+    )
+
+
+def row(i=0):
+    return {
+        "id": f"{i:036d}",
+        "url": "/countries/",
+        "method": "GET",
+        "status_code": 200,
+        "created_at": datetime(2026, 10, 19, 12, 0, i % 60),
+    }
+
+
+def test_mask_payload_hides_secrets_and_truncates():
+    body = b'{"email": "a@b.c", "password": "hunter2", "new_password": "x"}'
+    masked = mask_payload(body, 1024)
+    assert "hunter2" not in masked
+    assert json.loads(masked) == {
+        "email": "a@b.c",
+        "password": "***",
+        "new_password": "***",
+    }
+    assert len(mask_payload(b'{"email": "a@b.c", "note": "long text"}', 10)) == 10
+    assert mask_payload(b"", 10) is None
+
+
+def test_mask_payload_redacts_any_value_type_at_any_depth():
+    masked = json.loads(
+        mask_payload(
+            b'{"new_password": "ab\\"cdef", "otp": 123456,'
+            b' "session": {"access_token": "t"}, "items": [{"secret": [1]}]}',
+            1024,
+        )
+    )
+    assert masked == {
+        "new_password": "***",
+        "otp": "***",
+        "session": {"access_token": "***"},
+        "items": [{"secret": "***"}],
+    }
+
+
+def test_mask_payload_drops_bodies_that_are_not_json():
+    # Including one cut off while being captured
+    assert mask_payload(b'{"password": "hunter2"', 1024) is None
+    assert mask_payload(b"password=hunter2", 1024) is None
+
+
+class TestAPILogWriter:
+    def test_flush_writes_in_batches(self, db_session):
+        writer = make_writer(db_session, batch_size=10)
+        for i in range(25):
+            writer.record(row(i))
+        assert writer.flush() == 25
+        assert db_session.query(APILogModel).count() == 25
+        assert writer.stats() == {"buffered": 0, "written": 25, "dropped": 0}
+
+    def test_drops_and_counts_past_capacity(self, db_session):
+        writer = make_writer(db_session, capacity=5)
+        for i in range(8):
+            writer.record(row(i))
+        assert writer.stats()["buffered"] == 5
+        assert writer.dropped == 3
+
+    def test_stop_flushes_the_buffer(self, db_session):
+        writer = make_writer(db_session)
+
+        async def scenario():
+            writer.start()
+            writer.record(row())
+            await writer.stop()
+
+        asyncio.run(scenario())
+        assert db_session.query(APILogModel).count() == 1
+
+    def test_full_batch_wakes_the_writer(self, db_session):
+        writer = make_writer(db_session, batch_size=3)
+
+        async def scenario():
+            writer.start()
+            for i in range(3):
+                writer.record(row(i))
+            await asyncio.sleep(0.2)
+            written = writer.written
+            await writer.stop()
+            return written
+
+        assert asyncio.run(scenario()) == 3
+
+
+def test_middleware_records_requests(db_session):
+    app = FastAPI()
+    writer = make_writer(db_session)
+
+    @app.post("/auth/login")
+    def login(body: dict):
+        return {}
+
+    app.add_middleware(
+        APILogMiddleware, writer=writer, payload_bytes=1024, exempt_paths=["/health"]
+    )
+    client = TestClient(app)
+    client.post("/auth/login?x=1", json={"email": "a@b.c", "password": "secret"})
+    client.get("/health")
+    writer.flush()
+    log = db_session.query(APILogModel).one()
+    assert (log.method, log.url, log.status_code) == ("POST", "/auth/login?x=1", 200)
+    assert "secret" not in log.payload
+    assert log.user_id is None
+    assert log.route == "/auth/login"
+    rollup = db_session.query(APILogRollupModel).one()
+    assert (rollup.route, rollup.count) == ("/auth/login", 1)
@@ -0,0 +1,27 @@
+import time
+from app.core.cache import TTLCache
+
+
+class TestTTLCache:
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+    def test_entry_expires_at_deadline(self):
+        """An explicit expiry earlier than the ttl wins"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("token", "claims", expires_at=time.time() - 1)
+        assert cache.get("token") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_hit_ratio(self):
+        cache = TTLCache()
+        cache.set("k", "v")
+        cache.get("k")
+        cache.get("missing")
+        assert cache.stats()["hit_ratio"] == 0.5
@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.middleware.concurrency import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    AdaptiveLimiter,
+    ConcurrencyLimitMiddleware,
+    Overloaded,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestAdaptiveLimiter:
+    def test_queues_then_sheds_past_budget(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(initial_limit=1, queue_factor=1)
+            await limiter.acquire(PRIORITY_LOW)
+            waiter = asyncio.ensure_future(limiter.acquire(PRIORITY_LOW))
+            await asyncio.sleep(0)
+            with pytest.raises(Overloaded) as exc:
+                await limiter.acquire(PRIORITY_LOW)
+            assert exc.value.retry_after >= 1
+            limiter.release(0.01)
+            await waiter
+            return limiter
+
+        limiter = run(scenario())
+        assert limiter.inflight == 1
+        assert limiter.rejected == 1
+
+    def test_high_priority_displaces_queued_low_priority(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(initial_limit=1, queue_factor=1)
+            await limiter.acquire(PRIORITY_LOW)
+            low = asyncio.ensure_future(limiter.acquire(PRIORITY_LOW))
+            await asyncio.sleep(0)
+            high = asyncio.ensure_future(limiter.acquire(PRIORITY_HIGH))
+            await asyncio.sleep(0)
+            with pytest.raises(Overloaded):
+                await low
+            limiter.release(0.01)
+            await high
+
+        run(scenario())
+
+    def test_queue_timeout_rejects(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=0.01)
+            await limiter.acquire(PRIORITY_LOW)
+            with pytest.raises(Overloaded):
+                await limiter.acquire(PRIORITY_LOW)
+            assert limiter.stats()["queued"] == 0
+
+        run(scenario())
+
+    def test_limit_drops_when_latency_rises(self):
+        limiter = AdaptiveLimiter(initial_limit=20, min_limit=4)
+        limiter.inflight = 21
+        for _ in range(20):
+            limiter.release(0.01)
+            limiter.inflight += 1
+        assert limiter.limit > 20
+        limiter._last_decrease = 0
+        for _ in range(50):
+            limiter._last_decrease = 0
+            limiter.release(1.0)
+            limiter.inflight += 1
+        assert limiter.limit == 4
+
+
+def test_middleware_returns_503_when_saturated():
+    app = FastAPI()
+    limiter = AdaptiveLimiter(initial_limit=1, queue_factor=1)
+
+    @app.get("/items")
+    def items():
+        return []
+
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        limiter=limiter,
+        priority_paths=["/health"],
+        exempt_paths=["/events"],
+    )
+    client = TestClient(app)
+    assert client.get("/items").status_code == 200
+    assert limiter.inflight == 0
+    limiter.inflight = 1
+    limiter._queue.append((PRIORITY_HIGH, 0, None))
+    response = client.get("/items")
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import patch
+from app.core.counters import MemoryCounterStore, SQLiteCounterStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCounterStore(max_keys=100)
+    return SQLiteCounterStore(str(tmp_path / "counters.db"))
+
+
+class TestCounterStore:
+    def test_counts_within_window(self, store):
+        assert store.hit("k", 60, 5) == 1
+        assert store.hit("k", 60, 5) == 2
+        assert store.count("k", 60) == 2
+        assert store.count("other", 60) == 0
+
+    def test_keeps_at_most_limit_events(self, store):
+        for _ in range(10):
+            store.hit("k", 60, 3)
+        assert store.count("k", 60) == 3
+
+    def test_old_events_slide_out(self, store):
+        with patch("app.core.counters.time.time", return_value=1000.0):
+            store.hit("k", 60, 5)
+        with patch("app.core.counters.time.time", return_value=1050.0):
+            store.hit("k", 60, 5)
+            assert store.count("k", 60) == 2
+        with patch("app.core.counters.time.time", return_value=1070.0):
+            assert store.count("k", 60) == 1
+
+    def test_reset_and_prune(self, store):
+        store.hit("a", 60, 5)
+        store.hit("b", 60, 5)
+        store.reset("a")
+        assert store.count("a", 60) == 0
+        with patch("app.core.counters.time.time", return_value=10**10):
+            assert store.prune() == 1
+
+
+def test_memory_store_is_bounded():
+    store = MemoryCounterStore(max_keys=2)
+    for key in ("a", "b", "c"):
+        store.hit(key, 60, 5)
+    assert store.count("a", 60) == 0
+    assert store.count("c", 60) == 1
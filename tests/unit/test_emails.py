@@ -0,0 +1,69 @@
+import smtplib
+from unittest.mock import patch
+from app.libs.emails import SMTPPool
+
+
+def make_pool(**overrides):
+    fields = dict(size=2, idle_timeout=60, timeout=5)
+    fields.update(overrides)
+    return SMTPPool(**fields)
+
+
+class TestSMTPPool:
+    def test_session_is_reused(self, smtp_server):
+        pool = make_pool()
+        for i in range(3):
+            assert pool.send_many([(["a@example.com"], f"Hi {i}", "<p>Hi</p>")]) == [
+                None
+            ]
+        pool.close()
+        assert pool.connects == 1
+        assert len(smtp_server.messages) == 3
+
+    def test_batch_uses_one_session(self, smtp_server):
+        pool = make_pool()
+        emails = [([f"user{i}@example.com"], "Hi", "<p>Hi</p>") for i in range(5)]
+        assert pool.send_many(emails) == [None] * 5
+        pool.close()
+        assert pool.connects == 1
+        assert [m.rcpt_tos for m in smtp_server.messages] == [
+            [f"user{i}@example.com"] for i in range(5)
+        ]
+
+    def test_idle_session_is_replaced(self, smtp_server):
+        pool = make_pool(idle_timeout=0)
+        pool.send_many([(["a@example.com"], "Hi", "<p>Hi</p>")])
+        pool.send_many([(["a@example.com"], "Hi", "<p>Hi</p>")])
+        pool.close()
+        assert pool.connects == 2
+
+    def test_dropped_session_is_reopened(self, smtp_server):
+        pool = make_pool()
+        pool.send_many([(["a@example.com"], "Hi", "<p>Hi</p>")])
+        # Simulate the server closing the connection while it sat idle
+        pool._idle[0][0].close()
+        assert pool.send_many([(["b@example.com"], "Hi", "<p>Hi</p>")]) == [None]
+        pool.close()
+        assert pool.connects == 2
+        assert len(smtp_server.messages) == 2
+
+    def test_rejected_message_does_not_stop_batch(self, smtp_server):
+        pool = make_pool()
+        original = smtplib.SMTP.sendmail
+        refused = smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"no")})
+
+        def sendmail(self, from_addr, to_addrs, msg, *args, **kwargs):
+            if to_addrs == ["bad@example.com"]:
+                raise refused
+            return original(self, from_addr, to_addrs, msg, *args, **kwargs)
+
+        with patch.object(smtplib.SMTP, "sendmail", sendmail):
+            results = pool.send_many(
+                [
+                    (["bad@example.com"], "Hi", "<p>Hi</p>"),
+                    (["good@example.com"], "Hi", "<p>Hi</p>"),
+                ]
+            )
+        pool.close()
+        assert results == [refused, None]
+        assert pool.connects == 1
@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from app.core.events import EventBroker, event_matches, format_sse
+
+
+class TestEventBroker:
+    def test_publish_and_replay(self):
+        """Events after a sequence number are replayed in order"""
+        broker = EventBroker(buffer_size=10)
+        broker.publish("countries", "created", {"id": "c1"})
+        broker.publish("states", "created", {"id": "s1", "country_id": "c1"})
+        events = broker.events_after(0)
+        assert [e["seq"] for e in events] == [1, 2]
+        assert broker.events_after(2) == []
+
+    def test_evicted_events_require_reset(self):
+        """Falling behind the ring buffer signals a reset"""
+        broker = EventBroker(buffer_size=2)
+        for i in range(5):
+            broker.publish("countries", "updated", {"id": str(i)})
+        assert broker.events_after(1) is None
+        assert len(broker.events_after(3)) == 2
+
+    def test_parse_event_id(self):
+        """Last-Event-ID from another epoch forces a reset"""
+        broker = EventBroker()
+        broker.publish("countries", "created", {"id": "c1"})
+        assert broker.parse_event_id(f"{broker.epoch}-1") == (1, False)
+        assert broker.parse_event_id("deadbeef-1") == (1, True)
+        assert broker.parse_event_id(None) == (1, False)
+
+    def test_waiters_wake_on_publish(self):
+        """All idle subscribers wake on a single publish"""
+        broker = EventBroker()
+
+        async def scenario():
+            waiters = [
+                asyncio.create_task(broker.wait_for_events(0, timeout=5))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            broker.publish("cities", "deleted", {"id": "x1"})
+            return await asyncio.gather(*waiters)
+
+        results = asyncio.run(scenario())
+        assert all(len(events) == 1 for events in results)
+
+    def test_wait_times_out_with_heartbeat(self):
+        """An idle wait returns an empty list after the timeout"""
+        broker = EventBroker()
+        assert asyncio.run(broker.wait_for_events(0, timeout=0.01)) == []
+
+
+class TestEventFilters:
+    @pytest.mark.parametrize(
+        "table,data,expected",
+        [
+            ("countries", {"id": "c1"}, True),
+            ("states", {"id": "s1", "country_id": "c1"}, True),
+            ("cities", {"id": "x1", "state_id": "s1", "country_id": "c2"}, False),
+        ],
+    )
+    def test_country_filter(self, table, data, expected):
+        event = {"table": table, "data": data}
+        assert event_matches(event, country_id="c1") is expected
+
+    def test_table_filter_and_format(self):
+        broker = EventBroker()
+        event = broker.publish("cities", "created", {"id": "x1"})
+        assert not event_matches(event, tables=["states"])
+        assert format_sse(event).startswith(f"id: {broker.epoch}-1\nevent: created\n")
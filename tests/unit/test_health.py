@@ -0,0 +1,60 @@
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from app.core.health import HealthMonitor
+
+
+def failing():
+    raise OSError("connection refused")
+
+
+def monitor(**checks):
+    return HealthMonitor(create_engine("sqlite://"), stale_after=30, checks=checks)
+
+
+def test_not_ready_until_first_check():
+    ready, report = monitor(database=lambda: None).readiness()
+    assert not ready
+    assert report["checks"]["database"] == {"status": "unknown"}
+
+
+def test_ready_follows_database_only():
+    health = monitor(database=lambda: None, smtp=failing)
+    with patch("app.core.health.logger") as logger:
+        health.refresh()
+    ready, report = health.readiness()
+    assert ready
+    assert report["checks"]["smtp"]["status"] == "down"
+    # The reason is logged, never served
+    assert "connection refused" not in str(report)
+    assert "connection refused" in logger.warning.call_args.args[0]
+    assert "smtp" in report["pools"]
+
+
+def test_probes_serve_cached_result():
+    calls = []
+    health = monitor(database=lambda: calls.append(1))
+    health.refresh()
+    for _ in range(100):
+        health.readiness()
+    assert calls == [1]
+
+
+def test_stale_result_is_not_ready():
+    health = monitor(database=lambda: None)
+    health.refresh()
+    with patch(
+        "app.core.health.time.time",
+        return_value=health._results["database"]["checked_at"] + 60,
+    ):
+        ready, report = health.readiness()
+    assert not ready
+    assert report["checks"]["database"]["status"] == "stale"
+
+
+def test_endpoints(client):
+    assert client.get("/health/live").json() == {"status": "ok"}
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert health.json()["status"] in ("ok", "degraded")
+    with patch("app.core.health.health_monitor._results", {}):
+        assert client.get("/health/ready").status_code == 503
@@ -0,0 +1,50 @@
+import tracemalloc
+import pytest
+from app.core.memory import MemoryDiagnostics, object_counts
+from app.models import CountryModel
+
+
+@pytest.fixture
+def diagnostics():
+    diagnostics = MemoryDiagnostics(max_snapshots=2)
+    yield diagnostics
+    diagnostics.stop()
+
+
+def test_diff_points_at_growing_line(diagnostics):
+    assert diagnostics.status()["tracing"] is False
+    with pytest.raises(RuntimeError):
+        diagnostics.take_snapshot()
+    diagnostics.start(frames=1)
+    base = diagnostics.take_snapshot()
+    leak = [bytes(1000) for _ in range(1000)]
+    compare = diagnostics.take_snapshot()
+
+    top = diagnostics.diff(base["id"], compare["id"], "lineno", 5)[0]
+    assert top["file"] == __file__
+    assert top["size_diff_bytes"] >= 1000 * 1000
+    by_file = diagnostics.diff(base["id"], compare["id"], "filename", 5)
+    assert by_file[0]["line"] is None
+    del leak
+
+
+def test_snapshots_survive_stop_and_are_bounded(diagnostics):
+    diagnostics.start(frames=1)
+    ids = [diagnostics.take_snapshot()["id"] for _ in range(3)]
+    status = diagnostics.stop()
+    assert not tracemalloc.is_tracing()
+    assert [s["id"] for s in status["snapshots"]] == ids[1:]
+    with pytest.raises(KeyError):
+        diagnostics.diff(ids[0], ids[2], "lineno", 5)
+    assert diagnostics.diff(ids[1], ids[2], "lineno", 5) is not None
+
+
+def test_object_counts(db_session):
+    countries = [CountryModel(name=f"C{i}", code=f"C{i}") for i in range(3)]
+    db_session.add_all(countries)
+    db_session.flush()
+    counts = object_counts()
+    assert counts["sessions"] >= 1
+    assert counts["identity_map_entries"] >= 3
+    assert counts["model_instances"]["CountryModel"] >= 3
+    assert counts["ttl_caches"]
@@ -0,0 +1,147 @@
+import os
+import subprocess
+import sys
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock
+from fastapi import FastAPI, HTTPException
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+from app.core.metrics import (
+    LOAD_SHED,
+    StatsExporter,
+    instrument_engine,
+)
+from app.middleware.metrics import PrometheusMiddleware
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/metrics-test/{item_id}")
+    async def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    labels = {"method": "GET", "route": "/metrics-test/{item_id}"}
+    before = sample("http_requests_total", status="200", **labels)
+    before_404 = sample("http_requests_total", status="404", **labels)
+    before_unmatched = sample(
+        "http_requests_total", method="GET", route="(unmatched)", status="404"
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        for item_id in (1, 2, 0):
+            await client.get(f"/metrics-test/{item_id}")
+        await client.get("/no-such-path")
+
+    assert sample("http_requests_total", status="200", **labels) == before + 2
+    assert sample("http_requests_total", status="404", **labels) == before_404 + 1
+    assert (
+        sample("http_requests_total", method="GET", route="(unmatched)", status="404")
+        == before_unmatched + 1
+    )
+    assert sample("http_request_duration_seconds_count", **labels) >= 3
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_folds_unknown_methods():
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+    labels = {"method": "OTHER", "route": "(unmatched)", "status": "404"}
+    before = sample("http_requests_total", **labels)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        await client.request("FOOBAR1", "/countries/")
+
+    assert sample("http_requests_total", **labels) == before + 1
+    assert (
+        REGISTRY.get_sample_value(
+            "http_requests_total",
+            {"method": "FOOBAR1", "route": "(unmatched)", "status": "404"},
+        )
+        is None
+    )
+
+
+def test_stats_exporter_adds_only_new_counts():
+    cache = SimpleNamespace(hits=5, misses=1)
+    limiter = Mock(rejected=2)
+    exporter = StatsExporter(create_engine("sqlite://"))
+    exporter.track_cache("unit", cache)
+    exporter.track_counter(LOAD_SHED, lambda: limiter.rejected)
+    before_shed = sample("load_shed_total")
+
+    exporter.refresh()
+    cache.hits, limiter.rejected = 8, 3
+    exporter.refresh()
+
+    assert sample("cache_requests_total", cache="unit", result="hit") == 8
+    assert sample("cache_requests_total", cache="unit", result="miss") == 1
+    assert sample("load_shed_total") == before_shed + 3
+
+
+def test_query_latency_is_recorded():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    before = sample("db_query_duration_seconds_count")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert sample("db_query_duration_seconds_count") == before + 1
+
+
+
+def test_pool_gauges_follow_queue_pool(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=3
+    )
+    exporter = StatsExporter(engine)
+    with engine.connect():
+        exporter.refresh()
+    assert sample("db_pool_size") == 3
+    assert sample("db_pool_connections_in_use") == 1
+
+
+WORKER = """
+from app.core.metrics import HTTP_IN_PROGRESS, HTTP_REQUESTS, mark_process_dead
+HTTP_REQUESTS.labels("GET", "/countries/", "200").inc(3)
+HTTP_IN_PROGRESS.labels("GET").inc()
+mark_process_dead()
+"""
+COLLECT = """
+from app.core.metrics import render_metrics
+print(render_metrics()[0].decode())
+"""
+
+
+def test_multiprocess_values_add_up_across_workers(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    def run(code):
+        return subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+    run(WORKER)
+    run(WORKER)
+    output = run(COLLECT)
+    assert (
+        'http_requests_total{method="GET",route="/countries/",status="200"} 6.0'
+        in output
+    )
+    # Shut-down workers no longer count towards live gauges
+    assert 'http_requests_in_progress{method="GET"} 2.0' not in output
@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime, timedelta
+from app.core.outbox import EmailOutbox, enqueue_email
+from app.models import EmailOutboxModel
+
+
+def make_outbox(db_session, sender, max_attempts=3):
+    return EmailOutbox(
+        session_factory=lambda: db_session,
+        sender=sender,
+        batch_size=10,
+        max_attempts=max_attempts,
+        retry_base_seconds=60,
+    )
+
+
+def queue_message(db_session, subject="Hello"):
+    message = enqueue_email(db_session, ["user@example.com"], subject, "<p>Hi</p>")
+    db_session.commit()
+    return message.id
+
+
+class TestEmailOutbox:
+    def test_enqueue_requires_recipients(self, db_session):
+        with pytest.raises(ValueError):
+            enqueue_email(db_session, [], "Hello", "<p>Hi</p>")
+
+    def test_delivers_through_smtp(self, db_session, smtp_server):
+        from app.libs.emails import send_emails
+
+        message_id = queue_message(db_session)
+        outbox = make_outbox(db_session, send_emails)
+        assert outbox.deliver_pending() == 1
+        message = db_session.get(EmailOutboxModel, message_id)
+        assert message.status == "sent"
+        assert message.sent_at is not None
+        # The body held the OTP or reset link; it isn't kept once delivered
+        assert message.html_body == ""
+        assert len(smtp_server.messages) == 1
+        assert smtp_server.messages[0].rcpt_tos == ["user@example.com"]
+
+    def test_failure_is_retried_with_backoff(self, db_session):
+        def sender(emails):
+            raise ConnectionError("smtp down")
+
+        message_id = queue_message(db_session)
+        outbox = make_outbox(db_session, sender)
+        outbox.deliver_pending()
+        message = db_session.get(EmailOutboxModel, message_id)
+        assert message.status == "pending"
+        assert message.html_body == "<p>Hi</p>"
+        assert message.attempts == 1
+        assert message.last_error == "smtp down"
+        retry_at = message.next_attempt_at
+        assert retry_at - datetime.utcnow() > timedelta(seconds=55)
+        # Not due again until the backoff elapses
+        assert outbox.deliver_pending() == 0
+
+    def test_gives_up_after_max_attempts(self, db_session):
+        message_id = queue_message(db_session)
+        outbox = make_outbox(
+            db_session, lambda emails: [ValueError("rejected")], max_attempts=1
+        )
+        outbox.deliver_pending()
+        message = db_session.get(EmailOutboxModel, message_id)
+        assert message.status == "failed"
+        assert message.html_body == ""
+        assert outbox.failed == 1
+
+    def test_claimed_batch_goes_to_one_sender_call(self, db_session):
+        batches = []
+        queue_message(db_session, "First")
+        queue_message(db_session, "Second")
+
+        def sender(emails):
+            batches.append(emails)
+            return [None, ValueError("rejected")]
+
+        outbox = make_outbox(db_session, sender)
+        assert outbox.deliver_pending() == 2
+        assert len(batches) == 1
+        assert {subject for _, subject, _ in batches[0]} == {"First", "Second"}
+        assert [recipients for recipients, _, _ in batches[0]] == [
+            ["user@example.com"]
+        ] * 2
+        statuses = sorted(m.status for m in db_session.query(EmailOutboxModel))
+        assert statuses == ["pending", "sent"]
@@ -0,0 +1,111 @@
+import zlib
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from sqlalchemy import text
+from app.core.partitions import APILogPartitions, Partition, plan_partitions
+from app.models import APILogModel
+
+
+class TestPlanPartitions:
+    def test_creates_months_ahead_and_drops_expired(self):
+        existing = [
+            Partition("p_history", datetime(2026, 8, 1)),
+            Partition("p202608", datetime(2026, 9, 1)),
+            Partition("p202609", datetime(2026, 10, 1)),
+            Partition("p202610", datetime(2026, 11, 1)),
+            Partition("pmax", None),
+        ]
+        to_create, to_drop = plan_partitions(
+            existing, datetime(2026, 10, 19), "month", 3, 45
+        )
+        assert to_create == [
+            Partition("p202611", datetime(2026, 12, 1)),
+            Partition("p202612", datetime(2027, 1, 1)),
+            Partition("p202701", datetime(2027, 2, 1)),
+        ]
+        assert to_drop == ["p_history", "p202608"]
+
+    def test_daily_partitions_from_catch_all_only(self):
+        to_create, to_drop = plan_partitions(
+            [Partition("pmax", None)], datetime(2026, 10, 19, 13), "day", 2, 30
+        )
+        assert [p.name for p in to_create] == ["p20261019", "p20261020", "p20261021"]
+        assert to_create[-1].bound == datetime(2026, 10, 22)
+        assert to_drop == []
+
+    def test_nothing_to_do_when_up_to_date(self):
+        existing = [Partition("p202611", datetime(2026, 12, 1))]
+        assert plan_partitions(existing, datetime(2026, 10, 19), "month", 1, 90) == (
+            [],
+            [],
+        )
+
+
+def add_log(db_session, created_at, payload=None):
+    db_session.add(
+        APILogModel(
+            url="/countries/",
+            method="POST",
+            status_code=200,
+            payload=payload,
+            created_at=created_at,
+        )
+    )
+    db_session.commit()
+
+
+class TestCompressedPayload:
+    def test_round_trip_is_compressed_and_capped(self, db_session):
+        add_log(db_session, datetime.utcnow(), '{"name": "' + "x" * 100000 + '"}')
+        stored = db_session.execute(text("SELECT payload FROM api_logs")).scalar()
+        assert len(stored) < 1000
+        assert len(zlib.decompress(stored)) == 65536
+        db_session.expire_all()
+        assert db_session.query(APILogModel).one().payload.startswith('{"name": "xx')
+
+    def test_reads_uncompressed_legacy_values(self, db_session):
+        add_log(db_session, datetime.utcnow())
+        db_session.execute(text("UPDATE api_logs SET payload = :p"), {"p": b"plain"})
+        db_session.expire_all()
+        assert db_session.query(APILogModel).one().payload == "plain"
+
+
+def test_retention_deletes_old_rows_without_partitioning(db_session):
+    add_log(db_session, datetime.utcnow() - timedelta(days=100))
+    add_log(db_session, datetime.utcnow())
+    partitions = APILogPartitions(period="month", ahead=3, retention_days=90)
+    with patch("app.core.partitions.db_manager.get_session", return_value=db_session):
+        assert partitions.maintain() == {"deleted": 1, "rollups_deleted": 0}
+    assert db_session.query(APILogModel).count() == 1
+
+
+class TestMaintenanceLock:
+    def run(self, acquired):
+        db = MagicMock()
+        bind = db.get_bind.return_value
+        bind.dialect.name = "mysql"
+        lock_conn = bind.engine.connect.return_value.__enter__.return_value
+        lock_conn.execute.return_value.scalar.return_value = acquired
+        partitions = APILogPartitions(period="month", ahead=3, retention_days=90)
+        with patch("app.core.partitions.db_manager.get_session", return_value=db):
+            with patch.object(
+                partitions, "_maintain", return_value={"created": 1}
+            ) as maintain:
+                counts = partitions.maintain()
+        statements = [str(c.args[0]) for c in lock_conn.execute.call_args_list]
+        return counts, maintain, statements
+
+    def test_runs_and_releases_while_holding_the_lock(self):
+        counts, maintain, statements = self.run(acquired=1)
+        assert counts == {"created": 1}
+        maintain.assert_called_once()
+        assert statements == [
+            "SELECT GET_LOCK(:name, 0)",
+            "SELECT RELEASE_LOCK(:name)",
+        ]
+
+    def test_skips_when_another_worker_holds_the_lock(self):
+        counts, maintain, statements = self.run(acquired=0)
+        assert counts == {}
+        maintain.assert_not_called()
+        assert statements == ["SELECT GET_LOCK(:name, 0)"]
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+from app.core.counters import MemoryCounterStore
+from app.models import AdminUserModel, PasswordResetModel
+from app.routers.admin.crud.auth_mod import crud
+from app.routers.admin.crud.auth_mod.schemas import (
+    ForgotPasswordRequest,
+    ResetPasswordRequest,
+)
+
+
+@pytest.fixture
+def admin(db_session):
+    db_admin_user = AdminUserModel(
+        id="d" * 36,
+        first_name="Test",
+        last_name="User",
+        email="reset@example.com",
+        password="x",
+        is_deleted=False,
+    )
+    db_session.add(db_admin_user)
+    db_session.commit()
+    return db_admin_user
+
+
+@pytest.fixture
+def counters():
+    store = MemoryCounterStore()
+    with patch.object(crud, "auth_counters", store):
+        yield store
+
+
+def request_otp(db_session):
+    with patch.object(crud, "generate_otp", return_value="123456"):
+        crud.send_forgot_password_email(
+            db_session, ForgotPasswordRequest(email="reset@example.com")
+        )
+
+
+def wrong_otp():
+    return ResetPasswordRequest(
+        email="reset@example.com",
+        otp="000000",
+        new_password="new-password",
+    )
+
+
+class TestPasswordResets:
+    def test_otp_is_stored_off_the_user_row(self, db_session, admin, counters):
+        request_otp(db_session)
+        reset = db_session.query(PasswordResetModel).one()
+        assert reset.kind == "otp"
+        assert reset.secret_hash == crud.hash_otp("123456")
+        assert admin.otp is None
+
+    def test_new_otp_replaces_the_old_one(self, db_session, admin, counters):
+        request_otp(db_session)
+        request_otp(db_session)
+        assert db_session.query(PasswordResetModel).count() == 1
+
+    def test_generation_is_rate_limited(self, db_session, admin, counters):
+        for _ in range(crud.MAX_GENERATION_ATTEMPTS):
+            request_otp(db_session)
+        with pytest.raises(HTTPException) as exc:
+            request_otp(db_session)
+        assert exc.value.status_code == 429
+
+    def test_failed_attempts_do_not_write_the_user(self, db_session, admin, counters):
+        request_otp(db_session)
+        updated_at = admin.updated_at
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(crud.reset_password(db_session, wrong_otp()))
+        assert "4 attempts remaining" in exc.value.detail
+        db_session.refresh(admin)
+        assert admin.updated_at == updated_at
+        for _ in range(crud.MAX_OTP_ATTEMPTS - 1):
+            with pytest.raises(HTTPException):
+                asyncio.run(crud.reset_password(db_session, wrong_otp()))
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(crud.reset_password(db_session, wrong_otp()))
+        assert (
+            exc.value.detail
+            == "Too many verification attempts. Please request a new OTP."
+        )
+        assert db_session.query(PasswordResetModel).count() == 0
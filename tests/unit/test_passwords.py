@@ -0,0 +1,63 @@
+import asyncio
+from fastapi import HTTPException
+from app.core.passwords import PasswordHasher, PasswordPool, hash_cost
+
+
+class TestPasswordPool:
+    def test_hash_and_verify(self):
+        pool = PasswordPool(workers=1, max_queue=4)
+
+        async def scenario():
+            hashed = await pool.hash("testpassword123", rounds=4)
+            return (
+                await pool.verify("testpassword123", hashed),
+                await pool.verify("wrongpassword", hashed),
+            )
+
+        try:
+            assert asyncio.run(scenario()) == (True, False)
+            assert pool.stats()["completed"] == 3
+        finally:
+            pool.shutdown()
+
+    def test_rejects_when_queue_is_full(self):
+        """Work beyond the queue budget fails fast with a 503, but a free
+        worker is used even with no queue at all"""
+        pool = PasswordPool(workers=1, max_queue=0)
+        hashed = PasswordHasher(4, 4, 4).hash("password")
+
+        async def scenario():
+            return await asyncio.gather(
+                pool.verify("password", hashed),
+                pool.verify("password", hashed),
+                return_exceptions=True,
+            )
+
+        try:
+            first, second = asyncio.run(scenario())
+        finally:
+            pool.shutdown()
+        assert first is True
+        assert isinstance(second, HTTPException)
+        assert second.status_code == 503
+        assert pool.stats()["rejected"] == 1
+
+
+class TestPasswordHasher:
+    def test_needs_rehash_on_cost_or_scheme(self):
+        hasher = PasswordHasher(rounds=4, min_rounds=4, max_rounds=6)
+        current = hasher.hash("testpassword123")
+        assert hash_cost(current) == 4
+        assert not hasher.needs_rehash(current)
+        assert hasher.needs_rehash(current.replace("$2b$04$", "$2y$04$", 1))
+        hasher.rounds = 6
+        assert hasher.needs_rehash(current)
+
+    def test_verify_rejects_non_bcrypt_hash(self):
+        hasher = PasswordHasher(rounds=4, min_rounds=4, max_rounds=6)
+        assert hasher.verify("testpassword123", "plaintext") is False
+
+    def test_calibrate_stays_within_bounds(self):
+        hasher = PasswordHasher(rounds=12, min_rounds=4, max_rounds=6)
+        assert hasher.calibrate(target_ms=0) == 4
+        assert hasher.calibrate(target_ms=10_000) == 6
@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+from app.models import AdminUserModel
+from app.routers.admin.crud.auth_mod import crud
+
+
+def make_admin(**overrides):
+    fields = dict(
+        id="a" * 36,
+        first_name="Test",
+        last_name="User",
+        email="test@example.com",
+        is_deleted=False,
+    )
+    fields.update(overrides)
+    return AdminUserModel(**fields)
+
+
+class TestPrincipalCache:
+    def setup_method(self):
+        crud.principal_cache.clear()
+
+    def test_lookup_is_cached(self):
+        """Only the first check for an admin reaches the database"""
+        with patch.object(
+            crud, "get_admin_user_by_id", return_value=make_admin()
+        ) as lookup:
+            first = crud.get_principal(None, "a" * 36)
+            second = crud.get_principal(None, "a" * 36)
+        assert first == second
+        assert lookup.call_count == 1
+
+    def test_invalidation_forces_reload(self):
+        hook_calls = []
+        crud.register_principal_invalidation_hook(hook_calls.append)
+        try:
+            with patch.object(
+                crud, "get_admin_user_by_id", return_value=make_admin()
+            ) as lookup:
+                crud.get_principal(None, "a" * 36)
+                crud.invalidate_principal("a" * 36)
+                crud.get_principal(None, "a" * 36)
+            assert lookup.call_count == 2
+            assert hook_calls == ["a" * 36]
+        finally:
+            crud.principal_invalidation_hooks.remove(hook_calls.append)
+
+    def test_missing_admin_is_rejected(self):
+        with patch.object(crud, "get_admin_user_by_id", return_value=None):
+            with pytest.raises(HTTPException) as exc:
+                crud.get_principal(None, "b" * 36)
+        assert exc.value.status_code == 401
+        assert crud.principal_cache.get("b" * 36) is None
+
+    def test_soft_delete_invalidates_after_commit(self, db_session):
+        db_session.add(make_admin(password="x"))
+        db_session.commit()
+        crud.get_principal(db_session, "a" * 36)
+        admin = db_session.get(AdminUserModel, "a" * 36)
+        admin.is_deleted = True
+        db_session.flush()
+        # Not yet committed: other requests may still see the old row
+        assert crud.principal_cache.get("a" * 36) is not None
+        db_session.commit()
+        assert crud.principal_cache.get("a" * 36) is None
+
+    def test_rolled_back_soft_delete_keeps_the_cache(self, db_session):
+        db_session.add(make_admin(password="x"))
+        db_session.commit()
+        crud.get_principal(db_session, "a" * 36)
+        db_session.get(AdminUserModel, "a" * 36).is_deleted = True
+        db_session.flush()
+        db_session.rollback()
+        db_session.commit()
+        assert crud.principal_cache.get("a" * 36) is not None
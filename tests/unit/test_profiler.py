@@ -0,0 +1,88 @@
+import threading
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from app.core.profiler import ProfilerBusy, SamplingProfiler
+from app.core.timing import TimedRoute
+from app.routers.admin.crud.diagnostics.crud import route_codes
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def other_spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def spinning():
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=spin, args=(stop,)),
+        threading.Thread(target=other_spin, args=(stop,)),
+    ]
+    for thread in threads:
+        thread.start()
+    yield
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+
+def test_samples_busy_threads(spinning):
+    profile = SamplingProfiler().sample(0.2, 0.005, None)
+    assert profile.samples > 5
+    collapsed = profile.collapsed()
+    assert "spin (test_profiler.py)" in collapsed
+    assert "other_spin (test_profiler.py)" in collapsed
+    # Idle threads (the pytest main thread waits in join/sleep) are skipped
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+
+def test_filters_to_code_objects(spinning):
+    profile = SamplingProfiler().sample(0.2, 0.005, frozenset({spin.__code__}))
+    names = {frame[1] for stack in profile.stacks for frame in stack}
+    assert "spin" in names and "other_spin" not in names
+
+    speedscope = profile.speedscope("spin")
+    samples = speedscope["profiles"][0]["samples"]
+    frames = speedscope["shared"]["frames"]
+    assert len(samples) == len(speedscope["profiles"][0]["weights"])
+    assert all(0 <= index < len(frames) for sample in samples for index in sample)
+
+
+def test_one_profile_at_a_time():
+    profiler = SamplingProfiler()
+    profiler._lock.acquire()
+    with pytest.raises(ProfilerBusy):
+        profiler.sample(0.01, 0.005, None)
+
+
+def test_route_codes_include_dependencies():
+    def dependency():
+        return 1
+
+    def shared():
+        return 2
+
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/profiled")
+    def profiled(value: int = Depends(dependency), other: int = Depends(shared)):
+        return value
+
+    @router.get("/unrelated")
+    def unrelated(other: int = Depends(shared)):
+        return other
+
+    app = FastAPI()
+    app.include_router(router)
+    codes = route_codes(app.routes, "/profiled", "get")
+    assert {profiled.__code__, dependency.__code__} <= codes
+    # Used by other routes too, so it would match their traffic
+    assert shared.__code__ not in codes
+    assert unrelated.__code__ not in codes
+    with pytest.raises(HTTPException):
+        route_codes(app.routes, "/missing")
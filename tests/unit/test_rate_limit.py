@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.middleware.rate_limit import (
+    Limit,
+    MemoryBucketStore,
+    RateLimitMiddleware,
+    SQLiteBucketStore,
+    get_subject,
+    parse_limit,
+    parse_route_limits,
+)
+
+
+def test_parse_limits():
+    assert parse_limit("120/minute") == Limit(120, 2.0)
+    assert parse_limit("10/seconds") == Limit(10, 10.0)
+    assert parse_route_limits("post /auth/login=5/minute; GET /a=1/second") == [
+        ("POST", "/auth/login", Limit(5, 5 / 60)),
+        ("GET", "/a", Limit(1, 1.0)),
+    ]
+    with pytest.raises(ValueError):
+        parse_limit("5/fortnight")
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBucketStore(max_keys=100)
+    return SQLiteBucketStore(str(tmp_path / "buckets.db"))
+
+
+class TestBucketStore:
+    def take(self, store, key="k", limit=Limit(3, 1.0)):
+        return asyncio.run(store.take(key, limit))
+
+    def test_allows_capacity_then_rejects(self, store):
+        with patch("app.middleware.rate_limit.time.time", return_value=1000.0):
+            assert [self.take(store).remaining for _ in range(3)] == [2, 1, 0]
+            bucket = self.take(store)
+        assert not bucket.allowed
+        assert bucket.retry_after == pytest.approx(1.0)
+        assert bucket.reset_after == pytest.approx(3.0)
+
+    def test_refills_over_time(self, store):
+        with patch("app.middleware.rate_limit.time.time", return_value=1000.0):
+            for _ in range(3):
+                self.take(store)
+        with patch("app.middleware.rate_limit.time.time", return_value=1002.0):
+            assert self.take(store).remaining == 1
+        assert self.take(store, key="other").remaining == 2
+
+    def test_prune_drops_full_buckets(self, tmp_path):
+        store = SQLiteBucketStore(str(tmp_path / "buckets.db"))
+        self.take(store)
+        with patch("app.middleware.rate_limit.time.time", return_value=10**10):
+            assert store.prune() == 1
+
+
+def test_sqlite_buckets_are_shared(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+    limit = Limit(2, 0.001)
+    asyncio.run(first.take("k", limit))
+    asyncio.run(first.take("k", limit))
+    assert not asyncio.run(second.take("k", limit)).allowed
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/items")
+    def items():
+        return []
+
+    @app.post("/auth/login")
+    def login():
+        return {}
+
+    @app.get("/health")
+    def health():
+        return {}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=MemoryBucketStore(),
+        default_limit=Limit(3, 0.001),
+        route_limits=[("POST", "/auth/login", Limit(1, 0.001))],
+        exempt_paths=["/health"],
+    )
+    tokens = Mock()
+    tokens.verify.side_effect = lambda token: {"sub": token}
+    with patch("app.middleware.rate_limit.access_tokens", tokens):
+        yield TestClient(app)
+
+
+class TestRateLimitMiddleware:
+    def test_headers_and_429(self, client):
+        response = client.get("/items")
+        assert response.headers["RateLimit-Limit"] == "3"
+        assert response.headers["RateLimit-Remaining"] == "2"
+        client.get("/items")
+        client.get("/items")
+        response = client.get("/items")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert response.json() == {"detail": "Rate limit exceeded"}
+
+    def test_route_limit_is_reported_when_tighter(self, client):
+        response = client.post("/auth/login")
+        assert response.headers["RateLimit-Limit"] == "1"
+        assert response.headers["RateLimit-Remaining"] == "0"
+        assert client.post("/auth/login").status_code == 429
+        assert client.get("/items").status_code == 200
+
+    def test_buckets_are_per_principal(self, client):
+        for _ in range(3):
+            client.get("/items", headers={"Authorization": "Bearer alice"})
+        assert (
+            client.get("/items", headers={"Authorization": "Bearer alice"}).status_code
+            == 429
+        )
+        assert (
+            client.get("/items", headers={"Authorization": "Bearer bob"}).status_code
+            == 200
+        )
+        assert client.get("/items").status_code == 200
+
+    def test_exempt_paths(self, client):
+        for _ in range(5):
+            response = client.get("/health")
+        assert response.status_code == 200
+        assert "RateLimit-Limit" not in response.headers
+
+
+def test_failed_verification_is_cached():
+    tokens = Mock()
+    tokens.verify.side_effect = ValueError("bad token")
+    scope = {"headers": [(b"authorization", b"Bearer forged")]}
+    with patch("app.middleware.rate_limit.access_tokens", tokens):
+        assert get_subject(scope) is None
+        assert get_subject(scope) is None
+    assert tokens.verify.call_count == 1
@@ -0,0 +1,150 @@
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from fastapi import HTTPException
+from jwcrypto import jwk
+from app.core.background import PeriodicTask
+from app.core.revocation import BloomFilter, RevocationList
+from app.core.tokens import Keyring, TokenService
+from app.models import AdminUserModel, RefreshSessionModel
+from app.routers.admin.crud.auth_mod import crud
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        ids = [f"session-{i}" for i in range(1000)]
+        for session_id in ids:
+            bloom.add(session_id)
+        assert all(session_id in bloom for session_id in ids)
+
+    def test_false_positive_rate_near_target(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"session-{i}")
+        hits = sum(f"other-{i}" in bloom for i in range(10000))
+        assert hits < 300
+
+
+class TestRevocationList:
+    def make_list(self):
+        revocations = RevocationList(capacity=100, error_rate=0.01, recent_size=2)
+        revocations.rebuild([], datetime(2024, 1, 1))
+        return revocations
+
+    def test_confirms_until_ready(self):
+        revocations = RevocationList(capacity=100, error_rate=0.01, recent_size=2)
+        assert revocations.is_revoked("s1", lambda sid: True)
+
+    def test_recent_revocation_needs_no_confirm(self):
+        revocations = self.make_list()
+        revocations.revoke("s1")
+        assert revocations.is_revoked("s1", lambda sid: pytest.fail("confirmed"))
+        assert not revocations.is_revoked("s2", lambda sid: pytest.fail("confirmed"))
+
+    def test_older_revocation_is_confirmed(self):
+        revocations = self.make_list()
+        for session_id in ("s1", "s2", "s3"):
+            revocations.revoke(session_id)
+        confirmed = []
+        assert revocations.is_revoked("s1", lambda sid: confirmed.append(sid) or True)
+        assert confirmed == ["s1"]
+
+    def test_rebuild_replaces_filter(self):
+        revocations = self.make_list()
+        revocations.rebuild(["s9"], datetime(2024, 1, 2))
+        assert revocations.is_revoked("s9", lambda sid: True)
+        assert revocations.synced_at == datetime(2024, 1, 2)
+
+    def test_rebuild_keeps_revocations_made_while_loading(self):
+        revocations = self.make_list()
+
+        def load():
+            # Revoked after the rebuild query read its rows
+            revocations.revoke("s5")
+            return iter(["s9"])
+
+        revocations.rebuild(load(), datetime(2024, 1, 2))
+        revocations._recent.clear()
+        assert revocations.is_revoked("s5", lambda sid: True)
+        assert not revocations.is_revoked("s6", lambda sid: True)
+
+
+class TestPeriodicTask:
+    def test_runs_until_stopped_and_counts_failures(self):
+        calls = []
+
+        def job():
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("boom")
+
+        async def run():
+            task = PeriodicTask("test", 0.01, job, run_immediately=True)
+            task.start()
+            await asyncio.sleep(0.1)
+            await task.stop()
+            return task
+
+        task = asyncio.run(run())
+        assert task.runs >= 2
+        assert task.failures == 1
+
+
+@pytest.fixture
+def token_services():
+    def service():
+        keyring = Keyring(
+            {"k1": jwk.JWK.generate(kty="oct", size=256).export(as_dict=True)}, "k1"
+        )
+        return TokenService(lambda: keyring, token_format="hs256")
+
+    with patch("app.security.access_tokens", service()), patch(
+        "app.security.refresh_tokens", service()
+    ):
+        yield
+
+
+@pytest.fixture
+def admin(db_session):
+    db_admin_user = AdminUserModel(
+        id="c" * 36,
+        first_name="Test",
+        last_name="User",
+        email="session@example.com",
+        password="x",
+        is_deleted=False,
+    )
+    db_session.add(db_admin_user)
+    db_session.commit()
+    return db_admin_user
+
+
+class TestRefreshSessions:
+    def setup_method(self):
+        crud.principal_cache.clear()
+
+    def test_refresh_rotates_token(self, db_session, admin, token_services):
+        tokens = crud.create_refresh_session(db_session, admin)
+        rotated = crud.refresh_session(db_session, tokens["refresh_token"])
+        assert rotated.refresh_token != tokens["refresh_token"]
+        crud.refresh_session(db_session, rotated.refresh_token)
+
+    def test_reuse_revokes_session(self, db_session, admin, token_services):
+        tokens = crud.create_refresh_session(db_session, admin)
+        crud.refresh_session(db_session, tokens["refresh_token"])
+        with patch.object(crud.revocation_list, "revoke") as revoke:
+            with pytest.raises(HTTPException) as exc:
+                crud.refresh_session(db_session, tokens["refresh_token"])
+        assert exc.value.status_code == 401
+        session = db_session.query(RefreshSessionModel).one()
+        assert session.revoked_at is not None
+        revoke.assert_called_once_with(session.id)
+
+    def test_revoked_session_cannot_refresh(self, db_session, admin, token_services):
+        tokens = crud.create_refresh_session(db_session, admin)
+        with patch.object(crud.revocation_list, "revoke"):
+            crud.revoke_admin_sessions(db_session, admin.id)
+        with pytest.raises(HTTPException):
+            crud.refresh_session(db_session, tokens["refresh_token"])
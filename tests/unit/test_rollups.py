@@ -0,0 +1,90 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from app.core.rollups import percentile, rollup_rows, upsert_rollups
+from app.libs.utils import now
+from app.models import APILogRollupModel
+from app.routers.admin.crud.analytics import crud
+
+
+def log(created_at, status_code=200, duration_ms=20, route="/countries/"):
+    return {
+        "created_at": created_at,
+        "method": "GET",
+        "route": route,
+        "status_code": status_code,
+        "duration_ms": duration_ms,
+    }
+
+
+def test_rollup_rows_aggregates_per_minute_and_route():
+    minute = datetime(2026, 10, 19, 12, 30)
+    rows = rollup_rows(
+        [
+            log(minute.replace(second=5)),
+            log(minute.replace(second=50), status_code=503, duration_ms=700),
+            log(minute + timedelta(minutes=1)),
+            log(minute, status_code=404, route=None),
+        ]
+    )
+    assert len(rows) == 3
+    first = next(
+        r for r in rows if r["bucket"] == minute and r["route"] == "/countries/"
+    )
+    assert first["count"] == 2
+    assert (first["status_2xx"], first["status_5xx"]) == (1, 1)
+    assert first["latency_sum_ms"] == 720
+    assert (first["latency_le_25"], first["latency_le_1000"]) == (1, 1)
+    assert any(r["route"] == "(unmatched)" and r["status_4xx"] == 1 for r in rows)
+
+
+def test_percentile_interpolates_within_bucket():
+    # 100 requests, all in the 50-100ms bucket
+    counts = [0, 0, 0, 0, 100, 0, 0, 0, 0, 0, 0]
+    assert percentile(counts, 0.5) == pytest.approx(75.0)
+    assert percentile(counts, 0.95) == pytest.approx(97.5)
+    assert percentile([0] * 10 + [3], 0.5) == 5000.0
+    assert percentile([0] * 11, 0.5) is None
+
+
+def test_upsert_adds_onto_existing_rows(db_session):
+    minute = datetime(2026, 10, 19, 12, 30)
+    upsert_rollups(db_session, rollup_rows([log(minute)]))
+    upsert_rollups(db_session, rollup_rows([log(minute), log(minute, 500)]))
+    row = db_session.query(APILogRollupModel).one()
+    assert (row.count, row.status_2xx, row.status_5xx) == (3, 2, 1)
+    assert row.latency_le_25 == 3
+
+
+def test_upsert_writes_rows_in_key_order():
+    db = Mock()
+    db.get_bind.return_value.dialect.name = "mysql"
+    minute = datetime(2026, 10, 19, 12, 30)
+    upsert_rollups(db, rollup_rows([log(minute, route="/z"), log(minute, route="/a")]))
+    params = db.execute.call_args[0][0].compile().params
+    assert (params["route_m0"], params["route_m1"]) == ("/a", "/z")
+
+
+class TestAnalytics:
+    def seed(self, db_session):
+        minute = now().replace(tzinfo=None, second=0, microsecond=0)
+        logs = [log(minute, duration_ms=8) for _ in range(18)]
+        logs += [log(minute - timedelta(minutes=2), 500, 300) for _ in range(2)]
+        logs += [log(minute - timedelta(days=2), route="/states")]
+        upsert_rollups(db_session, rollup_rows(logs))
+
+    def test_route_stats(self, db_session):
+        self.seed(db_session)
+        result = crud.get_route_stats(db_session, minutes=60)
+        assert len(result["list"]) == 1
+        stats = result["list"][0]
+        assert (stats["route"], stats["count"]) == ("/countries/", 20)
+        assert stats["error_rate"] == pytest.approx(0.1)
+        assert 5 < stats["p50_ms"] <= 10
+        assert 250 < stats["p99_ms"] <= 500
+
+    def test_timeseries(self, db_session):
+        self.seed(db_session)
+        result = crud.get_timeseries(db_session, minutes=10, route="/countries/")
+        assert [item["count"] for item in result["list"]] == [2, 18]
+        assert result["list"][0]["status_5xx"] == 2
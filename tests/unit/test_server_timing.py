@@ -0,0 +1,85 @@
+import httpx
+import pytest
+from typing import List
+from unittest.mock import patch
+from fastapi import APIRouter, Depends, FastAPI
+from pydantic import BaseModel
+from sqlalchemy import create_engine, text
+from app.core.timing import TimedRoute, phase, time_queries
+from app.middleware.server_timing import ServerTimingMiddleware
+
+engine = create_engine("sqlite://")
+time_queries(engine)
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+class ItemList(BaseModel):
+    list: List[Item]
+
+
+def authenticate():
+    with phase("auth"):
+        return "alice"
+
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/items", response_model=ItemList)
+def get_items(user: str = Depends(authenticate)):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+    return {"list": [{"id": i, "name": f"item {i}"} for i in range(100)]}
+
+
+def make_app(enabled=True, subjects=()):
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware, enabled=enabled, subjects=subjects)
+    return app
+
+
+def parse(header):
+    phases = {}
+    for part in header.split(", "):
+        name, *params = part.split(";")
+        phases[name] = dict(param.split("=", 1) for param in params)
+    return phases
+
+
+async def get(app, headers=None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        return await client.get("/items", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_header_reports_each_phase():
+    response = await get(make_app())
+    assert response.status_code == 200
+    phases = parse(response.headers["server-timing"])
+    assert set(phases) == {"auth", "db", "deps", "endpoint", "serialize", "total"}
+    assert phases["db"]["desc"] == '"2 queries"'
+    assert float(phases["total"]["dur"]) >= float(phases["endpoint"]["dur"])
+
+
+@pytest.mark.asyncio
+async def test_disabled_unless_subject_listed():
+    assert "server-timing" not in (await get(make_app(enabled=False))).headers
+    app = make_app(enabled=False, subjects=["admin-1"])
+    with patch(
+        "app.middleware.server_timing.get_subject",
+        side_effect=lambda scope: "admin-1" if scope["headers"] else None,
+    ):
+        response = await get(app, headers={"authorization": "Bearer x"})
+    assert "server-timing" in response.headers
+
+
+def test_phase_is_noop_outside_requests():
+    with phase("auth"):
+        pass
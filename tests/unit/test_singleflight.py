@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+import httpx
+from fastapi import FastAPI
+from app.middleware.singleflight import (
+    SingleFlight,
+    SingleFlightMiddleware,
+    request_key,
+)
+
+
+def scope(query: bytes, authorization: bytes = b"Bearer alice"):
+    return {
+        "path": "/countries/",
+        "query_string": query,
+        "headers": [(b"authorization", authorization)],
+        "client": ("10.0.0.1", 1234),
+    }
+
+
+def test_request_key_normalizes_query_and_scopes_by_caller():
+    assert request_key(scope(b"start=0&limit=100")) == request_key(
+        scope(b"limit=100&start=0")
+    )
+    assert request_key(scope(b"start=0")) != request_key(scope(b"start=1"))
+    assert request_key(scope(b"start=0")) != request_key(
+        scope(b"start=0", b"Bearer bob")
+    )
+
+
+def test_request_key_separates_tokens_of_the_same_user():
+    # Two tokens of one admin, e.g. one since revoked, never share
+    assert request_key(scope(b"", b"Bearer old-token")) != request_key(
+        scope(b"", b"Bearer new-token")
+    )
+
+
+class RouteRecorder:
+    """Outer middleware reading the matched route, like metrics/API logs"""
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+        self.routes.append(getattr(scope.get("route"), "path", None))
+
+
+def make_app(group: SingleFlight, max_body_bytes: int = 1024):
+    app = FastAPI()
+    calls = []
+    lock = threading.Lock()
+
+    @app.get("/countries/")
+    def countries(start: int = 0):
+        with lock:
+            calls.append(start)
+        time.sleep(0.1)
+        return {"start": start, "data": ["x" * 100] * 20}
+
+    app.add_middleware(
+        SingleFlightMiddleware,
+        group=group,
+        paths=["/countries"],
+        max_body_bytes=max_body_bytes,
+    )
+    return app, calls
+
+
+async def fetch_all(app, urls):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        return await asyncio.gather(*(client.get(url) for url in urls))
+
+
+class TestSingleFlightMiddleware:
+    def test_identical_requests_share_one_execution(self):
+        group = SingleFlight()
+        app, calls = make_app(group, max_body_bytes=10000)
+        urls = ["/countries/?start=0"] * 5 + ["/countries/?start=1"]
+        responses = asyncio.run(fetch_all(app, urls))
+        assert sorted(calls) == [0, 1]
+        assert all(r.status_code == 200 for r in responses)
+        assert len({r.text for r in responses[:5]}) == 1
+        assert sum(r.headers.get("x-coalesced") == "true" for r in responses) == 4
+        assert group.stats() == {"executed": 2, "coalesced": 4, "inflight": 0}
+
+    def test_large_responses_are_not_shared(self):
+        group = SingleFlight()
+        app, calls = make_app(group, max_body_bytes=100)
+        responses = asyncio.run(fetch_all(app, ["/countries/?start=0"] * 3))
+        assert len(calls) == 3
+        assert all(r.status_code == 200 for r in responses)
+        assert group.coalesced == 0
+
+    def test_coalesced_requests_keep_the_route(self):
+        group = SingleFlight()
+        app, calls = make_app(group, max_body_bytes=10000)
+        routes = []
+        app.add_middleware(RouteRecorder, routes=routes)
+        responses = asyncio.run(fetch_all(app, ["/countries/?start=0"] * 2))
+        assert [r.headers.get("x-coalesced") for r in responses].count("true") == 1
+        assert routes == ["/countries/", "/countries/"]
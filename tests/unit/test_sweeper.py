@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from app.core.sweeper import delete_expired, delete_finished_emails
+from app.models import (
+    AdminUserModel,
+    EmailOutboxModel,
+    PasswordResetModel,
+    RefreshSessionModel,
+)
+
+
+def add_admin(db_session):
+    db_session.add(
+        AdminUserModel(
+            id="e" * 36,
+            first_name="Test",
+            last_name="User",
+            email="sweep@example.com",
+            password="x",
+            is_deleted=False,
+        )
+    )
+
+
+class TestSweeper:
+    def test_deletes_only_expired_in_chunks(self, db_session):
+        add_admin(db_session)
+        current = datetime.utcnow()
+        for i in range(5):
+            db_session.add(
+                PasswordResetModel(
+                    id=f"{i}" * 36,
+                    admin_user_id="e" * 36,
+                    kind="link",
+                    secret_hash=f"hash-{i}",
+                    expires_at=current + timedelta(minutes=-1 if i < 4 else 10),
+                )
+            )
+        db_session.commit()
+        assert delete_expired(db_session, PasswordResetModel, chunk_size=3) == 4
+        remaining = db_session.query(PasswordResetModel).all()
+        assert [reset.secret_hash for reset in remaining] == ["hash-4"]
+
+    def test_expired_refresh_sessions_are_removed(self, db_session):
+        add_admin(db_session)
+        current = datetime.utcnow()
+        for session_id, days in (("a" * 36, -1), ("b" * 36, 1)):
+            db_session.add(
+                RefreshSessionModel(
+                    id=session_id,
+                    admin_user_id="e" * 36,
+                    refresh_jti=session_id,
+                    expires_at=current + timedelta(days=days),
+                )
+            )
+        db_session.commit()
+        assert delete_expired(db_session, RefreshSessionModel, chunk_size=10) == 1
+        assert db_session.query(RefreshSessionModel).one().id == "b" * 36
+
+    def test_finished_emails_are_removed_after_retention(self, db_session):
+        current = datetime.utcnow()
+        rows = (
+            ("a" * 36, "sent", 10),
+            ("b" * 36, "failed", 10),
+            ("c" * 36, "sent", 1),
+            ("d" * 36, "pending", 10),
+        )
+        for message_id, status, age_days in rows:
+            db_session.add(
+                EmailOutboxModel(
+                    id=message_id,
+                    recipients='["user@example.com"]',
+                    subject="Hello",
+                    html_body="",
+                    status=status,
+                    attempts=1,
+                    next_attempt_at=current,
+                    updated_at=current - timedelta(days=age_days),
+                )
+            )
+        db_session.commit()
+        deleted = delete_finished_emails(db_session, timedelta(days=7), chunk_size=10)
+        assert deleted == 2
+        remaining = {message.id for message in db_session.query(EmailOutboxModel)}
+        assert remaining == {"c" * 36, "d" * 36}
@@ -0,0 +1,45 @@
+import os
+from unittest.mock import patch
+from app.config import settings
+from app.libs.template_manager import EmailTemplateManager
+
+
+def make_manager(tmp_path, debug=False):
+    with patch.multiple(
+        settings, DEBUG=debug, EMAIL_TEMPLATE_CACHE_DIR=str(tmp_path / "jinja")
+    ):
+        return EmailTemplateManager()
+
+
+class TestEmailTemplateManager:
+    def test_precompile_loads_every_template(self, tmp_path):
+        manager = make_manager(tmp_path)
+        assert manager.precompile() == 3
+        assert os.listdir(tmp_path / "jinja")
+
+    def test_rendering_after_precompile_skips_loader(self, tmp_path):
+        manager = make_manager(tmp_path)
+        manager.precompile()
+        with patch.object(
+            manager.env.loader, "get_source", side_effect=AssertionError("reloaded")
+        ):
+            body = manager.render_template(
+                "forgot_password", first_name="A", last_name="B", otp="123456"
+            )
+        assert "123456" in body
+
+    def test_debug_keeps_auto_reload(self, tmp_path):
+        assert make_manager(tmp_path, debug=True).env.auto_reload
+        assert not make_manager(tmp_path).env.auto_reload
+
+    def test_render_many(self, tmp_path):
+        manager = make_manager(tmp_path)
+        bodies = manager.render_many(
+            "forgot_password",
+            [
+                {"first_name": "A", "last_name": "One", "otp": "111111"},
+                {"first_name": "B", "last_name": "Two", "otp": "222222"},
+            ],
+        )
+        assert len(bodies) == 2
+        assert "111111" in bodies[0] and "222222" in bodies[1]
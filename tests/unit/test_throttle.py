@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException
+from app.core.throttle import LoginThrottle
+from app.models import AdminUserModel
+from app.routers.admin.crud.auth_mod import crud
+from app.routers.admin.crud.auth_mod.schemas import LoginRequest
+
+
+class TestLoginThrottle:
+    def test_blocks_after_free_failures_with_backoff(self):
+        throttle = LoginThrottle(slots=64, secret=b"test", base_delay=1, max_delay=8)
+        with patch("app.core.throttle.time.time", return_value=1000):
+            assert throttle.record_failure("k", 3) == 0
+            assert throttle.record_failure("k", 3) == 0
+            assert throttle.retry_after("k") == 0
+            assert throttle.record_failure("k", 3) == 1
+            assert throttle.record_failure("k", 3) == 2
+            assert throttle.record_failure("k", 3) == 4
+            assert throttle.retry_after("k") == 4
+            for _ in range(5):
+                throttle.record_failure("k", 3)
+            assert throttle.retry_after("k") == 8
+        with patch("app.core.throttle.time.time", return_value=1008):
+            assert throttle.retry_after("k") == 0
+
+    def test_reset_and_stale_failures_are_forgotten(self):
+        throttle = LoginThrottle(slots=64, secret=b"test", reset_after=60)
+        with patch("app.core.throttle.time.time", return_value=1000):
+            throttle.record_failure("a", 2)
+            throttle.record_failure("b", 2)
+            throttle.reset("a")
+            assert throttle.record_failure("a", 2) == 0
+        with patch("app.core.throttle.time.time", return_value=1100):
+            assert throttle.record_failure("b", 2) == 0
+
+    def test_blocked_key_survives_a_full_bucket(self):
+        # One bucket, so every key collides with the victim
+        throttle = LoginThrottle(slots=4, secret=b"test")
+        with patch("app.core.throttle.time.time", return_value=1000):
+            throttle.record_failure("victim", 1)
+            for i in range(8):
+                throttle.record_failure(f"attacker-{i}", 5)
+            assert throttle.retry_after("victim") == 1
+
+    def test_fingerprints_depend_on_the_secret(self):
+        first = LoginThrottle(slots=4, secret=b"one")
+        second = LoginThrottle(slots=4, secret=b"two")
+        assert first._fingerprint("a@b.c") != second._fingerprint("a@b.c")
+
+    def test_table_size_is_fixed(self):
+        throttle = LoginThrottle(slots=8, secret=b"test")
+        size = len(throttle._map)
+        for i in range(1000):
+            throttle.record_failure(f"k{i}", 1)
+        assert len(throttle._map) == size
+        assert throttle.retry_after("k999") > 0
+
+    def test_file_backed_table_is_shared(self, tmp_path):
+        path = str(tmp_path / "throttle")
+        first = LoginThrottle(slots=64, secret=b"test", path=path)
+        second = LoginThrottle(slots=64, secret=b"test", path=path)
+        first.record_failure("k", 1)
+        assert second.retry_after("k") > 0
+
+
+@pytest.fixture
+def admin(db_session):
+    db_admin_user = AdminUserModel(
+        id="e" * 36,
+        first_name="Test",
+        last_name="User",
+        email="throttle@example.com",
+        password="x",
+        is_deleted=False,
+    )
+    db_session.add(db_admin_user)
+    db_session.commit()
+    return db_admin_user
+
+
+@pytest.fixture
+def throttle():
+    store = LoginThrottle(slots=64, secret=b"test")
+    with patch.object(crud, "login_throttle", store):
+        yield store
+
+
+class TestSignInThrottle:
+    def sign_in(self, db_session, client_ip="10.0.0.1"):
+        request = LoginRequest(email="throttle@example.com", password="wrong")
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(crud.sign_in(db_session, request, client_ip))
+        return exc.value
+
+    def test_blocked_login_skips_bcrypt(self, db_session, admin, throttle):
+        verify = AsyncMock(return_value=False)
+        with patch.object(crud.password_pool, "verify", verify):
+            for _ in range(crud.settings.LOGIN_THROTTLE_EMAIL_FAILURES):
+                assert self.sign_in(db_session).status_code == 401
+            calls = verify.await_count
+            error = self.sign_in(db_session)
+        assert error.status_code == 429
+        assert int(error.headers["Retry-After"]) > 0
+        assert verify.await_count == calls
+
+    def test_unknown_email_counts_against_ip(self, db_session, throttle):
+        with patch.object(crud.settings, "LOGIN_THROTTLE_IP_FAILURES", 2):
+            self.sign_in(db_session)
+            self.sign_in(db_session)
+        assert throttle.retry_after("ip:10.0.0.1") > 0
+        assert self.sign_in(db_session).status_code == 429
+        assert self.sign_in(db_session, client_ip="10.0.0.2").status_code == 401
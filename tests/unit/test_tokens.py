@@ -0,0 +1,61 @@
+import json
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from jwcrypto import jwk, jwt
+from app.core.tokens import InvalidTokenError, Keyring, TokenService
+
+
+def oct_key():
+    return jwk.JWK.generate(kty="oct", size=256).export(as_dict=True)
+
+
+def make_service(token_format="jwe", keys=None, active_kid="k1"):
+    keyring = Keyring(keys or {"k1": oct_key()}, active_kid)
+    return TokenService(lambda: keyring, token_format=token_format)
+
+
+class TestTokenService:
+    @pytest.mark.parametrize("token_format", ["jwe", "hs256"])
+    def test_round_trip(self, token_format):
+        service = make_service(token_format)
+        token = service.issue({"sub": "user-1"}, timedelta(minutes=5))
+        claims = service.verify(token)
+        assert claims["sub"] == "user-1"
+        assert claims["exp"] - claims["iat"] == 300
+
+    def test_eddsa_round_trip(self):
+        key = jwk.JWK.generate(kty="OKP", crv="Ed25519").export(as_dict=True)
+        service = make_service("eddsa", keys={"ed": key}, active_kid="ed")
+        token = service.issue({"sub": "user-1"}, timedelta(minutes=5))
+        assert token.count(".") == 2
+        assert service.verify(token)["sub"] == "user-1"
+
+    def test_verified_claims_are_cached(self):
+        service = make_service()
+        token = service.issue({"sub": "user-1"}, timedelta(minutes=5))
+        service.verify(token)
+        with patch.object(jwt, "JWT", side_effect=AssertionError):
+            assert service.verify(token)["sub"] == "user-1"
+
+    def test_rotated_keys_still_verify(self):
+        """Tokens from a retired kid verify while it stays in the keyring"""
+        keys = {"old": oct_key(), "new": oct_key()}
+        old_token = make_service(keys=keys, active_kid="old").issue(
+            {"sub": "user-1"}, timedelta(minutes=5)
+        )
+        rotated = make_service(keys=keys, active_kid="new")
+        assert rotated.verify(old_token)["sub"] == "user-1"
+        with pytest.raises(InvalidTokenError):
+            make_service(keys={"new": keys["new"]}, active_kid="new").verify(old_token)
+
+    def test_expired_token_is_rejected(self):
+        service = make_service("hs256")
+        token = service.issue({"sub": "user-1"}, timedelta(minutes=-10))
+        with pytest.raises(InvalidTokenError):
+            service.verify(token)
+
+    def test_keyring_from_single_key(self):
+        keyring = Keyring.from_config(json.dumps(oct_key()))
+        assert keyring.active_kid == "default"
+        assert keyring.active_key is not None
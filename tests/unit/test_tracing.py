@@ -0,0 +1,108 @@
+import asyncio
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from app.core.tracing import (
+    JSONLExporter,
+    MemoryExporter,
+    Span,
+    parse_traceparent,
+    traced,
+    tracer,
+)
+from app.middleware.tracing import TracingMiddleware
+
+
+@pytest.fixture
+def spans():
+    exporter = MemoryExporter()
+    with patch.multiple(tracer, exporter=exporter, enabled=True, sample_rate=1.0):
+        yield exporter.spans
+
+
+@traced("lookup", lambda key: {"key": key})
+def lookup(key):
+    if key == "missing":
+        raise KeyError(key)
+    return key
+
+
+@traced("handler")
+async def handler():
+    await asyncio.sleep(0)
+    return lookup("a")
+
+
+def test_nested_spans_share_the_trace(spans):
+    assert asyncio.run(handler()) == "a"
+    child, parent = spans
+    assert (child.name, parent.name) == ("lookup", "handler")
+    assert child.trace_id == parent.trace_id
+    assert child.parent_span_id == parent.span_id
+    assert parent.parent_span_id is None
+    assert child.attributes == {"key": "a"}
+    assert parent.end_ns >= child.end_ns >= child.start_ns >= parent.start_ns
+
+
+def test_errors_are_recorded(spans):
+    with pytest.raises(KeyError):
+        lookup("missing")
+    assert spans[0].to_dict()["status"]["code"] == "STATUS_CODE_ERROR"
+
+
+def test_unsampled_trace_records_nothing_below_it(spans):
+    tracer.sample_rate = 0.0
+    assert asyncio.run(handler()) == "a"
+    assert not spans
+
+
+def test_continues_sampled_remote_parent(spans):
+    tracer.sample_rate = 0.0
+    header = "00-" + "ab" * 16 + "-" + "cd" * 8 + "-01"
+    with tracer.span("server", traceparent=header):
+        lookup("a")
+    assert [span.trace_id for span in spans] == ["ab" * 16] * 2
+    assert spans[1].parent_span_id == "cd" * 8
+    assert parse_traceparent(header.replace("-01", "-00"))[2] is False
+    assert parse_traceparent("garbage") is None
+
+
+def test_jsonl_exporter_appends_and_rotates(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = JSONLExporter(str(path), capacity=2, max_bytes=1)
+    for name in ("a", "b", "c"):
+        span = Span(name, "ab" * 16)
+        span.end_ns = span.start_ns
+        exporter.export(span)
+    exporter.flush()
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == [
+        "a",
+        "b",
+    ]
+    assert exporter.dropped == 1
+    exporter.export(Span("d", "ab" * 16))
+    exporter.flush()
+    assert (tmp_path / "traces.jsonl.1").exists()
+    assert json.loads(path.read_text())["name"] == "d"
+
+
+@pytest.mark.asyncio
+async def test_middleware_names_server_span_by_route(spans):
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/things/{thing_id}")
+    def get_thing(thing_id: str):
+        return {"id": lookup(thing_id)}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        response = await client.get("/things/a")
+    child, server = spans
+    assert server.name == "GET /things/{thing_id}"
+    assert server.kind == "SERVER"
+    assert server.attributes["http.response.status_code"] == 200
+    assert child.parent_span_id == server.span_id
+    assert response.headers["x-trace-id"] == server.trace_id